@@ -0,0 +1,115 @@
+"""Área do RH: busca de candidatos e painel de recrutamento (painel_RH.py).
+
+    streamlit run admin_RH.py
+
+Exige ADMIN_SENHA configurada (variável de ambiente ou secrets.toml). A senha
+é pedida aqui, antes de qualquer página rodar.
+"""
+import hmac
+from datetime import datetime
+
+import streamlit as st
+
+from configuracao import get_secret
+from processamento import armazem_submissoes
+
+ADMIN_SENHA = get_secret("ADMIN_SENHA")
+
+st.set_page_config(page_title="Área do RH", page_icon="provion.ico", layout="wide")
+
+# =====================
+# Acesso
+# =====================
+if not ADMIN_SENHA:
+    st.error("Configure ADMIN_SENHA para usar esta página.")
+    st.stop()
+if not st.session_state.get("admin_autenticado"):
+    st.title("Área do RH")
+    senha = st.text_input("Senha", type="password")
+    if not senha:
+        st.stop()
+    if not hmac.compare_digest(senha.encode(), ADMIN_SENHA.encode()):
+        st.error("Senha incorreta.")
+        st.stop()
+    st.session_state.admin_autenticado = True
+    st.rerun()
+
+# =====================
+# Páginas
+# =====================
+def busca():
+    """Busca de candidatos (todas as submissões gravadas)."""
+    st.title("Busca de Candidatos")
+
+    # Filtros
+    with st.form("filtros"):
+        col1, col2, col3 = st.columns([2, 3, 3])
+        cpf = col1.text_input("CPF")
+        nome = col2.text_input("Nome", help="Início de cada palavra, sem acentos: \"jose conc\" acha José da Conceição")
+        vaga = col3.text_input("Vaga", help="Palavras inteiras do texto da vaga")
+        col4, col5, col6, col7 = st.columns([3, 1, 3, 1])
+        cidade = col4.text_input("Cidade")
+        uf = col5.text_input("UF", max_chars=2)
+        escolaridade = col6.text_input("Escolaridade")
+        limite = col7.number_input("Máx.", min_value=10, max_value=500, value=50, step=10)
+        st.form_submit_button("Buscar")
+
+    if not any((cpf, nome, vaga, cidade, uf, escolaridade)):
+        st.info("Informe ao menos um critério de busca.")
+        st.stop()
+
+    inicio = datetime.now()
+    resultados = armazem_submissoes().buscar(
+        cpf=cpf, nome=nome, vaga=vaga, cidade=cidade, uf=uf, escolaridade=escolaridade, limite=int(limite),
+    )
+    decorrido = (datetime.now() - inicio).total_seconds() * 1e3
+    st.caption(f"{len(resultados)} candidato(s) em {decorrido:.0f} ms (mais recentes primeiro)")
+    if not resultados:
+        st.stop()
+
+    # Resultados
+    selecao = st.dataframe(
+        resultados,
+        column_order=("id", "recebida_em", "nome", "cpf", "vaga", "cidade", "uf", "escolaridade", "email", "telefone"),
+        column_config={"id": "Protocolo", "recebida_em": "Recebida em"},
+        hide_index=True,
+        on_select="rerun",
+        selection_mode="single-row",
+    )
+    linhas = selecao.selection.rows
+    if linhas:
+        protocolo = resultados[linhas[0]]["id"]
+        recebida_em, dados = armazem_submissoes().obter(protocolo)
+        st.subheader(f"Protocolo {protocolo} — {dados.get('nome', '')}")
+        if st.button("Gerar PDF"):
+            from fila_email import nome_arquivo_pdf
+            from pdf import gerar_pdf_formulario
+
+            quando = datetime.fromisoformat(recebida_em)
+            st.download_button(
+                "Baixar PDF", gerar_pdf_formulario({**dados, "enviado_em": quando.strftime('%d/%m/%Y às %H:%M')}),
+                file_name=nome_arquivo_pdf(dados.get('nome'), quando), mime="application/pdf",
+            )
+        curriculo = dados.get("curriculo")
+        if curriculo:
+            from curriculos import anexos
+
+            # Só o que está de fato no armazém (o registro pode citar qualquer caminho)
+            arquivos = anexos(dados)
+            if not arquivos:
+                st.warning("O currículo citado nesta submissão não está no armazém.")
+            for arquivo, nome_arquivo, tipo in arquivos:
+                def ler_curriculo(arquivo=arquivo):
+                    # Lido só no clique, numa thread à parte do script
+                    with open(arquivo, "rb") as f:
+                        return f.read()
+
+                st.download_button(f"Baixar currículo ({nome_arquivo})", ler_curriculo,
+                                   file_name=nome_arquivo, mime=tipo)
+        st.json(dados, expanded=False)
+
+
+st.navigation([
+    st.Page(busca, title="Busca de candidatos", icon="🔎", default=True),
+    st.Page("painel_RH.py", title="Painel de recrutamento", icon="📊"),
+]).run()
@@ -0,0 +1,407 @@
+"""Base analítica (colunar) das submissões, para o painel de recrutamento do RH.
+
+As submissões são copiadas do armazém SQLite (a fonte de verdade, ver
+submissoes.py) para arquivos Parquet, numa pasta por mês de recebimento:
+
+    <PASTA_ANALISE>/mes=2026-10/parte-<primeiro id>-<último id>.parquet
+    <PASTA_ANALISE>/_sincronizado          último id já copiado
+
+Só vão as colunas dos agregados (vaga, local, pretensão, escolaridade,
+idiomas). Nome, CPF e contato continuam só no armazém. Os campos
+categóricos são dictionary-encoded: cada valor distinto aparece uma vez por
+arquivo e as linhas guardam um índice int32. Assim as agregações agrupam
+pelos índices num único scan vetorizado (pyarrow.compute), sem laço Python
+por registro.
+
+A cópia é incremental (`a_partir_de_id`) e acrescenta uma parte por lote a
+cada mês tocado. Um mês com mais de PARTES_MAX partes é compactado num
+arquivo só.
+
+O envio do formulário não escreve aqui. Gravar uma parte Parquet por
+submissão deixaria um arquivo minúsculo a cada candidato e poria o pyarrow
+(e a trava da pasta) no caminho do envio. Também abriria uma segunda
+gravação que pode falhar depois do commit no SQLite. A base fica então
+atrasada em relação ao armazém até a próxima sincronização: o painel
+sincroniza ao abrir (no máximo uma vez por minuto) e também dá para rodar
+por cron:
+
+    python analise.py sincronizar
+    python analise.py resumo [--desde 2026-01] [--ate 2026-06]
+"""
+import argparse
+import math
+import os
+import re
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from datetime import datetime, time as dtime, timedelta
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from configuracao import PASTA_DADOS, get_secret
+
+PASTA_ANALISE = get_secret("PASTA_ANALISE", os.path.join(PASTA_DADOS, "analise"))
+LOTE_ANALISE  = 50_000  # submissões por parte na sincronização
+PARTES_MAX    = 16      # partes de um mês antes de compactar
+
+CATEGORIA = pa.dictionary(pa.int32(), pa.string())
+# Tipos como voltam do Parquet (timestamp em ms, item de lista "element")
+ESQUEMA = pa.schema([
+    ("id", pa.int64()),
+    ("recebida_em", pa.timestamp("ms")),
+    ("vaga", CATEGORIA),
+    ("uf", CATEGORIA),
+    ("cidade", CATEGORIA),
+    ("pretensao", pa.float64()),
+    ("escolaridade", CATEGORIA),
+    ("idiomas", pa.list_(pa.field("element", CATEGORIA))),
+    ("nivel_idioma", CATEGORIA),
+])
+# coluna -> chave de dados_formulario
+CAMPOS_ANALISE = {
+    "vaga": "vaga", "uf": "uf_endereco", "cidade": "cidade", "pretensao": "pretensao",
+    "escolaridade": "escolaridade", "idiomas": "idiomas", "nivel_idioma": "nivel_idioma",
+}
+SEM_VALOR = {"", "Selecione", "Selecione a UF"}
+
+Parte = namedtuple("Parte", "mes inicio fim caminho")
+_PARTE = re.compile(r"parte-(\d+)-(\d+)\.parquet")
+
+
+# =====================
+# Linhas -> colunas
+# =====================
+def _texto(valor):
+    texto = " ".join(str(valor or "").split())
+    return None if texto in SEM_VALOR else texto
+
+
+def _pretensao(valor):
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        return None
+    return numero if math.isfinite(numero) and numero > 0 else None   # 0 = não informada
+
+
+def _categoria(valores):
+    return pa.array(valores, pa.string()).dictionary_encode()
+
+
+def montar_tabela(registros):
+    """Tabela no ESQUEMA a partir de [(id, recebida_em, dados)]."""
+    ids, recebidas, colunas = [], [], {c: [] for c in CAMPOS_ANALISE}
+    offsets, idiomas = [0], []
+    for id_sub, recebida_em, dados in registros:
+        ids.append(id_sub)
+        recebidas.append(recebida_em)
+        for coluna, chave in CAMPOS_ANALISE.items():
+            if coluna == "pretensao":
+                colunas[coluna].append(_pretensao(dados.get(chave)))
+            elif coluna == "idiomas":
+                idiomas.extend(filter(None, map(_texto, dados.get(chave) or ())))
+                offsets.append(len(idiomas))
+            else:
+                colunas[coluna].append(_texto(dados.get(chave)))
+    arrays = {
+        "id": pa.array(ids, pa.int64()),
+        "recebida_em": pa.array(recebidas, pa.string()).cast(pa.timestamp("ms")),
+        "pretensao": pa.array(colunas["pretensao"], pa.float64()),
+        "idiomas": pa.ListArray.from_arrays(pa.array(offsets, pa.int32()), _categoria(idiomas),
+                                            type=ESQUEMA.field("idiomas").type),
+    }
+    for coluna in ("vaga", "uf", "cidade", "escolaridade", "nivel_idioma"):
+        arrays[coluna] = _categoria(colunas[coluna])
+    return pa.Table.from_arrays([arrays[c] for c in ESQUEMA.names], schema=ESQUEMA)
+
+
+# =====================
+# Armazém analítico
+# =====================
+class ArmazemAnalitico:
+    """Partes Parquet por mês, acrescentadas a partir do armazém de submissões."""
+
+    def __init__(self, pasta=PASTA_ANALISE):
+        self.pasta = pasta
+
+    def ultimo_id(self):
+        """Último id de submissão já copiado (0 se nada foi)."""
+        try:
+            with open(os.path.join(self.pasta, "_sincronizado"), encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def partes(self, desde=None, ate=None):
+        """Partes válidas dos meses entre `desde` e `ate` (AAAA-MM, inclusivos), em ordem.
+
+        Ficam de fora as partes além de `_sincronizado` (lote interrompido
+        antes de confirmar) e as contidas numa parte maior do mesmo mês
+        (compactação interrompida antes de apagar as originais).
+        """
+        ultimo = self.ultimo_id()
+        partes = []
+        try:
+            meses = [e for e in os.scandir(self.pasta) if e.is_dir() and e.name.startswith("mes=")]
+        except FileNotFoundError:
+            return []
+        for pasta_mes in meses:
+            mes = pasta_mes.name[4:]
+            if (desde and mes < desde) or (ate and mes > ate):
+                continue
+            do_mes = []
+            for arquivo in os.scandir(pasta_mes.path):
+                casou = _PARTE.fullmatch(arquivo.name)
+                if casou and int(casou[2]) <= ultimo:
+                    do_mes.append(Parte(mes, int(casou[1]), int(casou[2]), arquivo.path))
+            partes.extend(p for p in do_mes
+                          if not any((o.inicio, o.fim) != (p.inicio, p.fim) and o.inicio <= p.inicio and p.fim <= o.fim
+                                     for o in do_mes))
+        return sorted(partes, key=lambda p: (p.mes, p.inicio))
+
+    @contextmanager
+    def _trava(self):
+        """Trava de escrita entre processos; entrega False se outro já está sincronizando."""
+        import fcntl
+
+        os.makedirs(self.pasta, exist_ok=True)
+        with open(os.path.join(self.pasta, "_trava"), "w") as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _gravar(self, tabela, mes, inicio, fim):
+        pasta_mes = os.path.join(self.pasta, f"mes={mes}")
+        os.makedirs(pasta_mes, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=pasta_mes, prefix=".parte-", suffix=".tmp")
+        os.close(fd)
+        try:
+            pq.write_table(tabela, tmp, compression="zstd")
+            os.replace(tmp, os.path.join(pasta_mes, f"parte-{inicio}-{fim}.parquet"))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+
+    def _confirmar(self, ultimo):
+        fd, tmp = tempfile.mkstemp(dir=self.pasta, prefix=".sincronizado-")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(str(ultimo))
+        os.replace(tmp, os.path.join(self.pasta, "_sincronizado"))
+
+    def _acrescentar(self, lote):
+        """Grava um lote (em ordem de id) como uma parte em cada mês e confirma o último id."""
+        inicio, fim = lote[0][0], lote[-1][0]
+        por_mes = {}
+        for registro in lote:
+            por_mes.setdefault(registro[1][:7], []).append(registro)
+        for mes, registros in por_mes.items():
+            self._gravar(montar_tabela(registros), mes, inicio, fim)
+        self._confirmar(fim)
+        return por_mes.keys()
+
+    def sincronizar(self, armazem, tamanho_lote=LOTE_ANALISE):
+        """Copia as submissões novas de `armazem`; devolve quantas (0 se outro processo já está copiando)."""
+        with self._trava() as obtida:
+            if not obtida:
+                return 0
+            validas = set(self.partes())
+            for parte in self._todas_as_partes():
+                if parte not in validas:
+                    os.unlink(parte.caminho)     # sobra de lote não confirmado ou de compactação
+            ultimo = self.ultimo_id()
+            total, lote, meses = 0, [], set()
+            for registro in armazem.iterar(a_partir_de_id=ultimo):
+                lote.append(registro)
+                if len(lote) >= tamanho_lote:
+                    meses.update(self._acrescentar(lote))
+                    total += len(lote)
+                    lote = []
+            if lote:
+                meses.update(self._acrescentar(lote))
+                total += len(lote)
+            for mes in sorted(meses):
+                self._compactar(mes)
+        return total
+
+    def _todas_as_partes(self):
+        for raiz, _, arquivos in os.walk(self.pasta):
+            for nome in arquivos:
+                casou = _PARTE.fullmatch(nome)
+                if casou:
+                    yield Parte(os.path.basename(raiz)[4:], int(casou[1]), int(casou[2]), os.path.join(raiz, nome))
+
+    def _compactar(self, mes, partes_max=PARTES_MAX):
+        partes = self.partes(mes, mes)
+        if len(partes) <= partes_max:
+            return
+        tabela = pa.concat_tables(pq.read_table(p.caminho) for p in partes).unify_dictionaries().combine_chunks()
+        self._gravar(tabela.sort_by("id"), mes, partes[0].inicio, max(p.fim for p in partes))
+        for parte in partes:
+            os.unlink(parte.caminho)
+
+    def compactar(self, partes_max=PARTES_MAX):
+        """Compacta os meses com mais de `partes_max` partes."""
+        with self._trava() as obtida:
+            if obtida:
+                for mes in sorted({p.mes for p in self.partes()}):
+                    self._compactar(mes, partes_max)
+
+    def ler(self, colunas=None, desde=None, ate=None):
+        """Tabela Arrow com `colunas` dos meses entre `desde` e `ate` (AAAA-MM), dicionários unificados."""
+        esquema = ESQUEMA if colunas is None else pa.schema([ESQUEMA.field(c) for c in colunas])
+        partes = self.partes(desde, ate)
+        if not partes:
+            return esquema.empty_table()
+        tabelas = [pq.read_table(p.caminho, columns=colunas, memory_map=True) for p in partes]
+        return pa.concat_tables(tabelas).unify_dictionaries()
+
+
+# =====================
+# Agregados (vetorizados)
+# =====================
+def filtrar(tabela, desde=None, ate=None, vagas=(), ufs=()):
+    """Linhas recebidas entre as datas `desde` e `ate` (inclusivas) e das vagas/UFs escolhidas."""
+    mascara = None
+
+    def e(condicao):
+        nonlocal mascara
+        mascara = condicao if mascara is None else pc.and_kleene(mascara, condicao)
+
+    if desde:
+        e(pc.greater_equal(tabela["recebida_em"], pa.scalar(datetime.combine(desde, dtime()), pa.timestamp("ms"))))
+    if ate:
+        limite = datetime.combine(ate + timedelta(days=1), dtime())
+        e(pc.less(tabela["recebida_em"], pa.scalar(limite, pa.timestamp("ms"))))
+    if vagas:
+        e(pc.is_in(tabela["vaga"], value_set=pa.array(list(vagas), pa.string())))
+    if ufs:
+        e(pc.is_in(tabela["uf"], value_set=pa.array(list(ufs), pa.string())))
+    return tabela if mascara is None else tabela.filter(mascara)
+
+
+def contagem(tabela, *colunas, limite=None):
+    """Candidatos por valor de `colunas` (nulos incluídos), do maior para o menor."""
+    resultado = tabela.group_by(list(colunas)).aggregate([([], "count_all")])
+    resultado = resultado.rename_columns([*colunas, "candidatos"]).sort_by([("candidatos", "descending")])
+    return resultado if limite is None else resultado.slice(0, limite)
+
+
+def por_mes(tabela):
+    """Candidatos por mês de recebimento."""
+    # Agrupa pelo timestamp truncado e só formata as linhas do resultado
+    # (strftime linha a linha custa 25x mais)
+    meses = contagem(pa.table({"mes": pc.floor_temporal(tabela["recebida_em"], unit="month")}), "mes").sort_by("mes")
+    return meses.set_column(0, "mes", pc.strftime(meses["mes"], "%Y-%m"))
+
+
+def pretensao_por_vaga(tabela, limite=None):
+    """Por vaga: candidatos, mediana e quartis da pretensão salarial (aproximados, t-digest)."""
+    resultado = tabela.group_by("vaga").aggregate([
+        ([], "count_all"),
+        ("pretensao", "tdigest", pc.TDigestOptions(q=[0.25, 0.5, 0.75])),
+    ])
+    quartis = resultado["pretensao_tdigest"]
+    resultado = pa.table({
+        "vaga": resultado["vaga"],
+        "candidatos": resultado["count_all"],
+        **{nome: pc.list_element(quartis, i) for i, nome in enumerate(("p25", "mediana", "p75"))},
+    }).sort_by([("candidatos", "descending")])
+    return resultado if limite is None else resultado.slice(0, limite)
+
+
+def _largura_redonda(valor):
+    """1, 2 ou 5 vezes uma potência de 10, a partir de `valor`."""
+    if valor <= 0:
+        return 1.0
+    base = 10 ** math.floor(math.log10(valor))
+    return next(m * base for m in (1, 2, 5, 10) if m * base >= valor)
+
+
+def faixas_pretensao(tabela, faixas=20):
+    """Histograma da pretensão: (faixa inicial, candidatos); a última faixa junta o que passa do p99."""
+    valores = pc.drop_null(tabela["pretensao"])
+    if not len(valores):
+        return pa.table({"faixa": pa.array([], pa.float64()), "candidatos": pa.array([], pa.int64())})
+    teto = pc.quantile(valores, q=[0.99])[0].as_py()
+    largura = _largura_redonda(teto / faixas)
+    inicio = pc.multiply(pc.floor(pc.divide(valores, largura)), largura)
+    inicio = pc.min_element_wise(inicio, largura * math.floor(teto / largura))
+    return contagem(pa.table({"faixa": inicio}), "faixa").sort_by("faixa")
+
+
+def mix_idiomas(tabela):
+    """Candidatos por idioma (um candidato conta em cada idioma que marcou) e sem idioma."""
+    idiomas = contagem(pa.table({"idioma": pc.list_flatten(tabela["idiomas"])}), "idioma")
+    sem_idioma = pc.sum(pc.equal(pc.list_value_length(tabela["idiomas"]), 0)).as_py() or 0
+    return idiomas, sem_idioma
+
+
+def resumo(tabela, limite=15):
+    """Todos os agregados do painel, como tabelas Arrow pequenas."""
+    idiomas, sem_idioma = mix_idiomas(tabela)
+    return {
+        "candidatos": tabela.num_rows,
+        "por_mes": por_mes(tabela),
+        "por_vaga": pretensao_por_vaga(tabela, limite),
+        "por_uf": contagem(tabela, "uf"),
+        "por_cidade": contagem(tabela, "uf", "cidade", limite=limite),
+        "faixas_pretensao": faixas_pretensao(tabela),
+        "escolaridade": contagem(tabela, "escolaridade"),
+        "idiomas": idiomas,
+        "sem_idioma": sem_idioma,
+        "nivel_idioma": contagem(tabela, "nivel_idioma"),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Base analítica (Parquet) das submissões.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    sub.add_parser("sincronizar", help="copia as submissões novas do armazém")
+    sub.add_parser("compactar", help="junta as partes dos meses com muitas partes")
+    p_res = sub.add_parser("resumo", help="mostra os agregados")
+    p_res.add_argument("--desde", help="mês inicial (AAAA-MM)")
+    p_res.add_argument("--ate", help="mês final, inclusivo (AAAA-MM)")
+    p_res.add_argument("--top", type=int, default=10)
+    parser.add_argument("--pasta", default=PASTA_ANALISE)
+    args = parser.parse_args(argv)
+
+    armazem = ArmazemAnalitico(args.pasta)
+    inicio = time.perf_counter()
+    if args.comando == "sincronizar":
+        from submissoes import ArmazemSubmissoes
+
+        n = armazem.sincronizar(ArmazemSubmissoes())
+        print(f"{n} submissões copiadas em {time.perf_counter() - inicio:.1f}s (até o id {armazem.ultimo_id()})",
+              file=sys.stderr)
+        return 0
+    if args.comando == "compactar":
+        armazem.compactar()
+        print(f"{len(armazem.partes())} partes depois da compactação", file=sys.stderr)
+        return 0
+
+    tabela = armazem.ler(desde=args.desde, ate=args.ate)
+    lido = time.perf_counter()
+    agregados = resumo(tabela, args.top)
+    print(f"{tabela.num_rows} candidatos; leitura {(lido - inicio) * 1e3:.0f} ms, "
+          f"agregados {(time.perf_counter() - lido) * 1e3:.0f} ms", file=sys.stderr)
+    for nome in ("por_vaga", "por_uf", "por_cidade", "escolaridade", "idiomas", "nivel_idioma", "por_mes"):
+        print(f"\n{nome}")
+        print(agregados[nome].slice(0, args.top).to_pandas().to_string(index=False))
+    print(f"\nsem idioma: {agregados['sem_idioma']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Endpoint HTTP/JSON para submissões sem passar pela interface Streamlit.
+
+Usa o mesmo pipeline do formulário (`processamento.processar_submissao`):
+validação, registro, PDF e e-mail na fila. Aceita um candidato ou um lote e
+devolve o resultado de cada registro.
+
+    uvicorn api:app --host 0.0.0.0 --port 8600 --workers 4
+
+    POST /candidatos   {...dados_formulario...}  ou  [{...}, {...}]
+    GET  /saude        (fila de e-mails e estado dos disjuntores de ViaCEP/SMTP)
+    GET  /metricas     (formato texto do Prometheus, deste worker)
+
+As datas seguem o formato do formulário (DD/MM/AAAA). Registros recusados na
+validação trazem, além das mensagens em "erros", a lista "campos" com
+{"campo", "mensagem"} (dependentes como "dependentes.0.cpf"). Se API_TOKEN estiver
+configurado, as requisições precisam do cabeçalho `Authorization: Bearer <token>`.
+"""
+import asyncio
+import hmac
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from configuracao import get_secret
+from metricas import TIPO_CONTEUDO, iniciar_exportacao, texto_prometheus
+from processamento import fila_email, processar_submissao
+from resiliencia import estados
+
+log = logging.getLogger(__name__)
+
+API_TOKEN    = get_secret("API_TOKEN")
+API_LOTE_MAX = int(get_secret("API_LOTE_MAX", 500))
+API_THREADS  = int(get_secret("API_THREADS", 16))
+
+# O pipeline é bloqueante (SQLite, ReportLab): roda em threads fora do event loop.
+# Para usar mais núcleos na renderização, suba o uvicorn com --workers.
+_executor = ThreadPoolExecutor(API_THREADS, thread_name_prefix="api-submissao")
+
+
+def _autorizado(request):
+    if not API_TOKEN:
+        return True
+    recebido = request.headers.get("authorization", "")
+    return hmac.compare_digest(recebido.encode(), f"Bearer {API_TOKEN}".encode())
+
+
+def _como_json(resultado):
+    return {
+        "ok": resultado.ok,
+        "protocolo": resultado.protocolo,
+        "etapa": resultado.etapa,
+        "erros": resultado.erros,
+        "campos": [{"campo": e.campo, "mensagem": e.mensagem} for e in resultado.campos],
+    }
+
+
+async def _processar(dados):
+    if not isinstance(dados, dict):
+        return {"ok": False, "protocolo": None, "etapa": "validacao", "erros": ["Registro deve ser um objeto JSON."],
+                "campos": []}
+    loop = asyncio.get_running_loop()
+    try:
+        resultado = await loop.run_in_executor(_executor, processar_submissao, dados)
+    except Exception:
+        log.exception("Falha inesperada ao processar submissão")
+        return {"ok": False, "protocolo": None, "etapa": "erro",
+                "erros": ["Erro ao processar formulário. Tente novamente ou entre em contato conosco."], "campos": []}
+    return _como_json(resultado)
+
+
+async def candidatos(request):
+    if not _autorizado(request):
+        return JSONResponse({"erro": "Não autorizado."}, status_code=401)
+    try:
+        corpo = await request.json()
+    except ValueError:
+        return JSONResponse({"erro": "JSON inválido."}, status_code=400)
+
+    if isinstance(corpo, list):
+        if len(corpo) > API_LOTE_MAX:
+            return JSONResponse({"erro": f"Lote acima do limite de {API_LOTE_MAX} registros."}, status_code=413)
+        resultados = await asyncio.gather(*(_processar(dados) for dados in corpo))
+        return JSONResponse({
+            "total": len(resultados),
+            "aceitos": sum(r["ok"] for r in resultados),
+            "resultados": resultados,
+        })
+
+    resultado = await _processar(corpo)
+    if resultado["ok"]:
+        status = 200 if resultado["etapa"] == "duplicada" else 201
+    elif resultado["etapa"] == "validacao":
+        status = 422
+    elif resultado["etapa"] == "em_andamento":
+        status = 409
+    else:
+        status = 503
+    return JSONResponse(resultado, status_code=status)
+
+
+async def saude(request):
+    return JSONResponse({"ok": True, "fila_email": fila_email().contagem(), "disjuntores": estados()})
+
+
+async def metricas(request):
+    return Response(texto_prometheus(), media_type=TIPO_CONTEUDO)
+
+
+app = Starlette(routes=[
+    Route("/candidatos", candidatos, methods=["POST"]),
+    Route("/saude", saude, methods=["GET"]),
+    Route("/metricas", metricas, methods=["GET"]),
+])
+
+iniciar_exportacao()
@@ -0,0 +1,103 @@
+"""Latência da busca de candidatos (`ArmazemSubmissoes.buscar`) com muitos registros.
+
+Popula um banco temporário com N candidatos sintéticos pelo mesmo caminho de
+gravação do armazém (submissão + índice na mesma transação) e mede as
+consultas típicas do RH.
+
+    python -m benchmarks.bench_busca [-N 300000] [-n 200]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+_tmp = tempfile.mkdtemp(prefix="bench_busca_")
+os.environ.setdefault("PASTA_DADOS", _tmp)
+
+from submissoes import CAMPOS_BUSCA, ArmazemSubmissoes, _Pedido  # noqa: E402
+
+NOMES = ("Ana", "Beatriz", "Carlos", "Débora", "Eduardo", "Fábio", "Gabriela", "Heitor", "Íris", "João",
+         "Júlia", "Lucas", "Márcia", "Nicolas", "Otávio", "Patrícia", "Rafael", "Sofia", "Tiago", "Vitória")
+SOBRENOMES = ("Silva", "Souza", "Oliveira", "Santos", "Lima", "Conceição", "Araújo", "Gonçalves", "Pereira",
+              "Ribeiro", "Carvalho", "Gomes", "Martins", "Rocha", "Almeida", "Nascimento", "Barbosa", "Melo")
+CARGOS = ("Analista de Marketing", "Assistente Administrativo", "Corretor de Seguros", "Desenvolvedor Python",
+          "Gerente de Projetos", "Atendente", "Analista Financeiro", "Estagiário de TI")
+CIDADES = (("São Paulo", "SP"), ("Campinas", "SP"), ("Rio de Janeiro", "RJ"), ("Niterói", "RJ"),
+           ("Belo Horizonte", "MG"), ("Curitiba", "PR"), ("Porto Alegre", "RS"), ("Salvador", "BA"),
+           ("Recife", "PE"), ("Goiânia", "GO"), ("Florianópolis", "SC"), ("Brasília", "DF"))
+ESCOLARIDADES = ("Ensino Fundamental", "Ensino Médio", "Ensino Superior Incompleto",
+                 "Ensino Superior Completo", "Pós-graduação")
+
+
+def candidato(rng, i):
+    cidade, uf = rng.choice(CIDADES)
+    return {
+        "nome": f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)} {rng.choice(SOBRENOMES)}",
+        "cpf": f"{i:011d}",
+        "vaga": f"{rng.choice(CARGOS)} - {rng.choice(CIDADES)[0]}",
+        "cidade": cidade, "uf_endereco": uf,
+        "escolaridade": rng.choice(ESCOLARIDADES),
+        "email": f"candidato{i}@exemplo.com",
+    }
+
+
+def popular(armazem, total, lote=10_000):
+    """Grava `total` candidatos em transações de `lote` (bem mais rápido que o group commit)."""
+    rng = random.Random(42)
+    con = armazem._conectar()
+    con.execute("PRAGMA synchronous=OFF")
+    for inicio in range(0, total, lote):
+        con.execute("BEGIN")
+        agora = time.time()
+        for i in range(inicio, min(total, inicio + lote)):
+            dados = candidato(rng, i)
+            pedido = _Pedido(("2026-01-01T00:00:00", dados["cpf"], dados["nome"], dados["vaga"],
+                              json.dumps(dados, ensure_ascii=False)),
+                             busca=tuple(dados.get(c) for c in CAMPOS_BUSCA.values()))
+            ArmazemSubmissoes._inserir(con, pedido, agora)
+        con.execute("COMMIT")
+    con.close()
+
+
+CONSULTAS = {
+    "cpf": dict(cpf=f"{123_456:011d}"),
+    "nome prefixo (raro)": dict(nome="otav conc gonç"),
+    "nome prefixo (comum)": dict(nome="ana"),
+    "nome + uf": dict(nome="jul silv", uf="rj"),
+    "vaga": dict(vaga="python"),
+    "cidade + escolaridade": dict(cidade="sao paulo", escolaridade="pos graduacao"),
+    "vaga + uf + escolaridade": dict(vaga="seguros", uf="mg", escolaridade="medio"),
+    "sem resultado": dict(nome="zzzz"),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-N", "--candidatos", type=int, default=300_000)
+    parser.add_argument("-n", "--repeticoes", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    armazem = ArmazemSubmissoes(os.path.join(_tmp, "busca.db"))
+    inicio = time.perf_counter()
+    popular(armazem, args.candidatos)
+    print(f"{args.candidatos:,} candidatos gravados e indexados em {time.perf_counter() - inicio:.1f}s",
+          file=sys.stderr)
+
+    print(f"{'consulta':<28} {'mediana (ms)':>13} {'p99 (ms)':>10} {'resultados':>11}")
+    for nome, termos in CONSULTAS.items():
+        tempos = []
+        for _ in range(args.repeticoes):
+            t0 = time.perf_counter()
+            resultados = armazem.buscar(**termos)
+            tempos.append(time.perf_counter() - t0)
+        tempos.sort()
+        p99 = tempos[int(0.99 * (len(tempos) - 1))]
+        print(f"{nome:<28} {statistics.median(tempos) * 1e3:>13.2f} {p99 * 1e3:>10.2f} {len(resultados):>11}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""Equivalência e speedup de `validar_cpfs` (NumPy) frente a `validar_cpf`.
+
+Rodar a partir da raiz do repositório:
+
+    python -m benchmarks.bench_cpf [n]
+"""
+import random
+import sys
+import time
+
+from validacao import validar_cpf, validar_cpfs
+
+
+def gerar_cpf(rng, valido=True):
+    base = [rng.randrange(10) for _ in range(9)]
+    for pesos in (range(10, 1, -1), range(11, 1, -1)):
+        base.append(sum(d * p for d, p in zip(base, pesos)) * 10 % 11 % 10)
+    if not valido:
+        base[rng.randrange(11)] = (base[-1] + 1) % 10
+    return "".join(map(str, base))
+
+
+def amostra(n, semente=42):
+    """CPFs válidos, inválidos, formatados e casos de borda misturados."""
+    rng = random.Random(semente)
+    bordas = ["", None, "123", "0" * 11, "1" * 11, "529.982.247-25", "52998224725", " 529982247-25 ",
+              "5299822472", "529982247250", "abc52998224725", "٥٢٩٩٨٢٢٤٧٢٥"]
+    cpfs = []
+    for i in range(n):
+        sorteio = rng.random()
+        if sorteio < 0.05:
+            cpfs.append(rng.choice(bordas))
+        elif sorteio < 0.15:
+            c = gerar_cpf(rng)
+            cpfs.append(f"{c[:3]}.{c[3:6]}.{c[6:9]}-{c[9:]}")
+        else:
+            cpfs.append(gerar_cpf(rng, valido=sorteio < 0.6))
+    return cpfs
+
+
+def main(n=200_000):
+    cpfs = amostra(n)
+
+    inicio = time.perf_counter()
+    escalar = [validar_cpf(c) for c in cpfs]
+    t_escalar = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    vetorizado = validar_cpfs(cpfs)
+    t_vetorizado = time.perf_counter() - inicio
+
+    divergentes = [c for c, a, b in zip(cpfs, escalar, vetorizado) if a != b]
+    if divergentes:
+        raise SystemExit(f"validar_cpfs diverge de validar_cpf em {len(divergentes)} casos, ex.: {divergentes[:5]}")
+
+    print(f"{n} CPFs ({sum(escalar)} válidos) — resultados idênticos")
+    print(f"validar_cpf  (escalar):    {t_escalar * 1e3:8.1f} ms  ({n / t_escalar:,.0f}/s)")
+    print(f"validar_cpfs (vetorizado): {t_vetorizado * 1e3:8.1f} ms  ({n / t_vetorizado:,.0f}/s)")
+    print(f"speedup: {t_escalar / t_vetorizado:.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
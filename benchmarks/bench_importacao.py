@@ -0,0 +1,135 @@
+"""Custo de partida (imports) do formulário, do pipeline de envio, da API e do trabalhador.
+
+Cada cenário roda num processo Python novo com `-X importtime`. O Streamlit
+(e a leitura dos secrets) já está carregado antes da medição, porque o
+servidor paga isso uma vez antes da primeira sessão. O que se mede é o que o
+nosso código acrescenta. Para o formulário valem os imports de nível de
+módulo de Formulario_RH.py, lidos do próprio arquivo. Os imports feitos
+dentro de funções (o envio) ficam no cenário "envio".
+
+Observação: o `page_icon`/`st.image` com arquivo faz o próprio Streamlit
+importar NumPy e PIL na primeira tela; isso fica fora desta conta.
+
+    python -m benchmarks.bench_importacao [-n 5] [--top 15] [--limite-ms 150] [-o partida.json]
+
+Com --limite-ms, sai com código 1 se a mediana do cenário "formulario"
+passar do limite.
+"""
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MARCA = "@@inicio-medicao"
+
+PREPARO = f"""
+import sys, time
+import streamlit as st
+try:
+    "_" in st.secrets
+except Exception:
+    pass
+sys.stderr.write("{MARCA}\\n")
+sys.stderr.flush()
+"""
+
+
+def imports_de_modulo(caminho):
+    """Módulos importados no nível de módulo do script (os de dentro de funções ficam de fora)."""
+    with open(caminho, encoding="utf-8") as f:
+        arvore = ast.parse(f.read())
+    modulos = []
+    for no in arvore.body:
+        if isinstance(no, ast.Import):
+            modulos.extend(a.name for a in no.names)
+        elif isinstance(no, ast.ImportFrom) and no.module and not no.level:
+            modulos.append(no.module)
+    return [m for m in dict.fromkeys(modulos) if m.split(".")[0] != "streamlit"]
+
+
+def cenarios():
+    formulario = imports_de_modulo(os.path.join(RAIZ, "Formulario_RH.py"))
+    return {
+        "formulario": formulario,
+        "envio": ["processamento"],
+        "api": ["api"],
+        "trabalhador": ["fila_email"],
+    }
+
+
+def medir_uma_vez(modulos):
+    """Roda um processo novo; retorna (ms totais, [(ms cumulativos, módulo)] dos imports de 1º nível)."""
+    codigo = PREPARO + f"""
+inicio = time.perf_counter()
+for m in {modulos!r}:
+    __import__(m)
+print((time.perf_counter() - inicio) * 1e3)
+"""
+    env = {**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo], cwd=RAIZ, env=env,
+                          capture_output=True, text=True, check=True)
+    linhas = proc.stderr.split(MARCA, 1)[1].splitlines()
+    modulos_medidos = []
+    for linha in linhas:
+        if not linha.startswith("import time:"):
+            continue
+        _, cumulativo, nome = linha.split("|")
+        # Nível de aninhamento = recuo do nome (2 espaços por nível)
+        nivel = (len(nome) - len(nome.lstrip()) - 1) // 2
+        if nivel <= 1 and cumulativo.strip().isdigit():
+            modulos_medidos.append((int(cumulativo) / 1e3, nivel, nome.strip()))
+    return float(proc.stdout.strip().splitlines()[-1]), modulos_medidos
+
+
+def medir(modulos, repeticoes):
+    totais, por_modulo = [], {}
+    for _ in range(repeticoes):
+        total, medidos = medir_uma_vez(modulos)
+        totais.append(total)
+        for ms, nivel, nome in medidos:
+            por_modulo.setdefault((nivel, nome), []).append(ms)
+    return {
+        "mediana_ms": round(statistics.median(totais), 1),
+        "minimo_ms": round(min(totais), 1),
+        "modulos": sorted(
+            ({"modulo": nome, "nivel": nivel, "ms": round(statistics.median(v), 1)}
+             for (nivel, nome), v in por_modulo.items()),
+            key=lambda m: -m["ms"],
+        ),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--repeticoes", type=int, default=5, help="processos por cenário")
+    parser.add_argument("--top", type=int, default=12, help="módulos mais caros listados por cenário")
+    parser.add_argument("--limite-ms", type=float, help="falha se o cenário formulario passar disso (mediana)")
+    parser.add_argument("-o", "--saida", help="grava os resultados em JSON")
+    args = parser.parse_args(argv)
+
+    resultados = {}
+    for nome, modulos in cenarios().items():
+        r = resultados[nome] = {"importa": modulos, **medir(modulos, args.repeticoes)}
+        print(f"\n{nome}: mediana {r['mediana_ms']:.1f} ms (mín. {r['minimo_ms']:.1f})  <- {', '.join(modulos)}")
+        for m in r["modulos"][:args.top]:
+            print(f"  {m['ms']:>8.1f} ms  {'  ' * m['nivel']}{m['modulo']}")
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+
+    if args.limite_ms is not None:
+        mediana = resultados["formulario"]["mediana_ms"]
+        if mediana > args.limite_ms:
+            print(f"\nPartida do formulário acima do limite: {mediana:.1f} ms > {args.limite_ms:.1f} ms", file=sys.stderr)
+            return 1
+        print(f"\nPartida do formulário dentro do limite: {mediana:.1f} ms <= {args.limite_ms:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
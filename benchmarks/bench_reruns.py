@@ -0,0 +1,158 @@
+"""Custo de rerun por interação no formulário: tempo de script e bytes enviados ao navegador.
+
+Dirige o script real pelo AppTest do Streamlit, com um ScriptRunner que (a)
+respeita reruns com escopo de fragmento, como o runtime faz quando o widget
+está dentro de um `@st.fragment`, e (b) soma o tamanho serializado dos
+ForwardMsg emitidos em cada execução, que é o que vai pelo websocket. O
+ViaCEP é substituído por um stub local.
+
+    python -m benchmarks.bench_reruns [--script Formulario_RH.py] [-n 20]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+_tmp = tempfile.mkdtemp(prefix="bench_reruns_")
+os.environ.setdefault("PASTA_DADOS", _tmp)
+os.environ.setdefault("CEP_INDICE", os.path.join(_tmp, "sem_indice.idx"))
+
+from streamlit.runtime.scriptrunner import RerunData, ScriptRunnerEvent  # noqa: E402
+from streamlit.runtime.scriptrunner_utils.script_requests import ScriptRequests  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+from streamlit.testing.v1 import app_test as _app_test  # noqa: E402
+from streamlit.testing.v1.local_script_runner import LocalScriptRunner, require_widgets_deltas  # noqa: E402
+from streamlit.testing.v1.element_tree import parse_tree_from_messages  # noqa: E402
+
+from benchmarks.stubs import ViaCEPStub  # noqa: E402
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class RunnerMedido(LocalScriptRunner):
+    """LocalScriptRunner com rerun por fragmento e medição de bytes/tempo."""
+
+    fragmento = None          # fragment_id da próxima execução (None = script inteiro)
+    widget_fragmento = {}     # id do widget -> fragment_id em que foi renderizado
+    ultima = None             # (segundos de script, bytes, nº de mensagens)
+    mensagens = []            # ForwardMsgs da árvore atual (o que o navegador está exibindo)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._bytes = self._msgs = 0
+        self._inicio = self._fim = None
+        self._enfileirar = enfileirar = self.forward_msg_queue.enqueue
+
+        def medir(msg):
+            self._bytes += msg.ByteSize()
+            self._msgs += 1
+            if msg.HasField("delta") and msg.delta.HasField("new_element"):
+                elemento = msg.delta.new_element
+                tipo = elemento.WhichOneof("type")
+                widget_id = getattr(getattr(elemento, tipo), "id", None) if tipo else None
+                if widget_id:
+                    RunnerMedido.widget_fragmento[widget_id] = msg.delta.fragment_id or None
+            enfileirar(msg)
+
+        self.forward_msg_queue.enqueue = medir
+
+        def cronometrar(sender, event, **_):
+            if event == ScriptRunnerEvent.SCRIPT_STARTED:
+                self._inicio = time.perf_counter()
+            elif event in (ScriptRunnerEvent.SCRIPT_STOPPED_WITH_SUCCESS,
+                           ScriptRunnerEvent.SCRIPT_STOPPED_WITH_COMPILE_ERROR,
+                           ScriptRunnerEvent.FRAGMENT_STOPPED_WITH_SUCCESS,
+                           ScriptRunnerEvent.SCRIPT_STOPPED_FOR_RERUN):
+                self._fim = time.perf_counter()
+
+        self.on_event.connect(cronometrar, weak=False)
+
+    def run(self, widget_state=None, query_params=None, timeout=3, page_hash=""):
+        fragmento = RunnerMedido.fragmento
+        # O construtor já deixa um rerun completo pendente, que absorveria o
+        # rerun do fragmento: descartamos antes de pedir o nosso.
+        self._requests = ScriptRequests()
+        if fragmento:
+            # Cada execução do AppTest começa com uma fila vazia; o navegador
+            # mantém o resto da página, então partimos da árvore anterior (sem medir).
+            for msg in RunnerMedido.mensagens:
+                self._enfileirar(msg)
+        self.request_rerun(RerunData(
+            widget_states=widget_state,
+            page_script_hash=page_hash,
+            fragment_id_queue=[fragmento] if fragmento else [],
+        ))
+        try:
+            if not self._script_thread:
+                self.start()
+            require_widgets_deltas(self, timeout)
+        finally:
+            self.join()
+        RunnerMedido.ultima = (self._fim - self._inicio, self._bytes, self._msgs)
+        RunnerMedido.mensagens = self.forward_msgs()
+        return parse_tree_from_messages(self.forward_msgs())
+
+
+def _widget(lista, rotulo):
+    return next(w for w in lista if w.label.startswith(rotulo))
+
+
+def _executar(at, widget=None):
+    """Roda o app; se o widget está num fragmento, só o fragmento é reexecutado."""
+    RunnerMedido.fragmento = RunnerMedido.widget_fragmento.get(widget.id) if widget is not None else None
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return RunnerMedido.ultima
+
+
+def _submeter_se_em_form(at, widget):
+    """Dentro de st.form a mudança só vale no submit: clica o "Buscar CEP" do mesmo form."""
+    if not getattr(widget, "form_id", ""):
+        return widget
+    return next(b for b in at.button if b.form_id == widget.form_id and b.label == "Buscar CEP").click()
+
+
+INTERACOES = {
+    "Buscar CEP": lambda at: (
+        _widget(at.text_input, "CEP (somente").input("01001000"),
+        _widget(at.button, "Buscar CEP").click(),
+    )[-1],
+    "Adicionar dependente": lambda at: _submeter_se_em_form(
+        at, _widget(at.number_input, "Quantidade de Dependentes IR").increment()),
+}
+
+
+def medir(script, repeticoes):
+    _app_test.LocalScriptRunner = RunnerMedido
+    at = AppTest.from_file(script, default_timeout=60)
+    resultados = {"Carga inicial": [_executar(at)]}
+    _executar(at, _submeter_se_em_form(at, _widget(at.number_input, "Número de Filhos").set_value(50)))
+    for nome, interagir in INTERACOES.items():
+        amostras = resultados.setdefault(nome, [])
+        for _ in range(repeticoes):
+            amostras.append(_executar(at, interagir(at)))
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--script", default=os.path.join(RAIZ, "Formulario_RH.py"))
+    parser.add_argument("-n", "--repeticoes", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with ViaCEPStub() as stub:
+        os.environ["VIACEP_URL"] = stub.url
+        resultados = medir(os.path.abspath(args.script), args.repeticoes)
+
+    print(f"{'interação':<22} {'script (ms)':>12} {'bytes/rerun':>12} {'mensagens':>10}")
+    for nome, amostras in resultados.items():
+        tempos, tamanhos, msgs = zip(*amostras)
+        print(f"{nome:<22} {statistics.median(tempos) * 1e3:>12.1f} "
+              f"{statistics.median(tamanhos):>12,.0f} {statistics.median(msgs):>10.0f}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
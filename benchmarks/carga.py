@@ -0,0 +1,312 @@
+"""Teste de carga: N usuários simultâneos contra um `streamlit run` real.
+
+Sobe o `Formulario_RH.py` num servidor Streamlit local (ou usa --url) e abre N
+sessões pelo mesmo websocket que o navegador usa (`/_stcore/stream`, BackMsg
+e ForwardMsg em protobuf). Cada sessão se comporta como um candidato: abre a
+página, digita o CEP e clica em "Buscar CEP", preenche os campos um a um (cada
+campo confirmado é um rerun do fragmento, como no navegador; um campo dentro de
+um st.form só iria ao servidor no envio), marca o consentimento e envia. ViaCEP
+e SMTP são servidores locais com latência configurável, e cada candidato usa um
+CEP diferente.
+
+Reporta vazão, percentis de latência por etapa e o RSS do processo servidor,
+para dimensionar réplicas.
+
+    python -m benchmarks.carga -u 20 --duracao 60 --latencia-cep 0.15 --latencia-smtp 0.3
+"""
+import argparse
+import asyncio
+import math
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+from itertools import count
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from websockets.asyncio.client import connect
+
+from benchmarks.stubs import SMTPSink, ViaCEPStub
+from benchmarks.suite import TIPICO
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ETAPAS = ("carga", "buscar_cep", "campo", "envio", "candidato")
+
+# Campos preenchidos por candidato, na ordem da página (chave do widget -> valor)
+CAMPOS = {
+    "vaga": TIPICO["vaga"], "nome": TIPICO["nome"], "cpf": TIPICO["cpf"],
+    "identidade": TIPICO["identidade"], "orgao_expedidor": TIPICO["orgao_expedidor"], "uf_rg": "SP",
+    "numero": TIPICO["numero"], "complemento": TIPICO["complemento"],
+    "telefone": TIPICO["telefone"], "email": TIPICO["email"],
+    "ultimo_emprego": TIPICO["ultimo_emprego"], "ultimo_cargo": TIPICO["ultimo_cargo"],
+    "atividades_ultimo_cargo": TIPICO["atividades_ultimo_cargo"], "motivo_saida": TIPICO["motivo_saida"],
+    "curso": TIPICO["curso"], "instituicao": TIPICO["instituicao"], "consentiu": True,
+}
+
+_FIM_DE_EXECUCAO = (
+    ForwardMsg.ScriptFinishedStatus.FINISHED_SUCCESSFULLY,
+    ForwardMsg.ScriptFinishedStatus.FINISHED_FRAGMENT_RUN_SUCCESSFULLY,
+    ForwardMsg.ScriptFinishedStatus.FINISHED_WITH_COMPILE_ERROR,
+)
+
+
+def _estado(widget_id, valor):
+    estado = WidgetState(id=widget_id)
+    if isinstance(valor, bool):
+        estado.bool_value = valor
+    else:
+        estado.string_value = str(valor)
+    return estado
+
+
+class SessaoStreamlit:
+    """Cliente mínimo do protocolo do navegador: reruns com estado de widgets."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.widgets = {}   # chave (ou rótulo, se sem chave) -> (id, fragment_id)
+        self.forms = {}     # chave -> form_id, para os widgets dentro de um st.form
+        self.estados = {}   # id -> WidgetState com o último valor enviado
+
+    def _registrar(self, msg, alertas, erros):
+        if not (msg.HasField("delta") and msg.delta.HasField("new_element")):
+            return
+        elemento = msg.delta.new_element
+        tipo = elemento.WhichOneof("type")
+        proto = getattr(elemento, tipo)
+        if tipo == "alert":
+            alertas.append(proto.body)
+        elif tipo == "exception":
+            erros.append(f"{proto.type}: {proto.message}")
+        widget_id = getattr(proto, "id", "")
+        if widget_id:
+            chave = widget_id.split("-", 2)[2] if widget_id.startswith("$$ID-") else "None"
+            # sem key (e o submit de um st.form, "FormSubmitter:<form>-<rótulo>"): pelo rótulo
+            nome = proto.label if chave == "None" or chave.startswith("FormSubmitter:") else chave
+            self.widgets[nome] = (widget_id, msg.delta.fragment_id)
+            if getattr(proto, "form_id", ""):
+                self.forms[nome] = proto.form_id
+
+    def preencher(self, valores):
+        """Muda widgets de um st.form sem rerun: o navegador só manda os valores no submit."""
+        for chave, valor in valores.items():
+            self.estados[self.widgets[chave][0]] = _estado(self.widgets[chave][0], valor)
+
+    async def rerun(self, valores=None, gatilho=None):
+        """Pede um rerun (do fragmento do widget, se houver) e espera terminar.
+
+        Devolve os textos dos alertas (st.success/st.error/...) exibidos.
+        """
+        fragmento = ""
+        for chave, valor in (valores or {}).items():
+            widget_id, fragmento = self.widgets[chave]
+            self.estados[widget_id] = _estado(widget_id, valor)
+        msg = BackMsg()
+        msg.rerun_script.widget_states.widgets.extend(self.estados.values())
+        if gatilho is not None:
+            widget_id, fragmento = self.widgets[gatilho]
+            msg.rerun_script.widget_states.widgets.add(id=widget_id, trigger_value=True)
+        msg.rerun_script.fragment_id = fragmento
+        await self.ws.send(msg.SerializeToString())
+
+        alertas, erros = [], []
+        async for dados in self.ws:
+            resposta = ForwardMsg()
+            resposta.ParseFromString(dados)
+            self._registrar(resposta, alertas, erros)
+            if resposta.HasField("script_finished") and resposta.script_finished in _FIM_DE_EXECUCAO:
+                break
+        if erros:
+            raise RuntimeError(erros[0])
+        return alertas
+
+
+class Usuario:
+    """Candidatos em sequência até o prazo (ou `limite` candidatos)."""
+
+    def __init__(self, url, prazo, ceps, limite=None, pausa=0.0):
+        self.url = url
+        self.prazo = prazo
+        self.ceps = ceps
+        self.limite = limite
+        self.pausa = pausa
+        self.latencias = defaultdict(list)
+        self.enviados = 0
+        self.falhas = []
+
+    async def _medir(self, etapa, aguardavel):
+        inicio = time.perf_counter()
+        resultado = await aguardavel
+        self.latencias[etapa].append(time.perf_counter() - inicio)
+        if self.pausa:
+            await asyncio.sleep(self.pausa)
+        return resultado
+
+    async def candidato(self):
+        inicio = time.perf_counter()
+        async with connect(self.url, subprotocols=["streamlit"], max_size=None, open_timeout=60) as ws:
+            sessao = SessaoStreamlit(ws)
+            await self._medir("carga", sessao.rerun())
+            await self._medir("buscar_cep", sessao.rerun({"cep": next(self.ceps)}, gatilho="Buscar CEP"))
+            for chave, valor in CAMPOS.items():
+                if chave in sessao.forms:
+                    sessao.preencher({chave: valor})
+                else:
+                    await self._medir("campo", sessao.rerun({chave: valor}))
+            alertas = await self._medir("envio", sessao.rerun(gatilho="Enviar Formulário"))
+        self.latencias["candidato"].append(time.perf_counter() - inicio)
+        if not any("enviado com sucesso" in a for a in alertas):
+            raise RuntimeError(" | ".join(alertas) or "envio sem confirmação")
+
+    async def executar(self):
+        while time.monotonic() < self.prazo and (self.limite is None or self.enviados + len(self.falhas) < self.limite):
+            try:
+                await self.candidato()
+            except Exception as e:
+                self.falhas.append(f"{type(e).__name__}: {e}")
+            else:
+                self.enviados += 1
+
+
+def rss_kb(pid):
+    """RSS atual do processo em KiB (Linux), ou None se indisponível."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for linha in f:
+                if linha.startswith("VmRSS:"):
+                    return int(linha.split()[1])
+    except OSError:
+        return None
+
+
+async def amostrar_rss(pid, amostras, intervalo=0.5):
+    while True:
+        valor = rss_kb(pid)
+        if valor:
+            amostras.append(valor)
+        await asyncio.sleep(intervalo)
+
+
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def subir_servidor(script, viacep, sink):
+    """`streamlit run` do formulário apontando para os stubs; devolve (processo, url ws)."""
+    porta = porta_livre()
+    tmp = tempfile.mkdtemp(prefix="bench_carga_")
+    env = {
+        **os.environ,
+        "PASTA_DADOS": tmp,
+        "CEP_INDICE": os.path.join(tmp, "sem_indice.idx"),
+        "CEP_CACHE": "memoria",
+        "VIACEP_URL": viacep.url,
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(sink.porta),
+        "SMTP_STARTTLS": "0",
+        "EMAIL_APP_PASSWORD": "bench",
+    }
+    processo = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", script, "--server.headless=true",
+         "--server.address=127.0.0.1", f"--server.port={porta}", "--server.fileWatcherType=none",
+         "--browser.gatherUsageStats=false"],
+        cwd=os.path.dirname(script), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    prazo = time.monotonic() + 60
+    while time.monotonic() < prazo:
+        if processo.poll() is not None:
+            raise RuntimeError(f"streamlit run saiu com código {processo.returncode}: {processo.stderr.read().decode()}")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{porta}/_stcore/health", timeout=1)
+            return processo, f"ws://127.0.0.1:{porta}/_stcore/stream"
+        except OSError:
+            time.sleep(0.2)
+    processo.kill()
+    raise RuntimeError("servidor Streamlit não respondeu em 60s")
+
+
+async def carga(args, url, pid):
+    ceps = (f"0{n:07d}" for n in count(1_000_000))
+    rss = []
+    amostrador = asyncio.create_task(amostrar_rss(pid, rss)) if pid else None
+
+    # Aquecimento: a 1ª sessão paga imports (ReportLab, fila, armazém)
+    await Usuario(url, float("inf"), ceps, limite=1).executar()
+    rss_inicial = rss_kb(pid) if pid else None
+
+    inicio = time.monotonic()
+    usuarios = [Usuario(url, inicio + args.duracao, ceps, args.candidatos, args.pausa) for _ in range(args.usuarios)]
+    await asyncio.gather(*(u.executar() for u in usuarios))
+    decorrido = time.monotonic() - inicio
+    if amostrador:
+        amostrador.cancel()
+    return usuarios, decorrido, rss_inicial, max(rss, default=None)
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[max(math.ceil(p * len(valores)) - 1, 0)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do formulário com usuários simultâneos.")
+    parser.add_argument("-u", "--usuarios", type=int, default=10, help="sessões simultâneas")
+    parser.add_argument("--duracao", type=float, default=30, help="segundos de carga")
+    parser.add_argument("--candidatos", type=int, help="para cada usuário após N candidatos")
+    parser.add_argument("--pausa", type=float, default=0.0, help="tempo de digitação entre interações (s)")
+    parser.add_argument("--latencia-cep", type=float, default=0.1, help="latência do ViaCEP local (s)")
+    parser.add_argument("--latencia-smtp", type=float, default=0.2, help="latência do SMTP local por mensagem (s)")
+    parser.add_argument("--script", default=os.path.join(RAIZ, "Formulario_RH.py"))
+    parser.add_argument("--url", help="websocket de um servidor já rodando (sem stubs nem RSS)")
+    args = parser.parse_args(argv)
+
+    with ViaCEPStub(args.latencia_cep) as viacep, SMTPSink(args.latencia_smtp) as sink:
+        processo = None
+        if args.url:
+            url, pid = args.url, None
+        else:
+            processo, url = subir_servidor(os.path.abspath(args.script), viacep, sink)
+            pid = processo.pid
+        try:
+            usuarios, decorrido, rss_inicial, rss_pico = asyncio.run(carga(args, url, pid))
+            enviados = sum(u.enviados for u in usuarios)
+            fim = time.monotonic()
+            entregues = sink.aguardar(enviados + 1, timeout=60) if processo else None  # +1: aquecimento
+            drenagem = time.monotonic() - fim
+        finally:
+            if processo:
+                processo.terminate()
+                processo.wait(10)
+
+    falhas = [f for u in usuarios for f in u.falhas]
+    print(f"{args.usuarios} usuários, {decorrido:.1f}s, ViaCEP +{args.latencia_cep * 1e3:.0f}ms, "
+          f"SMTP +{args.latencia_smtp * 1e3:.0f}ms, pausa {args.pausa * 1e3:.0f}ms")
+    print(f"candidatos enviados: {enviados} ({enviados / decorrido:.2f}/s), falhas: {len(falhas)}")
+    if processo:
+        print(f"e-mails entregues ao SMTP: {len(sink.mensagens) - 1}"
+              + ("" if entregues else " (fila não drenou em 60s)") + f", drenagem após a carga: {drenagem:.1f}s")
+        print(f"RSS do servidor: após aquecimento {rss_inicial / 1024:.0f} MiB, pico {rss_pico / 1024:.0f} MiB")
+    print(f"\n{'etapa':<12} {'n':>6} {'p50 (ms)':>10} {'p90 (ms)':>10} {'p99 (ms)':>10} {'máx (ms)':>10}")
+    for etapa in ETAPAS:
+        valores = [v for u in usuarios for v in u.latencias[etapa]]
+        if not valores:
+            continue
+        print(f"{etapa:<12} {len(valores):>6} {statistics.median(valores) * 1e3:>10.0f} "
+              f"{percentil(valores, 0.9) * 1e3:>10.0f} {percentil(valores, 0.99) * 1e3:>10.0f} "
+              f"{max(valores) * 1e3:>10.0f}")
+    for falha in sorted(set(falhas))[:10]:
+        print(f"falha: {falha}", file=sys.stderr)
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,158 @@
+"""Servidores locais que substituem dependências externas nos benchmarks."""
+import json
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _ViaCEPHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        servidor = self.server
+        servidor.requisicoes += 1
+        if servidor.latencia:
+            time.sleep(servidor.latencia)
+        partes = self.path.strip("/").split("/")  # ws/<cep>/json
+        cep = partes[1] if len(partes) >= 2 else ""
+        if not (len(cep) == 8 and cep.isdigit()):
+            self._responder(400, b"Bad Request")
+            return
+        if cep.startswith("9"):
+            corpo = {"erro": "true"}
+        else:
+            corpo = {
+                "cep": f"{cep[:5]}-{cep[5:]}",
+                "logradouro": "Praça da Sé",
+                "bairro": "Sé",
+                "localidade": "São Paulo",
+                "uf": "SP",
+            }
+        self._responder(200, json.dumps(corpo, ensure_ascii=False).encode("utf-8"))
+
+    def _responder(self, status, corpo):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+
+class ViaCEPStub(ThreadingHTTPServer):
+    """Imita o ViaCEP: CEPs começando com 9 "não existem"; o resto é a Praça da Sé."""
+
+    daemon_threads = True
+
+    def __init__(self, latencia=0.0):
+        super().__init__(("127.0.0.1", 0), _ViaCEPHandler)
+        self.latencia = latencia
+        self.requisicoes = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, name="viacep-stub", daemon=True).start()
+        return self
+
+    def __exit__(self, *_):
+        self.shutdown()
+        self.server_close()
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """SMTP mínimo (EHLO, AUTH, MAIL, RCPT, DATA, RSET, NOOP, QUIT), sem TLS."""
+
+    disable_nagle_algorithm = True
+
+    def _responder(self, linha):
+        self.wfile.write(linha.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        self._responder("220 sink ESMTP")
+        remetente, destinatarios = None, []
+        while True:
+            linha = self.rfile.readline()
+            if not linha:
+                return
+            comando = linha.decode("ascii", "replace").strip()
+            verbo = comando.split(" ", 1)[0].upper()
+            if verbo in ("EHLO", "HELO"):
+                self.wfile.write(b"250-sink\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n")
+            elif verbo == "AUTH":
+                # Aceita qualquer credencial; lê as linhas que o mecanismo ainda deve
+                # (LOGIN: usuário e senha; PLAIN: o token, se não veio no comando)
+                partes = comando.split()
+                mecanismo = partes[1].upper() if len(partes) > 1 else ""
+                for _ in range((2 if mecanismo == "LOGIN" else 1) - (len(partes) > 2)):
+                    self._responder("334 ")
+                    self.rfile.readline()
+                self._responder("235 ok")
+            elif verbo == "MAIL":
+                remetente, destinatarios = comando[10:].strip("<> "), []
+                self._responder("250 ok")
+            elif verbo == "RCPT":
+                destinatarios.append(comando[8:].strip("<> "))
+                self._responder("250 ok")
+            elif verbo == "DATA":
+                self._responder("354 fim com <CRLF>.<CRLF>")
+                partes = []
+                for bruta in self.rfile:
+                    if bruta in (b".\r\n", b".\n"):
+                        break
+                    partes.append(bruta[1:] if bruta.startswith(b"..") else bruta)
+                self.server.receber(remetente, destinatarios, b"".join(partes))
+                self._responder("250 ok")
+            elif verbo in ("RSET", "NOOP"):
+                self._responder("250 ok")
+            elif verbo == "QUIT":
+                self._responder("221 tchau")
+                return
+            else:
+                self._responder("502 não implementado")
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """Servidor SMTP local que aceita tudo e guarda as mensagens recebidas.
+
+    Não oferece STARTTLS: o cliente deve usar SMTP_STARTTLS=0.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, latencia=0.0):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.latencia = latencia
+        self.mensagens = []
+        self._recebida = threading.Condition()
+
+    @property
+    def porta(self):
+        return self.server_address[1]
+
+    def receber(self, remetente, destinatarios, conteudo):
+        if self.latencia:
+            time.sleep(self.latencia)
+        with self._recebida:
+            self.mensagens.append((remetente, destinatarios, conteudo))
+            self._recebida.notify_all()
+
+    def aguardar(self, quantidade, timeout=30):
+        """Espera até ter recebido `quantidade` mensagens; retorna se conseguiu."""
+        with self._recebida:
+            return self._recebida.wait_for(lambda: len(self.mensagens) >= quantidade, timeout)
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, name="smtp-sink", daemon=True).start()
+        return self
+
+    def __exit__(self, *_):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,248 @@
+"""Suíte de benchmarks dos caminhos quentes do formulário.
+
+Mede validação de CPF, validação do registro (um e lote), `so_digitos`, `gerar_pdf_formulario` (payload pequeno,
+típico e pior caso), `buscar_cep` contra um ViaCEP local e o submit completo
+até a entrega num servidor SMTP local. Grava mediana, p99, pico de memória
+(tracemalloc) e tamanho do PDF em JSON; com --comparar, falha (código 1) se
+algum caso piorou além da tolerância em relação a uma linha de base.
+
+    python -m benchmarks.suite -o base.json
+    python -m benchmarks.suite --comparar base.json --tolerancia 0.2
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import re
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from itertools import count
+
+_tmp = tempfile.mkdtemp(prefix="bench_suite_")
+os.environ.update({
+    "PASTA_DADOS": _tmp,
+    "CEP_INDICE": os.path.join(_tmp, "sem_indice.idx"),
+    "CEP_CACHE": "memoria",
+    "SMTP_HOST": "127.0.0.1",
+    "SMTP_STARTTLS": "0",
+    "EMAIL_APP_PASSWORD": "bench",
+})
+
+from benchmarks.stubs import SMTPSink, ViaCEPStub  # noqa: E402
+
+# Chaves comparadas com a linha de base (maior = pior). O p99 é mais ruidoso
+# e usa o dobro da tolerância.
+METRICAS = ("mediana_us", "p99_us", "pico_memoria_kb", "pdf_bytes")
+
+# =====================
+# Payloads
+# =====================
+PEQUENO = {
+    "nome": "Ana Lima", "cpf": "52998224725", "email": "ana@exemplo.com",
+    "uf_rg": "SP", "uf_endereco": "SP", "consentiu": True,
+}
+
+TIPICO = {
+    **PEQUENO,
+    "vaga": "Analista de Marketing - Rio de Janeiro/RJ", "pretensao": 6500.0,
+    "nome": "Ana Beatriz de Souza Lima", "data_nascimento": "12/03/1992",
+    "identidade": "123456789", "orgao_expedidor": "SSP", "data_expedicao": "05/06/2010",
+    "cep": "01001000", "logradouro": "Praça da Sé", "numero": "100", "complemento": "Apto 12",
+    "bairro": "Sé", "cidade": "São Paulo", "telefone": "11999998888",
+    "estado_civil": "Casado(a)", "sexo": "Feminino", "pcd": "Não", "filhos": 2,
+    "dependentes": [
+        {"nome": "Pedro Lima", "parentesco": "Filho(a)", "cpf": "11144477735"},
+        {"nome": "Laura Lima", "parentesco": "Filho(a)", "cpf": "39053344705"},
+    ],
+    "ultimo_emprego": "Agência Exemplo", "ultimo_cargo": "Analista de Marketing Pleno",
+    "data_admissao": "01/02/2019", "data_desligamento": "30/06/2024",
+    "atividades_ultimo_cargo": "Planejamento de campanhas digitais, gestão de mídia paga e relatórios mensais de desempenho.",
+    "motivo_saida": "Busca de novos desafios", "telefone_ultimo_emprego": "1133334444",
+    "contato_ultimo_emprego": "Carla (RH)",
+    "penultimo_emprego": "Loja Modelo", "penultimo_cargo": "Assistente de Marketing",
+    "data_admissao_penultimo": "01/03/2016", "data_desligamento_penultimo": "20/01/2019",
+    "atividades_penultimo_cargo": "Apoio em eventos, redes sociais e materiais de ponto de venda.",
+    "motivo_saida_penultimo": "Proposta melhor", "telefone_penultimo_emprego": "1122223333",
+    "contato_penultimo_emprego": "Marcos (gestor)",
+    "escolaridade": "Ensino Superior Completo", "curso": "Publicidade e Propaganda",
+    "instituicao": "Universidade Exemplo", "ano_conclusao": 2014, "situacao": "Concluído",
+    "outra_formacao": "MBA em Marketing Digital", "idiomas": ["Inglês", "Espanhol"],
+    "nivel_idioma": "Avançado",
+}
+TIPICO["dependentes_ir"] = len(TIPICO["dependentes"])
+
+# Pior caso: áreas de texto longas (o Streamlit não limita o tamanho)
+_PARAGRAFO = ("Responsável pela coordenação de equipes multidisciplinares, definição de metas, "
+              "acompanhamento de indicadores e elaboração de relatórios para a diretoria. ")
+PIOR = {
+    **TIPICO,
+    "vaga": "Gerente de Projetos - " + "São Paulo/SP, Rio de Janeiro/RJ, Belo Horizonte/MG; " * 20,
+    "atividades_ultimo_cargo": _PARAGRAFO * 120,
+    "atividades_penultimo_cargo": _PARAGRAFO * 120,
+    "idiomas": ["Inglês", "Espanhol", "Francês", "Alemão", "Mandarim", "Italiano"],
+}
+
+
+# =====================
+# Medição
+# =====================
+class Caso:
+    """Uma função medida `lote` vezes por amostra (para funções de microssegundos)."""
+
+    def __init__(self, nome, funcao, lote=1, repeticoes=None):
+        self.nome = nome
+        self.funcao = funcao
+        self.lote = lote
+        self.repeticoes = repeticoes
+
+    def executar(self):
+        for _ in range(self.lote):
+            retorno = self.funcao()
+        return retorno
+
+    def medir(self, repeticoes, aquecimento=3):
+        repeticoes = self.repeticoes or repeticoes
+        for _ in range(aquecimento):
+            self.executar()
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            self.executar()
+            tempos.append((time.perf_counter() - inicio) / self.lote)
+
+        # Pico de memória numa execução à parte: o tracemalloc distorce os tempos
+        tracemalloc.start()
+        try:
+            retorno = self.funcao()
+            _, pico = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        tempos.sort()
+        resultado = {
+            "amostras": repeticoes,
+            "lote": self.lote,
+            "mediana_us": round(statistics.median(tempos) * 1e6, 3),
+            "p99_us": round(tempos[math.ceil(0.99 * len(tempos)) - 1] * 1e6, 3),
+            "media_us": round(statistics.fmean(tempos) * 1e6, 3),
+            "pico_memoria_kb": round(pico / 1024, 1),
+        }
+        if isinstance(retorno, bytes):
+            resultado["pdf_bytes"] = len(retorno)
+        return resultado
+
+
+def casos(sink):
+    from cep import buscar_cep
+    from pdf import gerar_pdf_formulario
+    from processamento import processar_submissao
+    from validacao import so_digitos, validar, validar_cpf, validar_lote
+
+    ceps = (f"0{n:07d}" for n in count(1_000_000))
+    sequencia = count(1)
+
+    def novo_candidato():
+        # Conteúdo diferente a cada envio: o mesmo formulário seria uma duplicata
+        return {**TIPICO, "numero": str(next(sequencia))}
+
+    def submeter_e_entregar():
+        esperadas = len(sink.mensagens) + 1
+        resultado = processar_submissao(novo_candidato())
+        if not resultado.ok:
+            raise RuntimeError(f"submit falhou na etapa {resultado.etapa}: {resultado.erros}")
+        if not sink.aguardar(esperadas):
+            raise RuntimeError("mensagem não chegou ao servidor SMTP local")
+
+    return [
+        Caso("validar_cpf/valido", lambda: validar_cpf("52998224725"), lote=1000),
+        Caso("validar_cpf/formatado", lambda: validar_cpf("529.982.247-25"), lote=1000),
+        Caso("validar_cpf/invalido", lambda: validar_cpf("52998224724"), lote=1000),
+        Caso("so_digitos", lambda: so_digitos("(11) 99999-8888"), lote=1000),
+        Caso("validar/tipico", lambda: validar(TIPICO), lote=100),
+        Caso("validar/lote_1000", lambda: sum(map(len, validar_lote([TIPICO, PEQUENO] * 500)))),
+        Caso("gerar_pdf/pequeno", lambda: gerar_pdf_formulario(PEQUENO)),
+        Caso("gerar_pdf/tipico", lambda: gerar_pdf_formulario(TIPICO)),
+        Caso("gerar_pdf/pior", lambda: gerar_pdf_formulario(PIOR), repeticoes=30),
+        Caso("buscar_cep/viacep", lambda: buscar_cep(next(ceps))),
+        Caso("buscar_cep/cache", lambda: buscar_cep("01001000"), lote=100),
+        Caso("submissao/resposta", lambda: processar_submissao(novo_candidato())),
+        Caso("submissao/duplicada", lambda: processar_submissao(TIPICO)),
+        Caso("submissao/entrega_smtp", submeter_e_entregar, repeticoes=50),
+    ]
+
+
+def executar(repeticoes, filtro=None):
+    with ViaCEPStub() as viacep, SMTPSink() as sink:
+        os.environ["VIACEP_URL"] = viacep.url
+        os.environ["SMTP_PORT"] = str(sink.porta)
+        resultados = {}
+        for caso in casos(sink):
+            if filtro and not re.search(filtro, caso.nome):
+                continue
+            resultados[caso.nome] = caso.medir(repeticoes)
+            r = resultados[caso.nome]
+            print(f"{caso.nome:<26} mediana {r['mediana_us']:>12,.1f} µs   p99 {r['p99_us']:>12,.1f} µs   "
+                  f"pico {r['pico_memoria_kb']:>9,.1f} KiB", file=sys.stderr)
+    return {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "repeticoes": repeticoes,
+        "casos": resultados,
+    }
+
+
+def comparar(atual, base, tolerancia):
+    """Lista de (caso, métrica, base, atual, variação) que pioraram além da tolerância."""
+    regressoes = []
+    for nome, medidas in atual["casos"].items():
+        anterior = base["casos"].get(nome)
+        if anterior is None:
+            continue
+        for metrica in METRICAS:
+            if metrica not in medidas or not anterior.get(metrica):
+                continue
+            variacao = medidas[metrica] / anterior[metrica] - 1
+            limite = tolerancia * 2 if metrica == "p99_us" else tolerancia
+            if variacao > limite:
+                regressoes.append((nome, metrica, anterior[metrica], medidas[metrica], variacao))
+    return regressoes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks dos caminhos quentes do formulário.")
+    parser.add_argument("-n", "--repeticoes", type=int, default=200, help="amostras por caso")
+    parser.add_argument("-o", "--saida", help="grava os resultados em JSON")
+    parser.add_argument("-k", "--filtro", help="regex: roda só os casos cujo nome casar")
+    parser.add_argument("--comparar", metavar="BASE_JSON", help="linha de base para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.2,
+                        help="piora relativa aceita (0.2 = 20%%; o p99 aceita o dobro)")
+    args = parser.parse_args(argv)
+
+    resultados = executar(args.repeticoes, args.filtro)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+    else:
+        json.dump(resultados, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        regressoes = comparar(resultados, base, args.tolerancia)
+        for nome, metrica, antes, depois, variacao in regressoes:
+            print(f"REGRESSÃO {nome} {metrica}: {antes:,.1f} -> {depois:,.1f} (+{variacao:.0%})", file=sys.stderr)
+        if regressoes:
+            return 1
+        print(f"Sem regressões acima de {args.tolerancia:.0%} em relação a {args.comparar}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""Cache persistente das consultas de CEP ao ViaCEP.
+
+O backend é plugável (ver `BACKENDS`/`criar_cache`); o padrão é um arquivo
+SQLite em modo WAL, compartilhado por todos os processos (e réplicas que montem
+o mesmo volume) e que sobrevive a reinícios. Cada entrada guarda o endereço ou
+`None` para "CEP não encontrado" (cache negativo, com TTL próprio). Entradas
+vencidas ainda podem ser servidas durante a janela de obsolescência enquanto
+uma revalidação roda em background (stale-while-revalidate).
+
+No SQLite, o caminho de leitura quase nunca escreve: a data de acesso usada
+no despejo LRU só é renovada quando tem mais de TOQUE_INTERVALO segundos, e o
+tamanho da tabela só é contado a cada tantas gravações.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from itertools import count
+
+Entrada = namedtuple("Entrada", "valor expira_em")
+
+TOQUE_INTERVALO = 3600.0  # resolução da data de acesso do LRU no SQLite (s)
+CONTAR_A_CADA   = 1000    # gravações entre verificações do limite de entradas
+
+
+class CacheCEP:
+    """Interface dos backends: obter/gravar entradas e contar acertos."""
+
+    def __init__(self):
+        self._trava_stats = threading.Lock()
+        self._stats = dict.fromkeys(("acertos", "acertos_negativos", "obsoletos", "faltas"), 0)
+
+    def obter(self, chave):
+        """Retorna Entrada (mesmo vencida) ou None."""
+        raise NotImplementedError
+
+    def gravar(self, chave, valor, ttl):
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def contar(self, evento):
+        with self._trava_stats:
+            self._stats[evento] += 1
+
+    def estatisticas(self):
+        with self._trava_stats:
+            stats = dict(self._stats)
+        consultas = sum(stats.values())
+        stats["taxa_acerto"] = (consultas - stats["faltas"]) / consultas if consultas else 0.0
+        return stats
+
+
+class CacheMemoria(CacheCEP):
+    """LRU em memória do processo (útil em testes ou sem disco gravável)."""
+
+    def __init__(self, max_entradas=10_000):
+        super().__init__()
+        self.max_entradas = max_entradas
+        self._dados = OrderedDict()
+        self._trava = threading.Lock()
+
+    def obter(self, chave):
+        with self._trava:
+            entrada = self._dados.get(chave)
+            if entrada is not None:
+                self._dados.move_to_end(chave)
+            return entrada
+
+    def gravar(self, chave, valor, ttl):
+        with self._trava:
+            self._dados[chave] = Entrada(valor, time.time() + ttl)
+            self._dados.move_to_end(chave)
+            while len(self._dados) > self.max_entradas:
+                self._dados.popitem(last=False)
+
+    def __len__(self):
+        return len(self._dados)
+
+
+class CacheSQLite(CacheCEP):
+    """Cache em arquivo SQLite (WAL) com despejo LRU por data do último acesso."""
+
+    def __init__(self, caminho, max_entradas=200_000):
+        super().__init__()
+        self.caminho = caminho
+        self.max_entradas = max_entradas
+        self._contar_a_cada = max(1, min(CONTAR_A_CADA, max_entradas // 100))
+        self._gravacoes = count(1)
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        con = self._con()
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cep_cache (
+                cep         TEXT PRIMARY KEY,
+                valor       TEXT,
+                expira_em   REAL NOT NULL,
+                acessado_em REAL NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        con.execute("CREATE INDEX IF NOT EXISTS ix_cep_cache_lru ON cep_cache (acessado_em)")
+
+    def _con(self):
+        # Uma conexão por thread (as sessões do Streamlit rodam em threads distintas)
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.caminho, timeout=10, isolation_level=None)
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    def obter(self, chave):
+        con = self._con()
+        linha = con.execute(
+            "SELECT valor, expira_em, acessado_em FROM cep_cache WHERE cep = ?", (chave,)
+        ).fetchone()
+        if linha is None:
+            return None
+        valor, expira_em, acessado_em = linha
+        agora = time.time()
+        if agora - acessado_em > TOQUE_INTERVALO:
+            # Acertos seguidos no mesmo CEP não disputam a trava de escrita
+            con.execute("UPDATE cep_cache SET acessado_em = ? WHERE cep = ?", (agora, chave))
+        return Entrada(None if valor is None else json.loads(valor), expira_em)
+
+    def gravar(self, chave, valor, ttl):
+        agora = time.time()
+        con = self._con()
+        con.execute(
+            "INSERT OR REPLACE INTO cep_cache (cep, valor, expira_em, acessado_em) VALUES (?, ?, ?, ?)",
+            (chave, None if valor is None else json.dumps(valor, ensure_ascii=False), agora + ttl, agora),
+        )
+        # Despejo LRU em lote (10% acima do limite) para não pagar um DELETE por
+        # gravação; o COUNT(*) percorre a tabela e só roda a cada tantas gravações
+        if next(self._gravacoes) % self._contar_a_cada:
+            return
+        (total,) = con.execute("SELECT COUNT(*) FROM cep_cache").fetchone()
+        if total > self.max_entradas * 1.1:
+            con.execute(
+                "DELETE FROM cep_cache WHERE cep IN "
+                "(SELECT cep FROM cep_cache ORDER BY acessado_em LIMIT ?)",
+                (total - self.max_entradas,),
+            )
+
+    def __len__(self):
+        return self._con().execute("SELECT COUNT(*) FROM cep_cache").fetchone()[0]
+
+
+BACKENDS = {
+    "sqlite": lambda caminho, max_entradas: CacheSQLite(caminho, max_entradas),
+    "memoria": lambda caminho, max_entradas: CacheMemoria(max_entradas),
+}
+
+
+def criar_cache(backend, caminho, max_entradas):
+    """Instancia o backend pelo nome; novos backends entram em BACKENDS."""
+    fabrica = BACKENDS.get(backend)
+    if fabrica is None:
+        raise ValueError(f"Backend de cache de CEP desconhecido: {backend!r}")
+    return fabrica(caminho, max_entradas)
@@ -0,0 +1,349 @@
+"""Consulta de CEP: índice local memory-mapped com fallback para o ViaCEP.
+
+O índice é um arquivo binário ordenado pela chave numérica do CEP (8 dígitos
+cabem em um uint32). Como é aberto via mmap somente leitura, as páginas ficam no
+page cache do sistema e são compartilhadas por todos os processos do Streamlit;
+a busca é binária direto sobre o arquivo, sem carregar nada no heap.
+
+Formato (little-endian):
+
+    cabeçalho  MAGICO (8 bytes) + n (uint32) + reservado (uint32)
+    chaves     n x uint32   CEPs ordenados
+    offsets    n x uint32   início do registro no bloco de textos
+    tamanhos   n x uint16   tamanho do registro em bytes
+    textos     "logradouro\\x1fbairro\\x1fcidade\\x1fuf" em UTF-8 (registros
+               idênticos são gravados uma vez só)
+
+Para gerar o índice a partir de um dump CSV (colunas cep, logradouro, bairro,
+cidade ou localidade, uf):
+
+    python cep.py construir ceps.csv -o dados/ceps.idx
+"""
+import argparse
+import csv
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from functools import lru_cache
+
+from cache_cep import criar_cache
+from configuracao import PASTA_DADOS, get_secret
+from metricas import CEP_CONSULTAS, DURACAO_ETAPA
+from resiliencia import CircuitoAberto, Prazo, PrazoEsgotado, disjuntor
+
+CEP_INDICE          = get_secret("CEP_INDICE", os.path.join(PASTA_DADOS, "ceps.idx"))
+CEP_INDICE_RELER    = float(get_secret("CEP_INDICE_RELER", 5))    # intervalo entre stat() do índice (s)
+VIACEP_URL          = get_secret("VIACEP_URL", "https://viacep.com.br").rstrip("/")
+CEP_CACHE           = get_secret("CEP_CACHE", "sqlite")  # ver cache_cep.BACKENDS
+CEP_CACHE_DB        = get_secret("CEP_CACHE_DB", os.path.join(PASTA_DADOS, "cep_cache.db"))
+CEP_CACHE_MAX       = int(get_secret("CEP_CACHE_MAX", 200_000))
+CEP_TTL             = float(get_secret("CEP_TTL", 30 * 86400))          # CEP encontrado
+CEP_TTL_NEGATIVO    = float(get_secret("CEP_TTL_NEGATIVO", 86400))      # "CEP não encontrado"
+CEP_JANELA_OBSOLETO = float(get_secret("CEP_JANELA_OBSOLETO", 7 * 86400))  # serve vencido e revalida
+CEP_TIMEOUT         = float(get_secret("CEP_TIMEOUT", 5))          # teto de uma chamada ao ViaCEP (s)
+CEP_PRAZO           = float(get_secret("CEP_PRAZO", 2.5))          # orçamento total de um buscar_cep (s)
+CEP_FALHAS          = int(get_secret("CEP_FALHAS", 5))             # falhas seguidas que abrem o disjuntor
+CEP_ESPERA          = float(get_secret("CEP_ESPERA", 30))          # tempo aberto antes de testar de novo (s)
+CEP_SIMULTANEAS     = int(get_secret("CEP_SIMULTANEAS", 8))        # chamadas ao ViaCEP em curso por processo
+
+DISJUNTOR_VIACEP = disjuntor("viacep", falhas=CEP_FALHAS, espera=CEP_ESPERA, simultaneas=CEP_SIMULTANEAS)
+
+# Motivo de uma consulta sem endereço (ConsultaCEP.motivo); "aberto" e
+# "lotado" são os de resiliencia.CircuitoAberto
+NAO_ENCONTRADO, PRAZO, ERRO = "nao_encontrado", "prazo", "erro"
+ConsultaCEP = namedtuple("ConsultaCEP", "endereco motivo")
+
+MAGICO = b"CEPIDX1\0"
+CABECALHO = struct.Struct("<8sII")
+SEPARADOR = "\x1f"
+CAMPOS = ("logradouro", "bairro", "cidade", "uf")
+
+
+class IndiceCEP:
+    """Índice de CEPs somente leitura sobre um arquivo memory-mapped."""
+
+    def __init__(self, caminho):
+        if sys.byteorder != "little":
+            raise RuntimeError("O índice de CEP usa layout little-endian.")
+        with open(caminho, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magico, n, _ = CABECALHO.unpack_from(self._mm, 0)
+        if magico != MAGICO:
+            raise ValueError(f"{caminho} não é um índice de CEP válido.")
+        mv = memoryview(self._mm)
+        ini = CABECALHO.size
+        self._chaves = mv[ini:ini + 4 * n].cast("I")
+        ini += 4 * n
+        self._offsets = mv[ini:ini + 4 * n].cast("I")
+        ini += 4 * n
+        self._tamanhos = mv[ini:ini + 2 * n].cast("H")
+        self._textos = ini + 2 * n
+
+    def __len__(self):
+        return len(self._chaves)
+
+    def buscar(self, cep8: str):
+        """Retorna dict com logradouro, bairro, cidade, uf ou None se o CEP não está no índice."""
+        chave = int(cep8)
+        i = bisect_left(self._chaves, chave)
+        if i == len(self._chaves) or self._chaves[i] != chave:
+            return None
+        ini = self._textos + self._offsets[i]
+        texto = self._mm[ini:ini + self._tamanhos[i]].decode("utf-8")
+        return dict(zip(CAMPOS, texto.split(SEPARADOR)))
+
+
+def construir_indice(linhas, destino):
+    """Grava o índice a partir de tuplas (cep, logradouro, bairro, cidade, uf); retorna o nº de CEPs."""
+    registros = {}
+    for cep, *campos in linhas:
+        cep8 = re.sub(r"\D", "", cep or "")
+        if len(cep8) == 8:
+            registros[int(cep8)] = SEPARADOR.join((c or "").strip() for c in campos).encode("utf-8")
+
+    chaves = array("I", sorted(registros))
+    offsets, tamanhos = array("I"), array("H")
+    textos, vistos = bytearray(), {}
+    for chave in chaves:
+        texto = registros[chave]
+        if texto not in vistos:
+            vistos[texto] = len(textos)
+            textos += texto
+        offsets.append(vistos[texto])
+        tamanhos.append(len(texto))
+
+    # Grava em arquivo temporário e troca atomicamente: processos que estão
+    # com o índice antigo mapeado continuam lendo a versão anterior.
+    tmp = f"{destino}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(CABECALHO.pack(MAGICO, len(chaves), 0))
+        for arr in (chaves, offsets, tamanhos):
+            if sys.byteorder != "little":
+                arr.byteswap()
+            arr.tofile(f)
+        f.write(textos)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, destino)
+    return len(chaves)
+
+
+def _ler_csv(caminho, delimitador=None):
+    with open(caminho, newline="", encoding="utf-8-sig") as f:
+        if delimitador is None:
+            delimitador = csv.Sniffer().sniff(f.read(4096), delimiters=",;|\t").delimiter
+            f.seek(0)
+        for linha in csv.DictReader(f, delimiter=delimitador):
+            linha = {(k or "").strip().lower(): v for k, v in linha.items()}
+            yield (
+                linha.get("cep"),
+                linha.get("logradouro"),
+                linha.get("bairro"),
+                linha.get("cidade") or linha.get("localidade"),
+                linha.get("uf"),
+            )
+
+
+@lru_cache(maxsize=1)
+def _abrir_indice(caminho, identidade):
+    # identidade: (st_ino, st_mtime_ns, st_size); um arquivo trocado por
+    # construir_indice é outra chave, e o mapeamento antigo sai do cache
+    return IndiceCEP(caminho)
+
+
+_indice = (0.0, None)  # (próxima verificação em time.monotonic, índice aberto)
+
+
+def indice_local():
+    """Índice local do processo (None se o arquivo não existir).
+
+    O arquivo é conferido com um stat() no máximo a cada CEP_INDICE_RELER
+    segundos: um índice reconstruído (trocado atomicamente no disco) passa a
+    valer sem reiniciar o processo. Buscas em curso terminam no mapeamento
+    antigo.
+    """
+    global _indice
+    proxima, indice = _indice
+    agora = time.monotonic()
+    if agora < proxima:
+        return indice
+    try:
+        info = os.stat(CEP_INDICE)
+    except FileNotFoundError:
+        indice = None
+    else:
+        indice = _abrir_indice(CEP_INDICE, (info.st_ino, info.st_mtime_ns, info.st_size))
+    _indice = (agora + CEP_INDICE_RELER, indice)
+    return indice
+
+
+@lru_cache(maxsize=None)
+def cache_cep():
+    """Cache de consultas ao ViaCEP do processo (backend definido em CEP_CACHE)."""
+    return criar_cache(CEP_CACHE, CEP_CACHE_DB, CEP_CACHE_MAX)
+
+
+@lru_cache(maxsize=None)
+def sessao_http():
+    """Sessão HTTP compartilhada (keep-alive) para as consultas ao ViaCEP."""
+    # requests só na primeira consulta: não pesa na primeira tela do formulário
+    import requests
+
+    sessao = requests.Session()
+    adaptador = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=32)
+    sessao.mount("https://", adaptador)
+    sessao.mount("http://", adaptador)
+    return sessao
+
+
+def consultar_viacep(cep8: str, prazo=None):
+    """Consulta ViaCEP e retorna dict com logradouro, bairro, cidade, uf ou None se o CEP não existe.
+
+    Erros de rede/HTTP propagam como exceção, para não serem confundidos com
+    "CEP não encontrado" (que vai para o cache negativo). A chamada passa pelo
+    disjuntor do ViaCEP: com ele aberto (ou lotado), levanta CircuitoAberto
+    sem tocar a rede.
+    """
+    timeout = prazo.timeout(CEP_TIMEOUT) if prazo is not None else CEP_TIMEOUT
+    with DISJUNTOR_VIACEP.proteger():
+        with DURACAO_ETAPA.medir(etapa="cep_http"):
+            r = sessao_http().get(f"{VIACEP_URL}/ws/{cep8}/json/", timeout=timeout)
+        if r.status_code == 400:
+            return None
+        r.raise_for_status()
+        data = r.json()
+    if data.get("erro"):
+        return None
+    return {
+        "logradouro": data.get("logradouro", ""),
+        "bairro": data.get("bairro", ""),
+        "cidade": data.get("localidade", ""),
+        "uf": data.get("uf", ""),
+    }
+
+
+_revalidando = set()
+_trava_revalidacao = threading.Lock()
+
+
+def _atualizar_cache(cep8: str, prazo=None):
+    info = consultar_viacep(cep8, prazo)
+    cache_cep().gravar(cep8, info, CEP_TTL if info else CEP_TTL_NEGATIVO)
+    return info
+
+
+def _revalidar(cep8: str):
+    with _trava_revalidacao:
+        if cep8 in _revalidando:
+            return
+        _revalidando.add(cep8)
+
+    def tarefa():
+        try:
+            _atualizar_cache(cep8)
+        except Exception:
+            pass  # mantém a entrada obsoleta; a próxima consulta tenta de novo
+        finally:
+            with _trava_revalidacao:
+                _revalidando.discard(cep8)
+
+    threading.Thread(target=tarefa, name=f"revalida-cep-{cep8}", daemon=True).start()
+
+
+def buscar_cep(cep: str, prazo=None):
+    """Endereço do CEP (dict com logradouro, bairro, cidade, uf) ou None; ver `consultar_cep`."""
+    return consultar_cep(cep, prazo).endereco
+
+
+def consultar_cep(cep: str, prazo=None):
+    """Resolve o CEP: índice local, depois cache persistente, depois ViaCEP.
+
+    Retorna ConsultaCEP(endereco, motivo): o dict com logradouro, bairro,
+    cidade, uf (motivo None) ou endereco None e o motivo, para a interface
+    distinguir "CEP não encontrado" (NAO_ENCONTRADO) de consulta que não
+    aconteceu: disjuntor "aberto" ou "lotado", PRAZO estourado ou ERRO do
+    ViaCEP. A consulta ao ViaCEP respeita o `prazo` (padrão: CEP_PRAZO
+    segundos a partir daqui); se ela não acontece, o endereço do cache serve
+    mesmo vencido.
+    """
+    cep8 = re.sub(r"\D", "", cep or "")
+    if len(cep8) != 8:
+        return ConsultaCEP(None, NAO_ENCONTRADO)
+    indice = indice_local()
+    info = indice.buscar(cep8) if indice is not None else None
+    if info:
+        CEP_CONSULTAS.inc(resultado="indice")
+        return ConsultaCEP(info, None)
+
+    cache = cache_cep()
+    entrada = cache.obter(cep8)
+    agora = time.time()
+    if entrada is not None and agora < entrada.expira_em:
+        cache.contar("acertos" if entrada.valor else "acertos_negativos")
+        CEP_CONSULTAS.inc(resultado="acerto" if entrada.valor else "acerto_negativo")
+        return _consulta(entrada.valor)
+    if entrada is not None and agora < entrada.expira_em + CEP_JANELA_OBSOLETO:
+        cache.contar("obsoletos")
+        CEP_CONSULTAS.inc(resultado="obsoleto")
+        _revalidar(cep8)
+        return _consulta(entrada.valor)
+
+    cache.contar("faltas")
+    prazo = prazo or Prazo(CEP_PRAZO)
+    try:
+        info = _atualizar_cache(cep8, prazo)
+    except CircuitoAberto as e:
+        CEP_CONSULTAS.inc(resultado="disjuntor")
+        motivo = e.motivo
+    except Exception as e:
+        CEP_CONSULTAS.inc(resultado="erro")
+        motivo = PRAZO if isinstance(e, PrazoEsgotado) or not prazo.restante() else ERRO
+    else:
+        CEP_CONSULTAS.inc(resultado="falta")
+        return _consulta(info)
+    # ViaCEP fora do ar: melhor uma resposta antiga do que nenhuma
+    if entrada is not None:
+        return _consulta(entrada.valor)
+    return ConsultaCEP(None, motivo)
+
+
+def _consulta(info):
+    return ConsultaCEP(info, None if info else NAO_ENCONTRADO)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ferramentas do índice local de CEP.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_construir = sub.add_parser("construir", help="gera o índice binário a partir de um CSV")
+    p_construir.add_argument("csv")
+    p_construir.add_argument("-o", "--saida", default=CEP_INDICE)
+    p_construir.add_argument("-d", "--delimitador", default=None)
+    p_buscar = sub.add_parser("buscar", help="consulta um CEP no índice local")
+    p_buscar.add_argument("cep")
+    p_buscar.add_argument("-i", "--indice", default=CEP_INDICE)
+    sub.add_parser("stats", help="mostra o tamanho do cache de consultas ao ViaCEP")
+    args = parser.parse_args(argv)
+
+    if args.comando == "construir":
+        os.makedirs(os.path.dirname(os.path.abspath(args.saida)), exist_ok=True)
+        inicio = time.perf_counter()
+        n = construir_indice(_ler_csv(args.csv, args.delimitador), args.saida)
+        print(f"{n} CEPs gravados em {args.saida} "
+              f"({os.path.getsize(args.saida) / 1e6:.1f} MB, {time.perf_counter() - inicio:.1f}s)")
+    elif args.comando == "stats":
+        print(f"{CEP_CACHE}: {len(cache_cep())} entradas")
+    else:
+        inicio = time.perf_counter()
+        info = IndiceCEP(args.indice).buscar(re.sub(r"\D", "", args.cep))
+        print(info, f"({(time.perf_counter() - inicio) * 1e6:.0f} µs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import os
+
+import streamlit as st
+
+# =====================
+# Segredos / Config (12-factor)
+# =====================
+
+def get_secret(name, default=None):
+    try:
+        return os.getenv(name) or st.secrets.get(name, default)
+    except FileNotFoundError:
+        # Fora do `streamlit run` (worker, CLI) pode não haver secrets.toml
+        return default
+
+NOME_EMPRESA  = get_secret("NOME_EMPRESA",  "Provion Seguros")
+EMAIL_DESTINO = get_secret("EMAIL_DESTINO", "naosei@provion.com.br")
+EMAIL_FROM    = get_secret("EMAIL_FROM",    "rfrugoni.provion@gmail.com")
+SMTP_HOST     = get_secret("SMTP_HOST",     "smtp.gmail.com")
+SMTP_PORT     = int(get_secret("SMTP_PORT", 587))
+SMTP_USER     = get_secret("SMTP_USER",     EMAIL_FROM)
+SMTP_PASS     = get_secret("EMAIL_APP_PASSWORD")  # senha de app do Gmail
+SMTP_STARTTLS = str(get_secret("SMTP_STARTTLS", "1")).lower() not in ("0", "false", "nao", "não")  # relay local sem TLS
+
+# Diretório local para filas e bases (fila de e-mails etc.)
+PASTA_DADOS   = get_secret("PASTA_DADOS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "dados"))
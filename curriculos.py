@@ -0,0 +1,229 @@
+"""Armazém dos currículos anexados pelos candidatos, endereçado pelo conteúdo.
+
+O arquivo enviado é copiado em blocos para um temporário na própria pasta do
+armazém, com o SHA-256 calculado no caminho, e depois renomeado para
+`<PASTA>/ab/cd/<sha256>`. O mesmo currículo enviado de novo (o candidato que
+se inscreve em outra vaga, o reenvio do formulário) fica gravado uma vez só.
+Em nenhum momento o conteúdo inteiro é copiado para a memória: o tamanho é
+conferido durante a cópia e o envio por e-mail lê o arquivo do disco em
+blocos (ver `fila_email.ConexaoSMTP`).
+
+O arquivo é gravado já no upload, antes de a submissão existir; o que nenhuma
+submissão chegou a citar (candidato que desistiu, currículo trocado) é apagado
+por `limpar_orfaos` depois de CURRICULO_ORFAO_APOS segundos. Os uploads do
+formulário disparam a limpeza em segundo plano (`agendar_limpeza`); pela
+linha de comando:
+
+    python curriculos.py limpar
+
+Os metadados (`Curriculo`) vão junto com os dados do formulário:
+
+    {"sha256": "...", "nome": "cv.pdf", "tipo": "application/pdf", "tamanho": 123456}
+"""
+import argparse
+import hashlib
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+
+from configuracao import PASTA_DADOS, get_secret
+
+log = logging.getLogger(__name__)
+
+PASTA_CURRICULOS = get_secret("PASTA_CURRICULOS", os.path.join(PASTA_DADOS, "curriculos"))
+CURRICULO_MAX_MB = int(get_secret("CURRICULO_MAX_MB", 5))
+CURRICULO_ORFAO_APOS = float(get_secret("CURRICULO_ORFAO_APOS", 24 * 3600))  # s sem submissão até apagar
+LIMPEZA_A_CADA   = 3600.0  # intervalo mínimo entre limpezas agendadas pelos uploads (s)
+BLOCO            = 64 * 1024
+
+# extensão -> (tipo MIME, assinatura no início do arquivo)
+TIPOS = {
+    "pdf":  ("application/pdf", b"%PDF-"),
+    "docx": ("application/vnd.openxmlformats-officedocument.wordprocessingml.document", b"PK\x03\x04"),
+    "doc":  ("application/msword", b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"),
+}
+
+TIPOS_MIME = frozenset(tipo for tipo, _ in TIPOS.values())
+RE_SHA256  = re.compile(r"[0-9a-f]{64}")
+
+Curriculo = namedtuple("Curriculo", "sha256 nome tipo tamanho")
+
+_trava_limpeza = threading.Lock()
+_proxima_limpeza = 0.0
+
+
+def caminho(sha256, pasta=PASTA_CURRICULOS):
+    """Caminho do arquivo de conteúdo `sha256` no armazém.
+
+    `sha256` vem do registro da submissão (que um cliente da API monta como
+    quiser): ValueError se não é um SHA-256 hexadecimal ou se o caminho
+    resolvido sai da pasta do armazém.
+    """
+    if not isinstance(sha256, str) or not RE_SHA256.fullmatch(sha256):
+        raise ValueError("Identificador de currículo inválido.")
+    destino = os.path.join(pasta, sha256[:2], sha256[2:4], sha256)
+    if not no_armazem(destino, pasta):
+        raise ValueError("Identificador de currículo inválido.")
+    return destino
+
+
+def no_armazem(arquivo, pasta=PASTA_CURRICULOS):
+    """True se `arquivo`, com links simbólicos resolvidos, fica dentro da pasta do armazém."""
+    base = os.path.realpath(pasta)
+    return os.path.commonpath((base, os.path.realpath(arquivo))) == base
+
+
+def existe(sha256, pasta=PASTA_CURRICULOS):
+    """True se há no armazém um currículo com esse conteúdo (False também para identificador inválido)."""
+    try:
+        return os.path.isfile(caminho(sha256, pasta))
+    except ValueError:
+        return False
+
+
+def _extensao(nome):
+    extensao = os.path.splitext(nome or "")[1].lower().lstrip(".")
+    if extensao not in TIPOS:
+        raise ValueError(f"Envie o currículo em {', '.join(e.upper() for e in TIPOS)}.")
+    return extensao
+
+
+def guardar(arquivo, nome, pasta=PASTA_CURRICULOS, max_bytes=CURRICULO_MAX_MB * 1024 * 1024):
+    """Copia `arquivo` (objeto com .read) para o armazém e devolve o Curriculo.
+
+    Levanta ValueError com mensagem para o candidato se o tipo não é aceito,
+    o conteúdo não confere com a extensão ou o arquivo passa de `max_bytes`.
+    """
+    extensao = _extensao(nome)
+    tipo, assinatura = TIPOS[extensao]
+    os.makedirs(pasta, exist_ok=True)
+    sha = hashlib.sha256()
+    tamanho = 0
+    tmp = tempfile.NamedTemporaryFile(dir=pasta, prefix=".envio-", delete=False)
+    try:
+        with tmp:
+            while bloco := arquivo.read(BLOCO):
+                if not tamanho and not bloco.startswith(assinatura):
+                    raise ValueError(f"O arquivo não parece ser um {extensao.upper()} válido.")
+                tamanho += len(bloco)
+                if tamanho > max_bytes:
+                    raise ValueError(f"O currículo deve ter no máximo {max_bytes // (1024 * 1024)} MB.")
+                sha.update(bloco)
+                tmp.write(bloco)
+            if not tamanho:
+                raise ValueError("O arquivo do currículo está vazio.")
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        destino = caminho(sha.hexdigest(), pasta)
+        if os.path.exists(destino):
+            os.unlink(tmp.name)     # mesmo conteúdo já guardado
+            os.utime(destino)       # recomeça o prazo de limpar_orfaos
+        else:
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            os.replace(tmp.name, destino)
+    except BaseException:
+        if os.path.exists(tmp.name):
+            os.unlink(tmp.name)
+        raise
+    return Curriculo(sha.hexdigest(), os.path.basename(nome), tipo, tamanho)
+
+
+def anexos(dados, pasta=PASTA_CURRICULOS):
+    """[(caminho, nome, tipo)] dos arquivos a anexar ao e-mail de `dados` (vazia sem currículo).
+
+    Só anexa o que está de fato no armazém: metadados que apenas citam um
+    arquivo (identificador inválido, arquivo inexistente, tipo fora de TIPOS)
+    não viram anexo. O envio valida o currículo antes (ver
+    validacao.curriculo_valido); aqui é a segunda barreira, para registros
+    antigos e reprocessamentos.
+    """
+    curriculo = dados.get("curriculo")
+    if not curriculo:
+        return []
+    if not (isinstance(curriculo, dict) and existe(curriculo.get("sha256"), pasta)
+            and curriculo.get("tipo") in TIPOS_MIME):
+        log.warning("Currículo ignorado: não está no armazém (%r)", curriculo)
+        return []
+    return [(caminho(curriculo["sha256"], pasta), os.path.basename(str(curriculo.get("nome") or "curriculo")),
+             curriculo["tipo"])]
+
+
+def limpar_orfaos(referenciados, pasta=PASTA_CURRICULOS, idade=CURRICULO_ORFAO_APOS):
+    """Apaga os currículos fora de `referenciados` (SHA-256 citados por submissões) e devolve quantos.
+
+    Só apaga arquivos sem modificação há mais de `idade` segundos: o upload
+    acontece antes do envio do formulário, e `guardar` renova a data de um
+    conteúdo repetido. Temporários `.envio-*` abandonados (processo que caiu
+    no meio da cópia) também saem.
+    """
+    limite = time.time() - idade
+    removidos = 0
+    for raiz, pastas, arquivos in os.walk(pasta, topdown=False):
+        for nome in arquivos:
+            if not (nome.startswith(".envio-") or (RE_SHA256.fullmatch(nome) and nome not in referenciados)):
+                continue
+            arquivo = os.path.join(raiz, nome)
+            try:
+                if os.path.getmtime(arquivo) < limite:
+                    os.unlink(arquivo)
+                    removidos += 1
+            except FileNotFoundError:
+                pass
+        if raiz != pasta and not os.listdir(raiz):
+            try:
+                os.rmdir(raiz)
+            except OSError:
+                pass    # um upload acabou de criar algo aqui
+    if removidos:
+        log.info("%s currículo(s) órfão(s) apagado(s) de %s", removidos, pasta)
+    return removidos
+
+
+def agendar_limpeza(referenciados, pasta=PASTA_CURRICULOS):
+    """Roda `limpar_orfaos` numa thread, no máximo uma vez por LIMPEZA_A_CADA; True se agendou.
+
+    `referenciados` é uma função que devolve os SHA-256 citados por
+    submissões. Ela só é chamada na thread da limpeza: quem faz o upload não
+    carrega o armazém de submissões.
+    """
+    global _proxima_limpeza
+    with _trava_limpeza:
+        agora = time.monotonic()
+        if agora < _proxima_limpeza:
+            return False
+        _proxima_limpeza = agora + LIMPEZA_A_CADA
+
+    def limpar():
+        try:
+            limpar_orfaos(referenciados(), pasta)
+        except Exception:
+            log.exception("Falha ao limpar currículos órfãos")
+
+    threading.Thread(target=limpar, name="limpeza-curriculos", daemon=True).start()
+    return True
+
+
+def main(argv=None):
+    from submissoes import CAMINHO_SUBMISSOES, ArmazemSubmissoes
+
+    parser = argparse.ArgumentParser(description="Armazém de currículos.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_limpar = sub.add_parser("limpar", help="apaga os currículos que nenhuma submissão cita")
+    p_limpar.add_argument("--idade", type=float, default=CURRICULO_ORFAO_APOS,
+                          help="segundos sem uso até um órfão ser apagado (padrão: %(default)s)")
+    p_limpar.add_argument("--db", default=CAMINHO_SUBMISSOES)
+    args = parser.parse_args(argv)
+
+    referenciados = ArmazemSubmissoes(args.db).curriculos_referenciados()
+    removidos = limpar_orfaos(referenciados, idade=args.idade)
+    print(f"{removidos} currículo(s) órfão(s) apagado(s); {len(referenciados)} citados por submissões",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,648 @@
+"""Fila de saída (outbox) de e-mails.
+
+O submit grava a mensagem MIME já montada em uma fila SQLite local e retorna na
+hora. Um trabalhador em background drena a fila por uma única conexão SMTP
+autenticada, reaproveitada entre envios, com novas tentativas e backoff. Com o
+servidor fora do ar, o disjuntor do SMTP (ver resiliencia.py) abre depois de
+SMTP_FALHAS_DISJUNTOR falhas seguidas: as mensagens ficam na fila, sem gastar
+tentativas, e o trabalhador só volta a conectar passados SMTP_ESPERA segundos.
+
+Com EMAIL_MODO=resumo (campanhas de alto volume), os PDFs não viram um e-mail
+cada: acumulam na mesma base e, a cada RESUMO_JANELA segundos ou RESUMO_MAX
+candidatos, o trabalhador fecha um lote em uma única mensagem com um .zip dos
+PDFs e um CSV índice dos candidatos.
+
+Também pode rodar como processo separado:
+
+    python fila_email.py
+"""
+import base64
+import csv
+import io
+import json
+import logging
+import os
+import random
+import re
+import smtplib
+import sqlite3
+import tarfile
+import threading
+import time
+import uuid
+import zipfile
+from datetime import datetime
+from email.mime.application import MIMEApplication
+from email.mime.base import MIMEBase
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from configuracao import (
+    EMAIL_DESTINO, EMAIL_FROM, NOME_EMPRESA, PASTA_DADOS, SMTP_HOST, SMTP_PASS, SMTP_PORT, SMTP_STARTTLS, SMTP_USER,
+    get_secret,
+)
+from curriculos import no_armazem
+from metricas import DURACAO_ETAPA, SMTP_ENVIADOS, SMTP_FALHAS, iniciar_exportacao
+from resiliencia import CircuitoAberto, disjuntor
+
+log = logging.getLogger(__name__)
+
+CAMINHO_FILA   = get_secret("FILA_EMAIL_DB", os.path.join(PASTA_DADOS, "fila_email.db"))
+MAX_TENTATIVAS = int(get_secret("FILA_EMAIL_MAX_TENTATIVAS", 8))
+BACKOFF_BASE   = 5.0     # segundos até a 1ª nova tentativa
+BACKOFF_MAX    = 900.0   # teto do backoff (15 min)
+LEASE          = 120.0   # tempo que uma mensagem fica reservada para o envio (uma por vez)
+OCIOSO_MAX     = 60.0    # fecha a conexão SMTP após esse tempo sem envios
+SMTP_TIMEOUT   = float(get_secret("SMTP_TIMEOUT", 20))     # por operação no socket SMTP (s)
+SMTP_FALHAS_DISJUNTOR = int(get_secret("SMTP_FALHAS_DISJUNTOR", 3))   # falhas seguidas que abrem o disjuntor
+SMTP_ESPERA    = float(get_secret("SMTP_ESPERA", 60))      # tempo aberto antes de testar o servidor de novo (s)
+
+EMAIL_MODO     = get_secret("EMAIL_MODO", "individual")    # "individual" (um e-mail por candidato) ou "resumo"
+RESUMO_JANELA  = float(get_secret("RESUMO_JANELA", 900))   # fecha o lote quando o mais antigo tem essa idade (s)
+RESUMO_MAX     = int(get_secret("RESUMO_MAX", 200))        # ... ou quando juntar tantos candidatos
+# "zip" abre em qualquer lugar; "tar.xz" comprime os PDFs juntos (são quase
+# idênticos entre si) e fica ~10x menor, mas exige descompactador compatível
+RESUMO_FORMATO = get_secret("RESUMO_FORMATO", "zip")
+
+# Erros de conexão e de transporte (socket, smtplib.SMTPException, que é
+# OSError) contam como falha do servidor; com o disjuntor aberto o trabalhador
+# nem conecta. A recusa definitiva de uma mensagem vira MensagemRecusada, que
+# não é OSError: o servidor respondeu, o problema é da mensagem.
+DISJUNTOR_SMTP = disjuntor("smtp", falhas=SMTP_FALHAS_DISJUNTOR, espera=SMTP_ESPERA, simultaneas=4,
+                           excecoes=(OSError,))
+
+
+class MensagemRecusada(Exception):
+    """Falha definitiva da mensagem (destinatário ou remetente recusado, resposta 5xx, anexo sumido).
+
+    Tentar de novo não muda o resultado: a mensagem vai direto para 'falhou',
+    sem contar no disjuntor do SMTP.
+    """
+
+
+def _recusa_definitiva(erro):
+    """True se o erro do smtplib é uma recusa permanente desta mensagem (e não do servidor ou da conexão)."""
+    if isinstance(erro, smtplib.SMTPRecipientsRefused):
+        return all(codigo >= 500 for codigo, _ in erro.recipients.values())
+    if isinstance(erro, (smtplib.SMTPSenderRefused, smtplib.SMTPDataError)):
+        return erro.smtp_code >= 500
+    return False
+
+
+def nome_arquivo_pdf(nome, quando):
+    return f"Formulario_Candidato_{(nome or '').replace(' ', '_')}_{quando.strftime('%Y%m%d_%H%M%S')}.pdf"
+
+
+def montar_mensagem(dados, pdf_content, quando=None):
+    """Monta o e-mail de novo candidato para o RH, com o PDF do formulário anexo."""
+    quando = quando or datetime.now()
+
+    # Corpo do e-mail (simplificado)
+    corpo_email = f"""
+    Olá,
+
+    Novo formulário de candidato recebido!
+
+    Candidato: {dados.get('nome', '')}
+    Vaga: {dados.get('vaga', '')}
+    Data: {quando.strftime('%d/%m/%Y às %H:%M')}
+
+    Os dados completos estão no PDF anexo.{" O currículo do candidato também vai anexo." if dados.get('curriculo') else ""}
+
+    Atenciosamente,
+    Sistema de Formulários - {NOME_EMPRESA}
+    """.strip()
+
+    msg = MIMEMultipart()
+    msg['From'] = EMAIL_FROM
+    msg['To'] = EMAIL_DESTINO
+    msg['Subject'] = f"Formulário de Candidato - {dados.get('nome', '')}"
+    msg.attach(MIMEText(corpo_email, 'plain', 'utf-8'))
+
+    # Anexar PDF
+    pdf_attachment = MIMEApplication(pdf_content, _subtype='pdf')
+    pdf_attachment.add_header('Content-Disposition', 'attachment', filename=nome_arquivo_pdf(dados.get('nome'), quando))
+    msg.attach(pdf_attachment)
+    return msg
+
+
+def _compactar(arquivos, formato):
+    """Empacota [(nome, bytes)] em um único arquivo; retorna (conteúdo, extensão, subtipo MIME)."""
+    pacote = io.BytesIO()
+    if formato == "tar.xz":
+        with tarfile.open(fileobj=pacote, mode="w:xz") as tf:
+            for nome, conteudo in arquivos:
+                info = tarfile.TarInfo(nome)
+                info.size = len(conteudo)
+                info.mtime = time.time()
+                tf.addfile(info, io.BytesIO(conteudo))
+        return pacote.getvalue(), "tar.xz", "x-xz"
+    if formato == "zip":
+        with zipfile.ZipFile(pacote, "w", zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
+            for nome, conteudo in arquivos:
+                zf.writestr(nome, conteudo)
+        return pacote.getvalue(), "zip", "zip"
+    raise ValueError(f"Formato de resumo desconhecido: {formato!r}")
+
+
+def montar_resumo(itens, quando=None, formato=RESUMO_FORMATO):
+    """Monta o e-mail de resumo de um lote: PDFs compactados e CSV índice dos candidatos.
+
+    `itens` são tuplas (protocolo, recebida_em, nome, cpf, vaga, arquivo, pdf, curriculo). Os
+    currículos não entram no pacote: o CSV traz o nome e o SHA-256 de cada um
+    no armazém de currículos (baixáveis pela página do RH).
+    """
+    quando = quando or datetime.now()
+    carimbo = quando.strftime('%Y%m%d_%H%M%S')
+
+    indice = io.StringIO()
+    escritor = csv.writer(indice)
+    escritor.writerow(("protocolo", "recebida_em", "nome", "cpf", "vaga", "arquivo", "curriculo", "curriculo_sha256"))
+    for protocolo, recebida_em, nome, cpf, vaga, arquivo, _, curriculo in itens:
+        curriculo = json.loads(curriculo) if curriculo else {}
+        escritor.writerow((protocolo, recebida_em, nome, cpf, vaga, arquivo,
+                           curriculo.get("nome", ""), curriculo.get("sha256", "")))
+    pacote, extensao, subtipo = _compactar([(i[5], i[6]) for i in itens], formato)
+
+    primeira, ultima = min(i[1] for i in itens), max(i[1] for i in itens)
+    corpo_email = f"""
+    Olá,
+
+    Resumo de {len(itens)} formulário(s) de candidato recebidos
+    entre {primeira} e {ultima}.
+
+    Os PDFs estão no arquivo .{extensao} anexo; o CSV lista os candidatos
+    e o nome do PDF de cada um.
+
+    Atenciosamente,
+    Sistema de Formulários - {NOME_EMPRESA}
+    """.strip()
+
+    msg = MIMEMultipart()
+    msg['From'] = EMAIL_FROM
+    msg['To'] = EMAIL_DESTINO
+    msg['Subject'] = f"Formulários de Candidatos - resumo de {len(itens)} ({quando.strftime('%d/%m/%Y %H:%M')})"
+    msg.attach(MIMEText(corpo_email, 'plain', 'utf-8'))
+
+    anexo_csv = MIMEText(indice.getvalue(), 'csv', 'utf-8')
+    anexo_csv.add_header('Content-Disposition', 'attachment', filename=f"candidatos_{carimbo}.csv")
+    msg.attach(anexo_csv)
+    anexo_pacote = MIMEApplication(pacote, _subtype=subtipo)
+    anexo_pacote.add_header('Content-Disposition', 'attachment', filename=f"formularios_{carimbo}.{extensao}")
+    msg.attach(anexo_pacote)
+    return msg
+
+
+_INICIO_PONTO = re.compile(rb"(?m)^\.")
+_FIM_DE_LINHA = re.compile(rb"\r\n|\n|\r(?!\n)")
+BLOCO_BASE64 = 57 * 1024   # múltiplo de 57 bytes: cada bloco vira linhas inteiras de 76 caracteres
+
+
+def blocos_mensagem(conteudo, anexos):
+    """Corpo DATA do SMTP (CRLF, pontos duplicados) de um multipart com os `anexos` acrescentados.
+
+    Gera a mensagem em blocos: os anexos são lidos do disco e codificados em
+    base64 aos pedaços, então a memória usada não depende do tamanho deles.
+    """
+    corpo, fechamento = conteudo.rstrip(b"\r\n").rsplit(b"\n", 1)
+    fechamento = fechamento.strip()
+    if not (fechamento.startswith(b"--") and fechamento.endswith(b"--")):
+        raise ValueError("Anexos em disco exigem uma mensagem multipart.")
+    fronteira = fechamento[:-2]
+    yield _FIM_DE_LINHA.sub(b"\r\n", _INICIO_PONTO.sub(b"..", corpo)) + b"\r\n"
+    for caminho, nome, tipo in anexos:
+        parte = MIMEBase(*tipo.split("/", 1))
+        parte.add_header("Content-Transfer-Encoding", "base64")
+        parte.add_header("Content-Disposition", "attachment", filename=nome)
+        # O alfabeto base64 não tem ".", então só o cabeçalho precisa de escape
+        yield fronteira + b"\r\n" + _FIM_DE_LINHA.sub(b"\r\n", _INICIO_PONTO.sub(b"..", parte.as_bytes()))
+        with open(caminho, "rb") as f:
+            while bloco := f.read(BLOCO_BASE64):
+                yield base64.encodebytes(bloco).replace(b"\n", b"\r\n")
+    yield fronteira + b"--\r\n"
+
+
+class FilaEmail:
+    """Fila durável de mensagens (SQLite em modo WAL, commit com fsync)."""
+
+    def __init__(self, caminho=CAMINHO_FILA):
+        self.caminho = caminho
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self._novas = threading.Event()
+        with self._conectar() as con:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS mensagens (
+                    id                INTEGER PRIMARY KEY AUTOINCREMENT,
+                    criada_em         REAL    NOT NULL,
+                    remetente         TEXT    NOT NULL,
+                    destinatarios     TEXT    NOT NULL,
+                    conteudo          BLOB    NOT NULL,
+                    status            TEXT    NOT NULL DEFAULT 'pendente',
+                    tentativas        INTEGER NOT NULL DEFAULT 0,
+                    proxima_tentativa REAL    NOT NULL,
+                    ultimo_erro       TEXT,
+                    anexos            TEXT,
+                    reserva           TEXT
+                )
+                """
+            )
+            con.execute(
+                "CREATE INDEX IF NOT EXISTS ix_mensagens_fila ON mensagens (status, proxima_tentativa)"
+            )
+            # PDFs aguardando o próximo e-mail de resumo (EMAIL_MODO=resumo)
+            con.execute(
+                """
+                CREATE TABLE IF NOT EXISTS resumo_pendentes (
+                    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+                    criada_em   REAL    NOT NULL,
+                    protocolo   INTEGER,
+                    recebida_em TEXT    NOT NULL,
+                    nome        TEXT,
+                    cpf         TEXT,
+                    vaga        TEXT,
+                    arquivo     TEXT    NOT NULL,
+                    pdf         BLOB    NOT NULL,
+                    curriculo   TEXT
+                )
+                """
+            )
+            # Bases criadas antes dos currículos e do token de reserva
+            colunas_novas = (("mensagens", "anexos"), ("resumo_pendentes", "curriculo"), ("mensagens", "reserva"))
+            for tabela, coluna in colunas_novas:
+                if coluna not in {linha[1] for linha in con.execute(f"PRAGMA table_info({tabela})")}:
+                    con.execute(f"ALTER TABLE {tabela} ADD COLUMN {coluna} TEXT")
+
+    def _conectar(self):
+        con = sqlite3.connect(self.caminho, timeout=30, isolation_level=None)
+        con.execute("PRAGMA synchronous=FULL")
+        return _Transacao(con)
+
+    def enfileirar(self, msg, anexos=()) -> int:
+        """Grava a mensagem na fila e retorna seu id. Não fala com o servidor SMTP.
+
+        `anexos` são arquivos [(caminho, nome, tipo MIME)] que entram na
+        mensagem (multipart) só na hora do envio, lidos do disco em blocos: a
+        fila guarda a referência, não o conteúdo.
+        """
+        with self._conectar() as con:
+            id_msg = self._inserir(con, msg, anexos)
+        self._novas.set()
+        return id_msg
+
+    @staticmethod
+    def _inserir(con, msg, anexos=()):
+        remetente = msg["From"]
+        destinatarios = ",".join(a.strip() for a in msg["To"].split(","))
+        agora = time.time()
+        return con.execute(
+            "INSERT INTO mensagens (criada_em, remetente, destinatarios, conteudo, proxima_tentativa, anexos) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (agora, remetente, destinatarios, msg.as_bytes(), agora, json.dumps(list(anexos)) if anexos else None),
+        ).lastrowid
+
+    def acumular_resumo(self, protocolo, dados, pdf_content, quando=None) -> int:
+        """Guarda o PDF para o próximo e-mail de resumo (em vez de um e-mail próprio)."""
+        quando = quando or datetime.now()
+        arquivo = nome_arquivo_pdf(dados.get('nome'), quando)
+        if protocolo is not None:
+            arquivo = f"{protocolo:07d}_{arquivo}"
+        with self._conectar() as con:
+            curriculo = dados.get('curriculo')
+            id_pendente = con.execute(
+                "INSERT INTO resumo_pendentes (criada_em, protocolo, recebida_em, nome, cpf, vaga, arquivo, pdf, "
+                "curriculo) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), protocolo, quando.isoformat(timespec="seconds"), dados.get('nome'),
+                 dados.get('cpf'), dados.get('vaga'), arquivo, pdf_content,
+                 json.dumps(curriculo, ensure_ascii=False) if curriculo else None),
+            ).lastrowid
+        self._novas.set()
+        return id_pendente
+
+    def fechar_resumos(self, forcar=False):
+        """Transforma em mensagens da fila os lotes de resumo vencidos; retorna quantos candidatos saíram.
+
+        Um lote fecha com RESUMO_MAX candidatos ou quando o mais antigo passa de
+        RESUMO_JANELA segundos (ou sempre, com `forcar`). Montagem e remoção dos
+        pendentes acontecem na mesma transação que enfileira o resumo.
+        """
+        incluidos = 0
+        while True:
+            with self._conectar() as con:
+                con.execute("BEGIN IMMEDIATE")
+                quantos, mais_antigo = con.execute(
+                    "SELECT COUNT(*), MIN(criada_em) FROM resumo_pendentes"
+                ).fetchone()
+                vencido = mais_antigo is not None and time.time() - mais_antigo >= RESUMO_JANELA
+                if not quantos or not (forcar or vencido or quantos >= RESUMO_MAX):
+                    break
+                linhas = con.execute(
+                    "SELECT id, protocolo, recebida_em, nome, cpf, vaga, arquivo, pdf, curriculo FROM resumo_pendentes "
+                    "ORDER BY id LIMIT ?",
+                    (RESUMO_MAX,),
+                ).fetchall()
+                self._inserir(con, montar_resumo([linha[1:] for linha in linhas]))
+                con.execute("DELETE FROM resumo_pendentes WHERE id <= ?", (linhas[-1][0],))
+            incluidos += len(linhas)
+            self._novas.set()
+        return incluidos
+
+    def resumo_vence_em(self):
+        """Segundos até o lote de resumo aberto vencer pela janela (None se não há pendentes)."""
+        with self._conectar() as con:
+            (mais_antigo,) = con.execute("SELECT MIN(criada_em) FROM resumo_pendentes").fetchone()
+        return None if mais_antigo is None else max(0.0, mais_antigo + RESUMO_JANELA - time.time())
+
+    def reservar(self):
+        """Reserva (lease) a mensagem vencida mais antiga e a devolve (None se não há nenhuma).
+
+        A reserva permite que mais de um processo drene a mesma fila: uma
+        mensagem reservada só volta a ser elegível se o envio não for concluído
+        dentro de LEASE segundos (ex.: o processo caiu no meio do envio). Uma
+        mensagem por vez, para o prazo cobrir um único envio; o token
+        `reserva` devolvido na última coluna identifica esta reserva em
+        `concluir`, `adiar`, `falhar` e `devolver`.
+        """
+        agora = time.time()
+        reserva = uuid.uuid4().hex
+        with self._conectar() as con:
+            con.execute("BEGIN IMMEDIATE")
+            linha = con.execute(
+                "SELECT id, remetente, destinatarios, conteudo, tentativas, anexos FROM mensagens "
+                "WHERE status = 'pendente' AND proxima_tentativa <= ? "
+                "ORDER BY proxima_tentativa LIMIT 1",
+                (agora,),
+            ).fetchone()
+            if linha is None:
+                return None
+            con.execute(
+                "UPDATE mensagens SET proxima_tentativa = ?, reserva = ? WHERE id = ?",
+                (agora + LEASE, reserva, linha[0]),
+            )
+        return (*linha, reserva)
+
+    def _atualizar_reservada(self, sql, params, id_msg, reserva):
+        """Executa `sql` (com "WHERE id = ? AND reserva = ?" no fim) e avisa se a reserva já tinha vencido."""
+        with self._conectar() as con:
+            alteradas = con.execute(sql, (*params, id_msg, reserva)).rowcount
+        if not alteradas:
+            # Prazo venceu e outro trabalhador reservou a mensagem: ele decide o destino dela
+            log.warning("Reserva da mensagem %s venceu antes do fim do envio; mantida para o novo trabalhador", id_msg)
+        return bool(alteradas)
+
+    def concluir(self, id_msg, reserva):
+        return self._atualizar_reservada("DELETE FROM mensagens WHERE id = ? AND reserva = ?", (), id_msg, reserva)
+
+    def adiar(self, id_msg, reserva, tentativas, erro):
+        """Registra a falha e agenda nova tentativa com backoff exponencial (com jitter)."""
+        tentativas += 1
+        if tentativas >= MAX_TENTATIVAS:
+            status, proxima = "falhou", time.time()
+        else:
+            espera = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (tentativas - 1))
+            status, proxima = "pendente", time.time() + espera * random.uniform(0.8, 1.2)
+        return self._atualizar_reservada(
+            "UPDATE mensagens SET status = ?, tentativas = ?, proxima_tentativa = ?, ultimo_erro = ?, reserva = NULL "
+            "WHERE id = ? AND reserva = ?",
+            (status, tentativas, proxima, f"{type(erro).__name__}: {erro}"), id_msg, reserva,
+        )
+
+    def falhar(self, id_msg, reserva, erro):
+        """Marca a mensagem como falha definitiva (não adianta tentar de novo)."""
+        return self._atualizar_reservada(
+            "UPDATE mensagens SET status = 'falhou', proxima_tentativa = ?, ultimo_erro = ?, reserva = NULL "
+            "WHERE id = ? AND reserva = ?",
+            (time.time(), f"{type(erro).__name__}: {erro}"), id_msg, reserva,
+        )
+
+    def devolver(self, id_msg, reserva, espera):
+        """Devolve à fila uma mensagem reservada, sem gastar tentativa (o envio nem foi tentado)."""
+        return self._atualizar_reservada(
+            "UPDATE mensagens SET proxima_tentativa = ?, reserva = NULL WHERE id = ? AND reserva = ?",
+            (time.time() + espera,), id_msg, reserva,
+        )
+
+    def proxima_em(self):
+        """Segundos até a próxima mensagem pendente vencer (None se a fila está vazia)."""
+        with self._conectar() as con:
+            (proxima,) = con.execute(
+                "SELECT MIN(proxima_tentativa) FROM mensagens WHERE status = 'pendente'"
+            ).fetchone()
+        return None if proxima is None else max(0.0, proxima - time.time())
+
+    def contagem(self):
+        with self._conectar() as con:
+            return dict(con.execute("SELECT status, COUNT(*) FROM mensagens GROUP BY status").fetchall())
+
+    def aguardar(self, timeout):
+        """Bloqueia até chegar mensagem nova neste processo ou estourar o timeout."""
+        self._novas.wait(timeout)
+        self._novas.clear()
+
+
+class _Transacao:
+    """Context manager que faz commit/rollback explícitos e fecha a conexão."""
+
+    def __init__(self, con):
+        self.con = con
+
+    def __enter__(self):
+        return self.con
+
+    def __exit__(self, tipo, *_):
+        try:
+            if self.con.in_transaction:
+                self.con.execute("ROLLBACK" if tipo else "COMMIT")
+        finally:
+            self.con.close()
+
+
+class ConexaoSMTP:
+    """Conexão SMTP persistente: STARTTLS + login uma vez, reaberta sob demanda."""
+
+    def __init__(self, host=SMTP_HOST, port=SMTP_PORT, usuario=SMTP_USER, senha=SMTP_PASS, timeout=SMTP_TIMEOUT,
+                 starttls=SMTP_STARTTLS):
+        self.host, self.port = host, port
+        self.usuario, self.senha = usuario, senha
+        self.starttls = starttls
+        self.timeout = timeout
+        self._server = None
+        self.ultimo_uso = 0.0
+
+    def _abrir(self):
+        with DURACAO_ETAPA.medir(etapa="smtp_conexao"):
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            try:
+                if self.starttls:
+                    server.starttls()
+                if self.senha:
+                    server.login(self.usuario, self.senha)
+            except Exception:
+                server.close()
+                raise
+        self._server = server
+
+    def enviar(self, remetente, destinatarios, conteudo, anexos=()):
+        """Envia pela conexão persistente, passando pelo disjuntor do SMTP (pode levantar CircuitoAberto).
+
+        `anexos` ([(caminho, nome, tipo)]) são acrescentados ao multipart
+        `conteudo` durante a transmissão, lidos do disco em blocos. Levanta
+        MensagemRecusada quando o problema é da mensagem (anexo sumido, recusa
+        5xx): isso não conta como falha do servidor.
+        """
+        for caminho, *_ in anexos:
+            # Arquivo sumido é problema da mensagem, não do servidor: fora do disjuntor
+            if not os.path.isfile(caminho):
+                raise MensagemRecusada(f"Anexo não encontrado: {caminho}")
+        with DISJUNTOR_SMTP.proteger():
+            if self._server is None:
+                self._abrir()
+            try:
+                try:
+                    with DURACAO_ETAPA.medir(etapa="smtp_envio"):
+                        self._transmitir(remetente, destinatarios, conteudo, anexos)
+                except smtplib.SMTPServerDisconnected:
+                    # Servidor derrubou a conexão ociosa: reabre uma vez e tenta de novo
+                    self.fechar()
+                    self._abrir()
+                    with DURACAO_ETAPA.medir(etapa="smtp_envio"):
+                        self._transmitir(remetente, destinatarios, conteudo, anexos)
+            except smtplib.SMTPException as e:
+                if _recusa_definitiva(e):
+                    raise MensagemRecusada(f"{type(e).__name__}: {e}") from e
+                raise
+        self.ultimo_uso = time.monotonic()
+
+    def _transmitir(self, remetente, destinatarios, conteudo, anexos):
+        if not anexos:
+            self._server.sendmail(remetente, destinatarios, conteudo)
+            return
+        # Mesmo protocolo de SMTP.sendmail, mas o DATA sai em blocos
+        server = self._server
+        server.ehlo_or_helo_if_needed()
+        codigo, resposta = server.mail(remetente)
+        if codigo != 250:
+            server.rset()
+            raise smtplib.SMTPSenderRefused(codigo, resposta, remetente)
+        recusados = {}
+        for destinatario in destinatarios:
+            codigo, resposta = server.rcpt(destinatario)
+            if codigo not in (250, 251):
+                recusados[destinatario] = (codigo, resposta)
+        if len(recusados) == len(destinatarios):
+            server.rset()
+            raise smtplib.SMTPRecipientsRefused(recusados)
+        server.putcmd("data")
+        codigo, resposta = server.getreply()
+        if codigo != 354:
+            server.rset()
+            raise smtplib.SMTPDataError(codigo, resposta)
+        for bloco in blocos_mensagem(conteudo, anexos):
+            server.send(bloco)
+        server.send(b".\r\n")
+        codigo, resposta = server.getreply()
+        if codigo != 250:
+            server.rset()
+            raise smtplib.SMTPDataError(codigo, resposta)
+
+    def fechar(self):
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except Exception:
+            self._server.close()
+        self._server = None
+
+
+class TrabalhadorEnvio(threading.Thread):
+    """Drena a fila em background reaproveitando uma única ConexaoSMTP."""
+
+    def __init__(self, fila, conexao=None):
+        super().__init__(name="trabalhador-email", daemon=True)
+        self.fila = fila
+        self.conexao = conexao or ConexaoSMTP()
+        self._parar = threading.Event()
+
+    def parar(self):
+        self._parar.set()
+        self.fila._novas.set()
+
+    def drenar(self):
+        """Envia tudo o que estiver vencido; retorna quantas mensagens foram enviadas."""
+        enviadas = 0
+        while not self._parar.is_set() and not DISJUNTOR_SMTP.reabre_em():
+            reservada = self.fila.reservar()
+            if reservada is None:
+                break
+            id_msg, remetente, destinatarios, conteudo, tentativas, anexos, reserva = reservada
+            anexos = json.loads(anexos) if anexos else ()
+            fora = [c for c, *_ in anexos if not no_armazem(c)]
+            if fora:
+                # Só currículos do armazém são anexados (fila gravada antes da validação do currículo)
+                log.error("Mensagem %s descartada: anexo fora do armazém de currículos %s", id_msg, fora)
+                self.fila.falhar(id_msg, reserva, ValueError("anexo fora do armazém de currículos"))
+                continue
+            try:
+                self.conexao.enviar(remetente, destinatarios.split(","), conteudo, anexos)
+            except CircuitoAberto as e:
+                # Servidor fora do ar: a mensagem volta para quando o disjuntor testar de novo
+                self.fila.devolver(id_msg, reserva, e.reabre_em)
+            except MensagemRecusada as e:
+                # Não adianta tentar de novo; a conexão continua boa (o smtplib já mandou RSET)
+                SMTP_FALHAS.inc(excecao=type(e).__name__)
+                log.error("Mensagem %s recusada: %s", id_msg, e)
+                self.fila.falhar(id_msg, reserva, e)
+            except Exception as e:
+                SMTP_FALHAS.inc(excecao=type(e).__name__)
+                log.warning("Falha ao enviar mensagem %s (tentativa %s): %r", id_msg, tentativas + 1, e)
+                self.conexao.fechar()
+                self.fila.adiar(id_msg, reserva, tentativas, e)
+            else:
+                SMTP_ENVIADOS.inc()
+                self.fila.concluir(id_msg, reserva)
+                enviadas += 1
+        return enviadas
+
+    def run(self):
+        while not self._parar.is_set():
+            try:
+                self.fila.fechar_resumos()
+                self.drenar()
+            except Exception:
+                log.exception("Erro inesperado no trabalhador de e-mail")
+            if self.conexao._server is not None and time.monotonic() - self.conexao.ultimo_uso > OCIOSO_MAX:
+                self.conexao.fechar()
+            prazos = [p for p in (self.fila.proxima_em(), self.fila.resumo_vence_em()) if p is not None]
+            espera = max(min(prazos + [OCIOSO_MAX]), DISJUNTOR_SMTP.reabre_em())
+            self.fila.aguardar(max(espera, 0.5))
+        self.conexao.fechar()
+
+
+_trabalhador = None
+_trava = threading.Lock()
+
+
+def iniciar_trabalhador(fila):
+    """Inicia (uma vez por processo) o trabalhador em background para a fila."""
+    global _trabalhador
+    with _trava:
+        if _trabalhador is None or not _trabalhador.is_alive():
+            if not SMTP_PASS:
+                # O envio não bloqueia: servidor que exige login recusa, e o erro sai no log/disjuntor
+                log.warning("EMAIL_APP_PASSWORD não configurado: o SMTP será usado sem login")
+            _trabalhador = TrabalhadorEnvio(fila)
+            _trabalhador.start()
+    return _trabalhador
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    iniciar_exportacao()
+    trabalhador = TrabalhadorEnvio(FilaEmail())
+    log.info("Drenando %s (%s)", CAMINHO_FILA, trabalhador.fila.contagem() or "vazia")
+    try:
+        trabalhador.run()
+    except KeyboardInterrupt:
+        trabalhador.conexao.fechar()
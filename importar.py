@@ -0,0 +1,441 @@
+"""Importação em massa de planilhas de candidatos (CSV ou XLSX).
+
+Cada linha vira um `dados_formulario` (colunas mapeadas pelo nome do
+cabeçalho ou por um --mapa JSON), tem o endereço completado pelo CEP
+(`buscar_cep`, com no máximo --ceps consultas simultâneas), passa pelas
+mesmas regras do formulário (`validacao.validar`) e é registrada no armazém
+com a chave de idempotência. Reimportar a mesma linha não duplica nada. Os
+PDFs saem de um pool de processos (`RenderizadorPDF.render_many`) e são
+gravados em --saida e/ou enfileirados por e-mail.
+
+Tudo é gerador, então a memória não depende do tamanho do arquivo. As
+linhas recusadas vão para o arquivo de rejeitados, com a etapa e os erros.
+O progresso (última linha concluída) fica em <arquivo>.importacao.json, e
+rodar de novo o mesmo comando retoma dali.
+
+    python importar.py agencia.csv --saida pdfs/
+    python importar.py agencia.xlsx --enviar --mapa mapa_agencia.json --consentiu -j 8
+
+XLSX usa `openpyxl` (em requirements.txt; sem ele, só CSV).
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import threading
+import time
+import unicodedata
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+from cep import buscar_cep
+from curriculos import anexos
+from fila_email import EMAIL_MODO, FilaEmail, montar_mensagem, nome_arquivo_pdf
+from pdf import RenderizadorPDF
+from processamento import chave_idempotencia, normalizar
+from reprocessar import Progresso
+from submissoes import CAMINHO_SUBMISSOES, CAMPOS, ArmazemSubmissoes
+from validacao import UFS, so_digitos, validar
+
+# Cabeçalhos comuns nas planilhas das agências (já normalizados: minúsculas,
+# sem acento, "_" no lugar de espaços e pontuação) -> chave de dados_formulario.
+# Um cabeçalho igual à própria chave (ex.: "data_nascimento") também vale.
+APELIDOS = {
+    "nome_completo": "nome", "candidato": "nome",
+    "nascimento": "data_nascimento", "data_de_nascimento": "data_nascimento",
+    "rg": "identidade", "orgao_emissor": "orgao_expedidor", "uf_do_rg": "uf_rg",
+    "endereco": "logradouro", "rua": "logradouro", "municipio": "cidade",
+    "uf": "uf_endereco", "estado": "uf_endereco",
+    "celular": "telefone", "e_mail": "email",
+    "cargo_pretendido": "vaga", "pretensao_salarial": "pretensao",
+    "empresa": "ultimo_emprego", "cargo": "ultimo_cargo",
+    "consentimento": "consentiu", "consentimento_lgpd": "consentiu",
+}
+
+CAMPOS_DATA = {c for c in CAMPOS if c.startswith("data_")}
+CAMPOS_DIGITOS = {"cpf": 11, "cep": 8, "telefone": 0, "telefone_ultimo_emprego": 0, "telefone_penultimo_emprego": 0}
+CAMPOS_INTEIROS = {"filhos", "ano_conclusao"}
+VERDADEIRO = {"sim", "s", "x", "true", "1", "yes", "y"}
+SEM_UF = "Selecione a UF"
+
+INTERVALO_ESTADO = 1.0  # s entre gravações do ponto de retomada
+
+# tipo: "valida" | "rejeitada" | "duplicada"; erros: [(etapa, mensagem)]
+Linha = namedtuple("Linha", "numero original tipo dados protocolo chave erros")
+
+
+# =====================
+# Leitura e mapeamento
+# =====================
+def _normalizar_cabecalho(nome):
+    sem_acento = unicodedata.normalize("NFKD", str(nome or "")).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", "_", sem_acento.lower()).strip("_")
+
+
+def ler_planilha(caminho):
+    """(cabeçalho, gerador de (nº da linha na planilha, lista de valores))."""
+    if caminho.lower().endswith((".xlsx", ".xlsm")):
+        return _ler_xlsx(caminho)
+    return _ler_csv(caminho)
+
+
+def _ler_csv(caminho):
+    f = open(caminho, newline="", encoding="utf-8-sig")
+    amostra = f.read(64 * 1024)
+    f.seek(0)
+    try:
+        dialeto = csv.Sniffer().sniff(amostra, delimiters=",;\t")
+    except csv.Error:
+        dialeto = csv.excel
+    leitor = csv.reader(f, dialeto)
+    cabecalho = next(leitor, [])
+
+    def linhas():
+        with f:
+            for numero, valores in enumerate(leitor, start=2):
+                if any(v.strip() for v in valores):
+                    yield numero, valores
+
+    return cabecalho, linhas()
+
+
+def _ler_xlsx(caminho):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise SystemExit("Importar XLSX exige o pacote openpyxl (pip install openpyxl).") from None
+    # read_only: as linhas são lidas do zip sob demanda, sem carregar a planilha
+    livro = load_workbook(caminho, read_only=True, data_only=True)
+    iterador = livro.worksheets[0].iter_rows(values_only=True)
+    cabecalho = [str(c or "") for c in next(iterador, ())]
+
+    def linhas():
+        try:
+            for numero, valores in enumerate(iterador, start=2):
+                if any(v not in (None, "") for v in valores):
+                    yield numero, list(valores)
+        finally:
+            livro.close()
+
+    return cabecalho, linhas()
+
+
+def montar_mapa(cabecalho, mapa_usuario=None):
+    """Índice da coluna -> chave de dados_formulario; colunas sem destino ficam de fora."""
+    mapa_usuario = mapa_usuario or {}
+    campos = set(CAMPOS)
+    mapa = {}
+    for i, nome in enumerate(cabecalho):
+        chave = mapa_usuario.get(nome)
+        if chave is None:
+            normalizado = _normalizar_cabecalho(nome)
+            chave = normalizado if normalizado in campos else APELIDOS.get(normalizado)
+        if chave:
+            mapa[i] = chave
+    return mapa
+
+
+def _data(valor):
+    if isinstance(valor, datetime):
+        valor = valor.date()
+    if isinstance(valor, date):
+        return valor.strftime("%d/%m/%Y")
+    texto = str(valor).strip()
+    if re.fullmatch(r"\d{4}-\d{2}-\d{2}", texto[:10]):
+        return date.fromisoformat(texto[:10]).strftime("%d/%m/%Y")
+    return texto
+
+
+def _numero(valor):
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    texto = re.sub(r"[^\d,.-]", "", str(valor))
+    if "," in texto:  # formato brasileiro: 6.500,00
+        texto = texto.replace(".", "").replace(",", ".")
+    return float(texto) if texto else 0.0
+
+
+def converter(chave, valor):
+    """Valor da célula no tipo que o formulário grava para `chave`."""
+    if valor is None or (isinstance(valor, str) and not valor.strip()):
+        return None
+    if chave in CAMPOS_DATA:
+        return _data(valor)
+    if chave in CAMPOS_DIGITOS:
+        if isinstance(valor, float) and valor.is_integer():
+            valor = int(valor)  # XLSX guarda CPF/CEP como número
+        return so_digitos(str(valor)).zfill(CAMPOS_DIGITOS[chave])
+    if chave in CAMPOS_INTEIROS:
+        return int(_numero(valor))
+    if chave == "pretensao":
+        return _numero(valor)
+    if chave in ("uf_rg", "uf_endereco"):
+        return str(valor).strip().upper()
+    if chave == "idiomas":
+        return [i.strip() for i in re.split(r"[,;/]", str(valor)) if i.strip()]
+    if chave == "consentiu":
+        return valor is True or str(valor).strip().lower() in VERDADEIRO
+    if chave in ("dependentes", "curriculo"):  # JSON, como na exportação do armazém
+        return json.loads(valor) if isinstance(valor, str) else valor
+    return str(valor).strip()
+
+
+def mapear(valores, mapa, consentiu=False):
+    """dados_formulario de uma linha, com os mesmos padrões do formulário para o que faltar."""
+    dados = {"uf_rg": SEM_UF, "uf_endereco": SEM_UF, "filhos": 0, "dependentes": [], "idiomas": [],
+             "consentiu": consentiu}
+    for i, chave in mapa.items():
+        if i < len(valores):
+            valor = converter(chave, valores[i])
+            if valor is not None:
+                dados[chave] = valor
+    dados["dependentes_ir"] = len(dados["dependentes"])
+    return dados
+
+
+# =====================
+# Etapas
+# =====================
+class Importador:
+    """Prepara cada linha (CEP, validação, registro) em threads, com consultas de CEP limitadas."""
+
+    def __init__(self, armazem, mapa, consentiu=False, ceps=4):
+        self.armazem = armazem
+        self.mapa = mapa
+        self.consentiu = consentiu
+        self._ceps = threading.BoundedSemaphore(ceps)
+
+    def completar_endereco(self, dados):
+        """Preenche só os campos de endereço vazios a partir do CEP."""
+        if not dados.get("cep") or all(dados.get(c) for c in ("logradouro", "bairro", "cidade")):
+            return
+        with self._ceps:
+            info = buscar_cep(dados["cep"])
+        if not info:
+            return
+        for campo in ("logradouro", "bairro", "cidade"):
+            if not dados.get(campo):
+                dados[campo] = info[campo]
+        if dados.get("uf_endereco", SEM_UF) == SEM_UF and info["uf"] in UFS:
+            dados["uf_endereco"] = info["uf"]
+
+    def preparar(self, item):
+        numero, valores = item
+        try:
+            # Normaliza antes de validar, como o envio do formulário e da API
+            dados = normalizar(mapear(valores, self.mapa, self.consentiu))
+            self.completar_endereco(dados)
+            erros = validar(dados)
+            if erros:
+                return Linha(numero, valores, "rejeitada", None, None, None,
+                             [("validacao", f"{e.campo}: {e.mensagem}") for e in erros])
+            chave = chave_idempotencia(dados)
+            protocolo, anterior = self.armazem.registrar(dados, chave)
+        except Exception as e:
+            return Linha(numero, valores, "rejeitada", None, None, None, [("leitura", f"{type(e).__name__}: {e}")])
+        # "processando" aqui é uma importação anterior interrompida no meio: refaz o PDF/e-mail
+        tipo = "duplicada" if anterior == "concluido" else "valida"
+        return Linha(numero, valores, tipo, dados, protocolo, chave, [])
+
+
+def em_ordem(executor, funcao, itens, janela):
+    """map() em threads que devolve na ordem de entrada com no máximo `janela` tarefas em voo."""
+    pendentes = deque()
+    for item in itens:
+        pendentes.append(executor.submit(funcao, item))
+        if len(pendentes) >= janela:
+            yield pendentes.popleft().result()
+    while pendentes:
+        yield pendentes.popleft().result()
+
+
+# =====================
+# Retomada
+# =====================
+def _identidade(caminho):
+    info = os.stat(caminho)
+    return {"arquivo": os.path.abspath(caminho), "tamanho": info.st_size, "modificado_em": info.st_mtime}
+
+
+def carregar_estado(caminho_estado, identidade):
+    """Estado salvo da mesma planilha (mesmo tamanho e data), ou None."""
+    try:
+        with open(caminho_estado, encoding="utf-8") as f:
+            estado = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if {k: estado.get(k) for k in identidade} != identidade:
+        return None
+    return estado
+
+
+def gravar_estado(caminho_estado, estado):
+    temporario = f"{caminho_estado}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(estado, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho_estado)
+
+
+# =====================
+# CLI
+# =====================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa candidatos de uma planilha CSV/XLSX.")
+    parser.add_argument("arquivo")
+    parser.add_argument("--saida", help="diretório onde gravar os PDFs")
+    parser.add_argument("--enviar", action="store_true", help="enfileira os PDFs para envio por e-mail")
+    parser.add_argument("--mapa", help='JSON {"Coluna da planilha": "chave_do_formulario"}')
+    parser.add_argument("--consentiu", action="store_true",
+                        help="a agência coletou o consentimento LGPD de todos os candidatos (vale sem a coluna)")
+    parser.add_argument("--rejeitados", help="CSV das linhas recusadas (padrão: <arquivo>.rejeitados.csv)")
+    parser.add_argument("--estado", help="ponto de retomada (padrão: <arquivo>.importacao.json)")
+    parser.add_argument("--recomecar", action="store_true", help="ignora o ponto de retomada salvo")
+    parser.add_argument("-j", "--processos", type=int, default=os.cpu_count(), help="processos de renderização")
+    parser.add_argument("-c", "--concorrencia", type=int, default=16, help="linhas preparadas em paralelo")
+    parser.add_argument("--ceps", type=int, default=4, help="consultas de CEP simultâneas")
+    parser.add_argument("--db", default=CAMINHO_SUBMISSOES)
+    args = parser.parse_args(argv)
+    if not args.saida and not args.enviar:
+        parser.error("informe --saida e/ou --enviar")
+
+    caminho_rejeitados = args.rejeitados or f"{args.arquivo}.rejeitados.csv"
+    caminho_estado = args.estado or f"{args.arquivo}.importacao.json"
+    identidade = _identidade(args.arquivo)
+    estado = None if args.recomecar else carregar_estado(caminho_estado, identidade)
+    if estado and estado.get("concluida"):
+        print(f"{args.arquivo} já foi importado (use --recomecar para importar de novo).", file=sys.stderr)
+        return 0
+    estado = estado or {**identidade, "linha": 1, "rejeitados_bytes": 0,
+                        "contagens": {"importadas": 0, "duplicadas": 0, "rejeitadas": 0}}
+    contagens = estado["contagens"]
+    if estado["linha"] > 1:
+        print(f"Retomando depois da linha {estado['linha']}.", file=sys.stderr)
+
+    mapa_usuario = None
+    if args.mapa:
+        with open(args.mapa, encoding="utf-8") as f:
+            mapa_usuario = json.load(f)
+    cabecalho, linhas = ler_planilha(args.arquivo)
+    mapa = montar_mapa(cabecalho, mapa_usuario)
+    ignoradas = [c for i, c in enumerate(cabecalho) if i not in mapa and c]
+    if ignoradas:
+        print(f"Colunas sem correspondência (ignoradas): {', '.join(ignoradas)}", file=sys.stderr)
+    if "cpf" not in mapa.values() or "nome" not in mapa.values():
+        parser.error("a planilha precisa de colunas de nome e CPF (ou um --mapa)")
+
+    importador = Importador(ArmazemSubmissoes(args.db), mapa, args.consentiu, args.ceps)
+    fila = FilaEmail() if args.enviar else None
+    if args.saida:
+        os.makedirs(args.saida, exist_ok=True)
+
+    # Rejeitados: só o que veio antes do ponto de retomada é mantido
+    modo = "r+" if os.path.exists(caminho_rejeitados) and estado["rejeitados_bytes"] else "w"
+    f_rej = open(caminho_rejeitados, modo, newline="", encoding="utf-8")
+    f_rej.seek(estado["rejeitados_bytes"])
+    f_rej.truncate()
+    rejeitados = csv.writer(f_rej)
+    if not estado["rejeitados_bytes"]:
+        rejeitados.writerow(["linha", "etapa", "erros", *cabecalho])
+
+    progresso = Progresso(None)  # taxa desta execução; os totais acumulados ficam em `contagens`
+    # Linhas preparadas e ainda não finalizadas, na ordem da planilha: as
+    # válidas esperam o PDF, e duplicadas/rejeitadas atrás delas esperam a vez.
+    # Finalizar sempre em ordem mantém o ponto de retomada, o arquivo de
+    # rejeitados e `contagens` coerentes entre si: tudo até estado["linha"]
+    # está contado e escrito, nada depois dela está.
+    em_voo = deque()
+    ultima_finalizada = estado["linha"]
+    quando = datetime.now()
+    proximo_estado = 0.0
+
+    def rejeitar(numero, original, erros):
+        rejeitados.writerow([numero, erros[0][0], " | ".join(m for _, m in erros), *original])
+        contagens["rejeitadas"] += 1
+        progresso.registrar(False)
+
+    def salvar(concluida=False):
+        f_rej.flush()
+        estado["linha"], estado["rejeitados_bytes"] = ultima_finalizada, f_rej.tell()
+        estado["concluida"] = concluida
+        gravar_estado(caminho_estado, estado)
+
+    def finalizar(linha, resultado=None):
+        nonlocal ultima_finalizada
+        if linha.tipo == "valida":
+            entregar(linha, resultado)
+        elif linha.tipo == "duplicada":
+            contagens["duplicadas"] += 1
+            progresso.registrar(True)
+        else:
+            rejeitar(linha.numero, linha.original, linha.erros)
+        ultima_finalizada = linha.numero
+
+    def finalizar_sem_pdf():
+        # Duplicadas e rejeitadas na frente da fila não esperam nada
+        while em_voo and em_voo[0].tipo != "valida":
+            finalizar(em_voo.popleft())
+
+    def para_renderizar(preparadas):
+        for linha in preparadas:
+            em_voo.append(linha)
+            if linha.tipo == "valida":
+                yield {**linha.dados, "enviado_em": quando.strftime('%d/%m/%Y às %H:%M')}
+            else:
+                finalizar_sem_pdf()
+
+    def entregar(linha, resultado):
+        protocolo, dados = linha.protocolo, linha.dados
+        etapa = "pdf"
+        try:
+            if isinstance(resultado, BaseException):
+                raise resultado
+            if args.saida:
+                etapa = "gravacao"
+                nome_arquivo = f"{protocolo:07d}_{nome_arquivo_pdf(dados.get('nome'), quando)}"
+                with open(os.path.join(args.saida, nome_arquivo), "wb") as f:
+                    f.write(resultado)
+            if fila is not None:
+                etapa = "fila"
+                if EMAIL_MODO == "resumo":
+                    fila.acumular_resumo(protocolo, dados, resultado, quando)
+                else:
+                    fila.enfileirar(montar_mensagem(dados, resultado, quando), anexos(dados))
+        except Exception as e:
+            importador.armazem.liberar_chave(linha.chave)
+            rejeitar(linha.numero, linha.original, [(etapa, f"{type(e).__name__}: {e}")])
+        else:
+            importador.armazem.concluir_chave(linha.chave)
+            contagens["importadas"] += 1
+            progresso.registrar(True)
+
+    pendentes = ((n, v) for n, v in linhas if n > estado["linha"])
+    with ThreadPoolExecutor(args.concorrencia, thread_name_prefix="importar") as executor:
+        preparadas = em_ordem(executor, importador.preparar, pendentes, args.concorrencia * 2)
+        resultados = RenderizadorPDF().render_many(para_renderizar(preparadas), args.processos,
+                                                   return_exceptions=True)
+        try:
+            for resultado in resultados:
+                finalizar(em_voo.popleft(), resultado)
+                finalizar_sem_pdf()
+                if time.monotonic() >= proximo_estado:
+                    salvar()
+                    proximo_estado = time.monotonic() + INTERVALO_ESTADO
+        except BaseException:
+            salvar()  # Ctrl+C ou falha: a próxima execução retoma do que já foi concluído
+            raise
+    progresso.concluir()
+    if fila is not None and EMAIL_MODO == "resumo":
+        fila.fechar_resumos(forcar=True)
+    salvar(concluida=True)
+    f_rej.close()
+
+    print(f"{contagens['importadas']} importadas, {contagens['duplicadas']} duplicadas, "
+          f"{contagens['rejeitadas']} rejeitadas (ver {caminho_rejeitados}).", file=sys.stderr)
+    return 1 if contagens["rejeitadas"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+"""Métricas do processo no formato texto do Prometheus.
+
+Duração de cada etapa do submit (validação, registro, PDF, MIME, fila, SMTP,
+ViaCEP), tamanho dos PDFs, consultas de CEP por resultado, falhas SMTP por
+classe de exceção e estado dos disjuntores das dependências externas. Ficam
+em memória e são expostas por um listener HTTP local e/ou gravadas
+periodicamente em arquivo (textfile collector do node_exporter):
+
+    METRICAS_PORTA=9464        ->  curl -s localhost:9464/metrics
+    METRICAS_ARQUIVO=/var/lib/node_exporter/formulario_{pid}.prom
+
+A API também expõe as métricas do seu processo em GET /metricas.
+"""
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from configuracao import get_secret
+
+log = logging.getLogger(__name__)
+
+METRICAS_HOST      = get_secret("METRICAS_HOST", "127.0.0.1")
+METRICAS_PORTA     = get_secret("METRICAS_PORTA")
+METRICAS_ARQUIVO   = get_secret("METRICAS_ARQUIVO")   # aceita {pid} no nome
+METRICAS_INTERVALO = float(get_secret("METRICAS_INTERVALO", 15))
+
+TIPO_CONTEUDO = "text/plain; version=0.0.4; charset=utf-8"
+
+BALDES_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BALDES_BYTES    = (4_096, 8_192, 16_384, 32_768, 65_536, 131_072, 262_144, 524_288, 1_048_576)
+
+_metricas = []
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", r"\\").replace('"', r'\"').replace("\n", r"\n")
+
+
+def _rotulos(nomes, valores, extra=""):
+    pares = [f'{n}="{_escapar(v)}"' for n, v in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _numero(valor):
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class _Metrica:
+    tipo = None
+
+    def __init__(self, nome, ajuda, rotulos=()):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = tuple(rotulos)
+        self._trava = threading.Lock()
+        self._series = {}
+        _metricas.append(self)
+
+    def _chave(self, rotulos):
+        if set(rotulos) != set(self.rotulos):
+            raise ValueError(f"{self.nome}: rótulos esperados {self.rotulos}, recebidos {tuple(rotulos)}")
+        return tuple(str(rotulos[n]) for n in self.rotulos)
+
+    def texto(self):
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+        with self._trava:
+            series = sorted(self._series.items())
+            linhas.extend(self._amostras(series))
+        return "\n".join(linhas)
+
+
+class Contador(_Metrica):
+    """Contador monotônico, opcionalmente com rótulos."""
+
+    tipo = "counter"
+
+    def __init__(self, nome, ajuda, rotulos=()):
+        super().__init__(nome, ajuda, rotulos)
+        if not self.rotulos:
+            self._series[()] = 0
+
+    def inc(self, valor=1, **rotulos):
+        chave = self._chave(rotulos)
+        with self._trava:
+            self._series[chave] = self._series.get(chave, 0) + valor
+
+    def valor(self, **rotulos):
+        with self._trava:
+            return self._series.get(self._chave(rotulos), 0)
+
+    def _amostras(self, series):
+        for chave, total in series:
+            yield f"{self.nome}{_rotulos(self.rotulos, chave)} {_numero(total)}"
+
+
+class Medidor(_Metrica):
+    """Valor que sobe e desce (gauge), opcionalmente com rótulos."""
+
+    tipo = "gauge"
+
+    def definir(self, valor, **rotulos):
+        chave = self._chave(rotulos)
+        with self._trava:
+            self._series[chave] = valor
+
+    def valor(self, **rotulos):
+        with self._trava:
+            return self._series.get(self._chave(rotulos), 0)
+
+    def _amostras(self, series):
+        for chave, valor in series:
+            yield f"{self.nome}{_rotulos(self.rotulos, chave)} {_numero(valor)}"
+
+
+class Histograma(_Metrica):
+    """Histograma com baldes fixos (`le` inclusivo), soma e contagem."""
+
+    tipo = "histogram"
+
+    def __init__(self, nome, ajuda, rotulos=(), baldes=BALDES_SEGUNDOS):
+        super().__init__(nome, ajuda, rotulos)
+        self.baldes = tuple(sorted(baldes))
+        if not self.rotulos:
+            self._series[()] = [[0] * (len(self.baldes) + 1), 0.0]
+
+    def observar(self, valor, **rotulos):
+        chave = self._chave(rotulos)
+        posicao = bisect_left(self.baldes, valor)
+        with self._trava:
+            serie = self._series.get(chave)
+            if serie is None:
+                # contagens por balde (o último é +Inf), soma
+                serie = self._series[chave] = [[0] * (len(self.baldes) + 1), 0.0]
+            serie[0][posicao] += 1
+            serie[1] += valor
+
+    @contextmanager
+    def medir(self, **rotulos):
+        """Observa a duração do bloco em segundos (também quando ele levanta exceção)."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio, **rotulos)
+
+    def contagem(self, **rotulos):
+        with self._trava:
+            serie = self._series.get(self._chave(rotulos))
+            return sum(serie[0]) if serie else 0
+
+    def _amostras(self, series):
+        for chave, (contagens, soma) in series:
+            acumulado = 0
+            for limite, n in zip(self.baldes + (float("inf"),), contagens):
+                acumulado += n
+                le = 'le="' + _numero(limite) + '"'
+                yield f"{self.nome}_bucket{_rotulos(self.rotulos, chave, le)} {acumulado}"
+            yield f"{self.nome}_sum{_rotulos(self.rotulos, chave)} {_numero(soma)}"
+            yield f"{self.nome}_count{_rotulos(self.rotulos, chave)} {acumulado}"
+
+
+# =====================
+# Métricas do formulário
+# =====================
+DURACAO_ETAPA = Histograma(
+    "formulario_etapa_duracao_segundos",
+    "Duração de cada etapa do envio (validacao, registro, pdf, anexo, fila, smtp_conexao, smtp_envio, cep_http).",
+    ("etapa",),
+)
+DURACAO_SUBMISSAO = Histograma(
+    "formulario_submissao_duracao_segundos",
+    "Duração total do processamento de uma submissão, pela etapa em que terminou.",
+    ("resultado",),
+)
+SUBMISSOES = Contador(
+    "formulario_submissoes_total",
+    "Submissões processadas, pela etapa em que terminaram (concluido ou etapa da falha).",
+    ("resultado",),
+)
+PDF_BYTES = Histograma(
+    "formulario_pdf_bytes",
+    "Tamanho dos PDFs gerados.",
+    baldes=BALDES_BYTES,
+)
+CEP_CONSULTAS = Contador(
+    "formulario_cep_consultas_total",
+    "Consultas de CEP por resultado (indice, acerto, acerto_negativo, obsoleto, falta, erro, disjuntor).",
+    ("resultado",),
+)
+SMTP_ENVIADOS = Contador(
+    "formulario_smtp_enviados_total",
+    "E-mails entregues ao servidor SMTP.",
+)
+SMTP_FALHAS = Contador(
+    "formulario_smtp_falhas_total",
+    "Falhas de envio SMTP por classe de exceção.",
+    ("excecao",),
+)
+DISJUNTOR_ESTADO = Medidor(
+    "formulario_disjuntor_estado",
+    "Estado do disjuntor de cada dependência externa (0 fechado, 1 meio aberto, 2 aberto).",
+    ("dependencia",),
+)
+DISJUNTOR_REJEICOES = Contador(
+    "formulario_disjuntor_rejeicoes_total",
+    "Chamadas recusadas pelo disjuntor sem tocar a dependência (aberto ou lotado).",
+    ("dependencia", "motivo"),
+)
+
+
+def texto_prometheus():
+    """Todas as métricas do processo no formato de exposição texto (0.0.4)."""
+    return "\n".join(m.texto() for m in _metricas) + "\n"
+
+
+# =====================
+# Exportação
+# =====================
+def _servidor_http(host, porta):
+    # http.server (e o que ele importa) só quando o listener está configurado
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class _Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            corpo = texto_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", TIPO_CONTEUDO)
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    servidor = ThreadingHTTPServer((host, porta), _Handler)
+    servidor.daemon_threads = True
+    return servidor
+
+
+def gravar_arquivo(caminho):
+    """Grava as métricas em `caminho` de forma atômica (escreve ao lado e renomeia)."""
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.write(texto_prometheus())
+    os.replace(temporario, caminho)
+
+
+def _gravar_periodicamente(caminho, intervalo):
+    while True:
+        try:
+            gravar_arquivo(caminho)
+        except OSError as e:
+            log.warning("Não foi possível gravar métricas em %s: %r", caminho, e)
+        time.sleep(intervalo)
+
+
+_iniciado = False
+_trava_inicio = threading.Lock()
+
+
+def iniciar_exportacao(porta=None, arquivo=None):
+    """Sobe (uma vez por processo) o listener HTTP e/ou a gravação em arquivo configurados."""
+    global _iniciado
+    porta = porta or METRICAS_PORTA
+    arquivo = arquivo or METRICAS_ARQUIVO
+    with _trava_inicio:
+        if _iniciado:
+            return
+        _iniciado = True
+    if porta:
+        try:
+            servidor = _servidor_http(METRICAS_HOST, int(porta))
+        except OSError as e:
+            # Ex.: vários workers no mesmo host; use METRICAS_ARQUIVO com {pid}
+            log.warning("Listener de métricas não iniciado em %s:%s: %r", METRICAS_HOST, porta, e)
+        else:
+            threading.Thread(target=servidor.serve_forever, name="metricas-http", daemon=True).start()
+    if arquivo:
+        caminho = arquivo.format(pid=os.getpid())
+        threading.Thread(
+            target=_gravar_periodicamente, args=(caminho, METRICAS_INTERVALO),
+            name="metricas-arquivo", daemon=True,
+        ).start()
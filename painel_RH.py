@@ -0,0 +1,130 @@
+"""Painel de recrutamento: agregados das submissões (página do admin_RH.py).
+
+Os números vêm da base analítica em Parquet (analise.py), sincronizada com o
+armazém de submissões no máximo a cada SINCRONIZAR_A_CADA segundos. A tabela
+colunar fica em memória no processo e só é relida quando entram partes novas.
+Cada mudança de filtro refaz apenas os agregados vetorizados, sem reler o
+disco nem decodificar JSON.
+"""
+from datetime import date, datetime, timedelta
+
+import pyarrow.compute as pc
+import streamlit as st
+
+from analise import ArmazemAnalitico, filtrar, resumo
+from processamento import armazem_submissoes
+
+SINCRONIZAR_A_CADA = 60  # s
+
+if not st.session_state.get("admin_autenticado"):
+    st.error("Abra o painel pelo admin_RH.py.")
+    st.stop()
+
+
+@st.cache_data(ttl=SINCRONIZAR_A_CADA, show_spinner=False)
+def sincronizar():
+    """Copia as submissões novas para a base analítica (uma vez por janela, por processo)."""
+    return ArmazemAnalitico().sincronizar(armazem_submissoes())
+
+
+@st.cache_resource(max_entries=1, show_spinner="Carregando submissões...")
+def carregar(partes):
+    """Tabela Arrow de todas as `partes` (a tupla muda quando entram partes novas)."""
+    return ArmazemAnalitico().ler()
+
+
+def categorias(tabela, coluna):
+    """Valores distintos de uma coluna dictionary-encoded, sem varrer as linhas."""
+    if not tabela.num_rows:
+        return []
+    return sorted(v for v in tabela[coluna].chunk(0).dictionary.to_pylist() if v)
+
+
+def barras(agregado, coluna, **opcoes):
+    """Gráfico de barras de um agregado (coluna, candidatos), com os nulos como "Não informado"."""
+    dados = agregado.to_pandas()
+    dados[coluna] = dados[coluna].astype("string").fillna("Não informado")
+    st.bar_chart(dados, x=coluna, y="candidatos", x_label="", y_label="", **opcoes)
+
+
+st.title("Painel de Recrutamento")
+sincronizar()
+tabela = carregar(tuple(p.caminho for p in ArmazemAnalitico().partes()))
+if not tabela.num_rows:
+    st.info("Nenhuma submissão registrada ainda.")
+    st.stop()
+
+# =====================
+# Filtros
+# =====================
+with st.form("filtros_painel"):
+    col1, col2, col3 = st.columns([2, 3, 2])
+    periodo = col1.date_input("Período", value=(date.today() - timedelta(days=365), date.today()),
+                              format="DD/MM/YYYY")
+    vagas = col2.multiselect("Vagas", categorias(tabela, "vaga"))
+    ufs = col3.multiselect("UF", categorias(tabela, "uf"))
+    st.form_submit_button("Aplicar")
+
+desde, ate = (tuple(periodo) + (None, None))[:2]
+inicio = datetime.now()
+selecao = filtrar(tabela, desde, ate, vagas, ufs)
+agregados = resumo(selecao)
+decorrido = (datetime.now() - inicio).total_seconds() * 1e3
+st.caption(f"{selecao.num_rows} de {tabela.num_rows} candidatos, agregados em {decorrido:.0f} ms")
+if not selecao.num_rows:
+    st.stop()
+
+# =====================
+# Visão geral
+# =====================
+mediana = pc.approximate_median(selecao["pretensao"]).as_py()
+col1, col2, col3 = st.columns(3)
+col1.metric("Candidatos", f"{selecao.num_rows:,}".replace(",", "."))
+col2.metric("Pretensão mediana", f"R$ {mediana:,.0f}".replace(",", ".") if mediana else "—")
+col3.metric("Com algum idioma", f"{100 * (1 - agregados['sem_idioma'] / selecao.num_rows):.0f}%")
+
+st.subheader("Candidatos por mês")
+st.bar_chart(agregados["por_mes"].to_pandas(), x="mes", y="candidatos", x_label="", y_label="")
+
+# =====================
+# Vagas e pretensão
+# =====================
+st.subheader("Vagas")
+st.dataframe(
+    agregados["por_vaga"],
+    column_config={
+        "vaga": "Vaga", "candidatos": "Candidatos",
+        "p25": st.column_config.NumberColumn("Pretensão (1º quartil)", format="R$ %.0f"),
+        "mediana": st.column_config.NumberColumn("Pretensão (mediana)", format="R$ %.0f"),
+        "p75": st.column_config.NumberColumn("Pretensão (3º quartil)", format="R$ %.0f"),
+    },
+    hide_index=True,
+)
+st.subheader("Distribuição da pretensão salarial")
+faixas = agregados["faixas_pretensao"].to_pandas()
+faixas["faixa"] = faixas["faixa"].map(lambda v: f"R$ {v:,.0f}".replace(",", "."))
+st.bar_chart(faixas, x="faixa", y="candidatos", x_label="a partir de", y_label="", sort=False)
+
+# =====================
+# Local
+# =====================
+col1, col2 = st.columns(2)
+with col1:
+    st.subheader("Por UF")
+    barras(agregados["por_uf"], "uf", sort="-candidatos")
+with col2:
+    st.subheader("Cidades com mais candidatos")
+    st.dataframe(agregados["por_cidade"], column_config={"uf": "UF", "cidade": "Cidade", "candidatos": "Candidatos"},
+                 hide_index=True)
+
+# =====================
+# Formação e idiomas
+# =====================
+col1, col2 = st.columns(2)
+with col1:
+    st.subheader("Escolaridade")
+    barras(agregados["escolaridade"], "escolaridade", horizontal=True, sort="-candidatos")
+with col2:
+    st.subheader("Idiomas")
+    barras(agregados["idiomas"], "idioma", horizontal=True, sort="-candidatos")
+    barras(agregados["nivel_idioma"], "nivel_idioma", horizontal=True, sort="-candidatos")
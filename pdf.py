@@ -0,0 +1,241 @@
+"""Geração do PDF do formulário de candidato.
+
+`RenderizadorPDF` monta estilos e os trechos fixos do documento (cabeçalho e
+títulos de seção) uma vez só e os reaproveita em cada chamada. `render_many`
+distribui lotes de registros por um ProcessPoolExecutor, para re-renderizações
+em massa usarem todos os núcleos.
+"""
+import copy
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from multiprocessing import get_context
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from configuracao import NOME_EMPRESA
+
+SECOES = (
+    "DADOS DA VAGA", "DADOS PESSOAIS", "ENDEREÇO", "CONTATO", "SITUAÇÃO FAMILIAR",
+    "ÚLTIMO EMPREGO", "PENÚLTIMO EMPREGO", "FORMAÇÃO ACADÊMICA", "IDIOMAS",
+)
+
+
+class RenderizadorPDF:
+    """Template pré-compilado do PDF do candidato."""
+
+    def __init__(self, nome_empresa=NOME_EMPRESA):
+        self.nome_empresa = nome_empresa
+
+        # Estilos
+        styles = getSampleStyleSheet()
+        self.title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=16,
+            spaceAfter=30,
+            alignment=1,  # Centralizado
+            textColor=colors.darkblue
+        )
+        self.heading_style = ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=12,
+            spaceAfter=12,
+            textColor=colors.darkblue
+        )
+        self.normal_style = styles['Normal']
+
+        # Trechos fixos, já parseados. Cada render usa uma cópia rasa: o layout
+        # grava estado (largura, linhas quebradas) no flowable, e as sessões do
+        # Streamlit renderizam em threads diferentes.
+        self._cabecalho = [
+            Paragraph("FORMULÁRIO DE CANDIDATO", self.title_style),
+            Paragraph(f"<b>{nome_empresa}</b>", self.title_style),
+            Spacer(1, 20),
+        ]
+        self._secoes = {titulo: Paragraph(titulo, self.heading_style) for titulo in SECOES}
+        self.estilo_tabela = TableStyle([
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("FONTSIZE", (0, 0), (-1, -1), 9),
+            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ])
+
+    def _fixo(self, titulo):
+        return copy.copy(self._secoes[titulo])
+
+    def render(self, dados) -> bytes:
+        """Gera PDF com os dados do formulário"""
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
+
+        # Texto do candidato entra no markup do Paragraph: escapa <, > e &
+        def texto(chave):
+            valor = dados.get(chave)
+            return escape(str(valor if valor is not None else ''))
+
+        # Conteúdo do PDF
+        story = []
+
+        # Título
+        story.extend(copy.copy(f) for f in self._cabecalho)
+
+        # Dados da Vaga
+        story.append(self._fixo("DADOS DA VAGA"))
+        story.append(Paragraph(f"<b>Vaga:</b> {texto('vaga')}", self.normal_style))
+        story.append(Paragraph(f"<b>Pretensão Salarial:</b> R$ {dados.get('pretensao') or 0:.2f}", self.normal_style))
+        story.append(Spacer(1, 12))
+
+        # Dados Pessoais
+        story.append(self._fixo("DADOS PESSOAIS"))
+        story.append(Paragraph(f"<b>Nome:</b> {texto('nome')}", self.normal_style))
+        story.append(Paragraph(f"<b>Data de Nascimento:</b> {texto('data_nascimento')}", self.normal_style))
+        story.append(Paragraph(f"<b>CPF:</b> {texto('cpf')}", self.normal_style))
+        story.append(Paragraph(f"<b>RG:</b> {texto('identidade')} - Órgão: {texto('orgao_expedidor')} - UF: {texto('uf_rg')} - Data: {texto('data_expedicao')}", self.normal_style))
+        story.append(Spacer(1, 12))
+
+        # Endereço
+        story.append(self._fixo("ENDEREÇO"))
+        story.append(Paragraph(f"<b>CEP:</b> {texto('cep')}", self.normal_style))
+        story.append(Paragraph(f"<b>Endereço:</b> {texto('logradouro')}, {texto('numero')} - {texto('complemento')}", self.normal_style))
+        story.append(Paragraph(f"<b>Bairro:</b> {texto('bairro')}", self.normal_style))
+        story.append(Paragraph(f"<b>Cidade:</b> {texto('cidade')} - {texto('uf_endereco')}", self.normal_style))
+        story.append(Spacer(1, 12))
+
+        # Contato
+        story.append(self._fixo("CONTATO"))
+        story.append(Paragraph(f"<b>Telefone:</b> {texto('telefone')}", self.normal_style))
+        story.append(Paragraph(f"<b>E-mail:</b> {texto('email')}", self.normal_style))
+        story.append(Spacer(1, 12))
+
+        # Situação Familiar
+        story.append(self._fixo("SITUAÇÃO FAMILIAR"))
+        story.append(Paragraph(f"<b>Estado Civil:</b> {texto('estado_civil')}", self.normal_style))
+        story.append(Paragraph(f"<b>Sexo:</b> {texto('sexo')}", self.normal_style))
+        story.append(Paragraph(f"<b>PCD:</b> {texto('pcd')}", self.normal_style))
+        story.append(Paragraph(f"<b>Número de Filhos:</b> {dados.get('filhos', 0)}", self.normal_style))
+        story.append(Paragraph(f"<b>Dependentes IR:</b> {dados.get('dependentes_ir', 0)}", self.normal_style))
+        dependentes = dados.get('dependentes') or []
+        if dependentes:
+            story.append(Spacer(1, 6))
+            story.append(self._tabela_dependentes(dependentes))
+        story.append(Spacer(1, 12))
+
+        # Último Emprego
+        story.append(self._fixo("ÚLTIMO EMPREGO"))
+        story.append(Paragraph(f"<b>Empresa:</b> {texto('ultimo_emprego')}", self.normal_style))
+        story.append(Paragraph(f"<b>Cargo:</b> {texto('ultimo_cargo')}", self.normal_style))
+        story.append(Paragraph(f"<b>Período:</b> {texto('data_admissao')} a {texto('data_desligamento')}", self.normal_style))
+        story.append(Paragraph(f"<b>Atividades:</b> {texto('atividades_ultimo_cargo')}", self.normal_style))
+        story.append(Paragraph(f"<b>Motivo da Saída:</b> {texto('motivo_saida')}", self.normal_style))
+        story.append(Paragraph(f"<b>Telefone:</b> {texto('telefone_ultimo_emprego')}", self.normal_style))
+        story.append(Paragraph(f"<b>Contato:</b> {texto('contato_ultimo_emprego')}", self.normal_style))
+        story.append(Spacer(1, 12))
+
+        # Penúltimo Emprego
+        story.append(self._fixo("PENÚLTIMO EMPREGO"))
+        story.append(Paragraph(f"<b>Empresa:</b> {texto('penultimo_emprego')}", self.normal_style))
+        story.append(Paragraph(f"<b>Cargo:</b> {texto('penultimo_cargo')}", self.normal_style))
+        story.append(Paragraph(f"<b>Período:</b> {texto('data_admissao_penultimo')} a {texto('data_desligamento_penultimo')}", self.normal_style))
+        story.append(Paragraph(f"<b>Atividades:</b> {texto('atividades_penultimo_cargo')}", self.normal_style))
+        story.append(Paragraph(f"<b>Motivo da Saída:</b> {texto('motivo_saida_penultimo')}", self.normal_style))
+        story.append(Paragraph(f"<b>Telefone:</b> {texto('telefone_penultimo_emprego')}", self.normal_style))
+        story.append(Paragraph(f"<b>Contato:</b> {texto('contato_penultimo_emprego')}", self.normal_style))
+        story.append(Spacer(1, 12))
+
+        # Formação
+        story.append(self._fixo("FORMAÇÃO ACADÊMICA"))
+        story.append(Paragraph(f"<b>Escolaridade:</b> {texto('escolaridade')}", self.normal_style))
+        story.append(Paragraph(f"<b>Curso:</b> {texto('curso')}", self.normal_style))
+        story.append(Paragraph(f"<b>Instituição:</b> {texto('instituicao')}", self.normal_style))
+        story.append(Paragraph(f"<b>Ano de Conclusão:</b> {texto('ano_conclusao')}", self.normal_style))
+        story.append(Paragraph(f"<b>Situação:</b> {texto('situacao')}", self.normal_style))
+        story.append(Paragraph(f"<b>Outra Formação:</b> {texto('outra_formacao')}", self.normal_style))
+        story.append(Spacer(1, 12))
+
+        # Idiomas
+        story.append(self._fixo("IDIOMAS"))
+        story.append(Paragraph(f"<b>Idiomas:</b> {escape(', '.join(dados.get('idiomas') or []))}", self.normal_style))
+        story.append(Paragraph(f"<b>Nível:</b> {texto('nivel_idioma')}", self.normal_style))
+        if dados.get('curriculo'):
+            # nome do arquivo vem do navegador do candidato: escapa para o markup do Paragraph
+            story.append(Paragraph(f"<b>Currículo anexado:</b> {escape(str(dados['curriculo'].get('nome', '')))}", self.normal_style))
+        story.append(Spacer(1, 20))
+
+        # Rodapé
+        enviado_em = texto('enviado_em') or datetime.now().strftime('%d/%m/%Y às %H:%M')
+        story.append(Paragraph(f"<i>Formulário enviado em: {enviado_em}</i>", self.normal_style))
+        story.append(Paragraph(f"<i>Consentimento LGPD: {dados.get('consentiu', False)}</i>", self.normal_style))
+
+        # Construir PDF
+        doc.build(story)
+        return buffer.getvalue()
+
+    def _tabela_dependentes(self, dependentes):
+        # Texto puro nas células (sem markup): o nome vem do candidato
+        linhas = [("Nome", "Parentesco", "CPF")]
+        linhas.extend((d.get('nome', ''), d.get('parentesco', ''), d.get('cpf', '')) for d in dependentes)
+        return Table(linhas, colWidths=(240, 110, 100), style=self.estilo_tabela, repeatRows=1, hAlign="LEFT")
+
+    def render_many(self, records, max_workers=None, return_exceptions=False):
+        """Renderiza um iterável de registros em paralelo, devolvendo os PDFs na mesma ordem.
+
+        Consome `records` sob demanda (no máximo 4 tarefas por processo em voo),
+        então serve para lotes de qualquer tamanho. Com `return_exceptions=True`
+        a exceção de um registro é devolvida no lugar do PDF em vez de
+        interromper o lote.
+        """
+        max_workers = max_workers or os.cpu_count() or 1
+        # "spawn": o Streamlit roda várias threads e fork com threads é inseguro
+        executor = ProcessPoolExecutor(
+            max_workers, mp_context=get_context("spawn"),
+            initializer=_iniciar_processo, initargs=(self.nome_empresa,),
+        )
+        pendentes = deque()
+        try:
+            for dados in records:
+                pendentes.append(executor.submit(_renderizar, dados))
+                if len(pendentes) >= max_workers * 4:
+                    yield _resultado(pendentes.popleft(), return_exceptions)
+            while pendentes:
+                yield _resultado(pendentes.popleft(), return_exceptions)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _resultado(futuro, return_exceptions):
+    if return_exceptions:
+        return futuro.exception() or futuro.result()
+    return futuro.result()
+
+
+_renderizador_processo = None
+
+
+def _iniciar_processo(nome_empresa):
+    global _renderizador_processo
+    _renderizador_processo = RenderizadorPDF(nome_empresa)
+
+
+def _renderizar(dados):
+    return _renderizador_processo.render(dados)
+
+
+@lru_cache(maxsize=None)
+def renderizador():
+    """Renderizador padrão do processo."""
+    return RenderizadorPDF()
+
+
+def gerar_pdf_formulario(dados):
+    """Gera PDF com os dados do formulário"""
+    return renderizador().render(dados)
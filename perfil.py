@@ -0,0 +1,363 @@
+"""Perfil por amostragem das execuções do formulário e do envio, para achar a causa dos picos.
+
+Com PERFIL_AMOSTRA > 0, essa fração das execuções envolvidas por `perfilar`
+(a execução do script, cada fragmento, `processar_submissao`) é perfilada:
+uma thread do processo lê a pilha das threads sorteadas a cada
+PERFIL_INTERVALO_MS (`sys._current_frames`, sem instrumentar as chamadas) e
+conta as pilhas. O custo fica na thread de amostragem e só existe enquanto há
+execução sorteada; fora do sorteio o custo é um `random()`.
+
+Conta tempo de relógio, não de CPU: espera de rede (ViaCEP, SMTP), disputa
+pela trava do SQLite e montagem de widgets aparecem do mesmo jeito.
+
+Ao fim de cada execução sorteada que durou ao menos PERFIL_MIN_MS, grava em
+PERFIL_PASTA:
+
+    <etapa>_<ms>ms_<data-hora>_<pid>-<n>.folded   pilhas no formato "a;b;c contagem"
+    <etapa>_<ms>ms_<data-hora>_<pid>-<n>.prof     pstats do cProfile (com PERFIL_CPROFILE=1)
+
+O nome começa pela etapa e pela duração com zeros à esquerda, então `ls`
+lista cada etapa da mais rápida para a mais lenta. A pasta guarda os
+PERFIL_MAX_ARQUIVOS mais recentes. Os .folded abrem no speedscope ou no
+flamegraph.pl. Para um resumo no terminal:
+
+    python perfil.py [--etapa submissao] [--min-ms 2000] [--top 25] [-o juntos.folded]
+
+O cProfile mede cada chamada, e o custo dele chega a dobrar o tempo do
+script. Por isso só vale para as execuções sorteadas e só com PERFIL_CPROFILE=1.
+"""
+import itertools
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache, wraps
+
+from configuracao import PASTA_DADOS, get_secret
+
+log = logging.getLogger(__name__)
+
+PERFIL_AMOSTRA           = float(get_secret("PERFIL_AMOSTRA", 0))      # fração das execuções (0 desliga)
+PERFIL_AMOSTRA_SUBMISSAO = float(get_secret("PERFIL_AMOSTRA_SUBMISSAO", PERFIL_AMOSTRA))
+PERFIL_INTERVALO_MS      = float(get_secret("PERFIL_INTERVALO_MS", 5))
+PERFIL_MIN_MS            = float(get_secret("PERFIL_MIN_MS", 0))       # só grava execuções desta duração para cima
+PERFIL_MAX_S             = float(get_secret("PERFIL_MAX_S", 120))      # execução mais longa que isso é descartada
+PERFIL_MAX_ARQUIVOS      = int(get_secret("PERFIL_MAX_ARQUIVOS", 500))
+PERFIL_CPROFILE          = str(get_secret("PERFIL_CPROFILE", "0")).lower() in ("1", "true", "sim")
+PERFIL_MAX_ROTULOS       = int(get_secret("PERFIL_MAX_ROTULOS", 4096))   # rótulos de função guardados
+PERFIL_PASTA             = get_secret("PERFIL_PASTA", os.path.join(PASTA_DADOS, "perfis"))
+PASTA_APP                = os.path.dirname(os.path.abspath(__file__))
+
+_sequencia = itertools.count(1)
+
+
+# =====================
+# Amostragem
+# =====================
+def _arquivo(caminho):
+    # Módulos do app pelo nome; os demais com a pasta (pandas/core/api.py não vira "api.py")
+    pasta, nome = os.path.split(caminho)
+    return nome if pasta == PASTA_APP else f"{os.path.basename(pasta)}/{nome}".lstrip("/")
+
+
+@lru_cache(maxsize=PERFIL_MAX_ROTULOS)
+def _rotulo(codigo):
+    # Por objeto de código: o mesmo código aparece em quase toda amostra
+    return f"{codigo.co_name} ({_arquivo(codigo.co_filename)}:{codigo.co_firstlineno})"
+
+
+def _pilha(frame):
+    """Pilha de `frame` no formato folded, da raiz para o topo."""
+    rotulos = []
+    while frame is not None:
+        rotulos.append(_rotulo(frame.f_code))
+        frame = frame.f_back
+    rotulos.reverse()
+    return ";".join(rotulos)
+
+
+class _Amostrador(threading.Thread):
+    """Thread única do processo que amostra as pilhas das threads com execução sorteada."""
+
+    def __init__(self, intervalo):
+        super().__init__(name="perfil-amostrador", daemon=True)
+        self.intervalo = intervalo
+        self._trava = threading.Lock()
+        self._ativas = {}                 # ident da thread -> [Execucao]
+        self._ha_ativas = threading.Event()
+
+    def registrar(self, execucao):
+        with self._trava:
+            self._ativas.setdefault(execucao.thread, []).append(execucao)
+            self._ha_ativas.set()
+
+    def remover(self, execucao):
+        with self._trava:
+            execucoes = self._ativas.get(execucao.thread, [])
+            if execucao in execucoes:
+                execucoes.remove(execucao)
+            if not execucoes:
+                self._ativas.pop(execucao.thread, None)
+            if not self._ativas:
+                self._ha_ativas.clear()
+
+    def run(self):
+        while True:
+            self._ha_ativas.wait()
+            time.sleep(self.intervalo)
+            agora = time.perf_counter()
+            frames = sys._current_frames()
+            with self._trava:
+                for thread, execucoes in list(self._ativas.items()):
+                    frame = frames.get(thread)
+                    pilha = _pilha(frame) if frame is not None else None
+                    for execucao in list(execucoes):
+                        if agora - execucao.inicio > PERFIL_MAX_S:
+                            execucao.descartada = True     # não terminou (thread morta, execução presa)
+                            execucoes.remove(execucao)
+                        elif pilha:
+                            execucao.amostras[pilha] += 1
+                    if not execucoes:
+                        del self._ativas[thread]
+                if not self._ativas:
+                    self._ha_ativas.clear()
+            del frames
+
+
+_amostrador = None
+_trava_amostrador = threading.Lock()
+
+
+def amostrador():
+    """Thread de amostragem do processo, iniciada no primeiro uso."""
+    global _amostrador
+    with _trava_amostrador:
+        if _amostrador is None:
+            _amostrador = _Amostrador(PERFIL_INTERVALO_MS / 1e3)
+            _amostrador.start()
+        return _amostrador
+
+
+# =====================
+# Execuções
+# =====================
+_perfis_cprofile = threading.local()   # thread -> cProfile ativo (só um por thread)
+
+
+class Execucao:
+    """Uma execução sorteada: as amostras de pilha da thread que a iniciou."""
+
+    def __init__(self, etapa):
+        self.etapa = etapa
+        self.thread = threading.get_ident()
+        self.amostras = Counter()
+        self.descartada = False
+        self.cprofile = None
+        self.inicio = time.perf_counter()
+
+    def iniciar(self):
+        if PERFIL_CPROFILE and getattr(_perfis_cprofile, "ativo", None) is None:
+            import cProfile
+
+            self.cprofile = _perfis_cprofile.ativo = cProfile.Profile()
+            self.cprofile.enable()
+        amostrador().registrar(self)
+        self.inicio = time.perf_counter()
+        return self
+
+    def encerrar(self, pasta=None):
+        """Para a amostragem e manda gravar os arquivos; devolve False se a execução foi descartada."""
+        duracao_ms = (time.perf_counter() - self.inicio) * 1e3
+        amostrador().remover(self)
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            _perfis_cprofile.ativo = None
+        if self.descartada or duracao_ms < PERFIL_MIN_MS:
+            return False
+        # A gravação (e a rotação da pasta) fica fora do tempo de resposta
+        gravador().put((self.etapa, duracao_ms, datetime.now(), self.amostras, self.cprofile, pasta or PERFIL_PASTA))
+        return True
+
+
+def sortear(taxa=None):
+    taxa = PERFIL_AMOSTRA if taxa is None else taxa
+    return taxa > 0 and (taxa >= 1 or random.random() < taxa)
+
+
+@contextmanager
+def perfilar(etapa, taxa=None, pasta=None):
+    """Perfila o bloco com probabilidade `taxa` (padrão PERFIL_AMOSTRA).
+
+    Blocos aninhados sorteiam cada um por si e gravam arquivos separados. A
+    gravação é feita em segundo plano; erros dela só vão para o log.
+    """
+    if not sortear(taxa):
+        yield None
+        return
+    execucao = Execucao(etapa).iniciar()
+    try:
+        yield execucao
+    finally:
+        execucao.encerrar(pasta)
+
+
+def perfilado(etapa=None, taxa=None):
+    """Decorador: `perfilar` a cada chamada, com a etapa padrão igual ao nome da função."""
+    def decorar(funcao):
+        nome = etapa or funcao.__name__
+
+        @wraps(funcao)
+        def envolvida(*args, **kwargs):
+            with perfilar(nome, taxa):
+                return funcao(*args, **kwargs)
+        return envolvida
+    return decorar
+
+
+# =====================
+# Arquivos
+# =====================
+def gravar(etapa, duracao_ms, quando, amostras, cprofile=None, pasta=PERFIL_PASTA):
+    """Grava <etapa>_<ms>ms_... .folded (e .prof) e devolve o caminho base, sem extensão."""
+    os.makedirs(pasta, exist_ok=True)
+    base = os.path.join(pasta, f"{etapa}_{int(duracao_ms):07d}ms_{quando:%Y%m%d-%H%M%S}"
+                               f"_{os.getpid()}-{next(_sequencia)}")
+    with open(base + ".folded", "w", encoding="utf-8") as f:
+        for pilha, contagem in amostras.most_common():
+            f.write(f"{etapa};{pilha} {contagem}\n")
+    if cprofile is not None:
+        cprofile.dump_stats(base + ".prof")
+    return base
+
+
+def _gravar_fila(fila):
+    while True:
+        pastas = set()
+        item = fila.get()
+        while True:
+            try:
+                gravar(*item)
+                pastas.add(item[-1])
+            except Exception:
+                log.exception("Falha ao gravar o perfil de %s", item[0])
+            fila.task_done()
+            try:
+                item = fila.get_nowait()
+            except queue.Empty:
+                break
+        # Uma rotação por lote: com PERFIL_AMOSTRA alto, um rerun grava vários arquivos de uma vez
+        for pasta in pastas:
+            try:
+                rotacionar(pasta)
+            except OSError as e:
+                log.warning("Falha ao rotacionar os perfis de %s: %s", pasta, e)
+
+
+_gravador = None
+
+
+def gravador():
+    """Fila de gravação do processo, com a thread que grava os perfis iniciada no primeiro uso."""
+    global _gravador
+    with _trava_amostrador:
+        if _gravador is None:
+            _gravador = queue.Queue()
+            threading.Thread(target=_gravar_fila, args=(_gravador,), name="perfil-gravador", daemon=True).start()
+        return _gravador
+
+
+def rotacionar(pasta=PERFIL_PASTA, maximo=None):
+    """Mantém só os `maximo` arquivos mais recentes da pasta."""
+    maximo = PERFIL_MAX_ARQUIVOS if maximo is None else maximo
+    arquivos = []
+    with os.scandir(pasta) as entradas:
+        for entrada in entradas:
+            if entrada.is_file() and entrada.name.endswith((".folded", ".prof")):
+                try:
+                    arquivos.append((entrada.stat().st_mtime, entrada.path))
+                except FileNotFoundError:
+                    pass   # outra réplica/thread apagou antes
+    if len(arquivos) <= maximo:
+        return
+    arquivos.sort()
+    for _, caminho in arquivos[:len(arquivos) - maximo]:
+        try:
+            os.unlink(caminho)
+        except FileNotFoundError:
+            pass
+
+
+def ler(caminho):
+    """(etapa, duração em ms, Counter de pilhas) de um arquivo .folded."""
+    etapa, duracao, _, _ = os.path.basename(caminho).rsplit("_", 3)
+    amostras = Counter()
+    with open(caminho, encoding="utf-8") as f:
+        for linha in f:
+            pilha, _, contagem = linha.rstrip("\n").rpartition(" ")
+            if pilha:
+                amostras[pilha] += int(contagem)
+    return etapa, int(duracao.removesuffix("ms")), amostras
+
+
+# =====================
+# Resumo (CLI)
+# =====================
+def main(argv=None):
+    import argparse
+    import glob
+
+    parser = argparse.ArgumentParser(description="Resumo dos perfis gravados em PERFIL_PASTA.")
+    parser.add_argument("--pasta", default=PERFIL_PASTA)
+    parser.add_argument("--etapa", help="só os perfis desta etapa")
+    parser.add_argument("--min-ms", type=float, default=0, help="só execuções desta duração para cima")
+    parser.add_argument("--top", type=int, default=20, help="funções listadas")
+    parser.add_argument("-o", "--saida", help="junta as pilhas selecionadas num único .folded")
+    args = parser.parse_args(argv)
+
+    duracoes, juntas = {}, Counter()
+    for caminho in sorted(glob.glob(os.path.join(args.pasta, "*.folded"))):
+        etapa, ms, amostras = ler(caminho)
+        if (args.etapa and etapa != args.etapa) or ms < args.min_ms:
+            continue
+        duracoes.setdefault(etapa, []).append(ms)
+        juntas.update(amostras)
+    if not juntas:
+        print("Nenhum perfil encontrado.")
+        return 1
+
+    for etapa, ms in sorted(duracoes.items()):
+        ms.sort()
+        print(f"{etapa:<32} {len(ms):>5} execuções   mediana {ms[len(ms) // 2]:>7} ms   máx. {ms[-1]:>7} ms")
+
+    # Inclusivo só com os módulos do app: os quadros do Streamlit e do
+    # threading estão em todas as amostras e não dizem nada
+    modulos_app = {n for n in os.listdir(PASTA_APP) if n.endswith(".py") and n != os.path.basename(__file__)}
+    total = sum(juntas.values())
+    proprio, inclusivo = Counter(), Counter()
+    for pilha, contagem in juntas.items():
+        quadros = pilha.split(";")[1:]           # sem a etapa
+        proprio[quadros[-1]] += contagem
+        for quadro in set(quadros):
+            if quadro.rpartition("(")[2].partition(":")[0] in modulos_app:
+                inclusivo[quadro] += contagem
+    for titulo, contagens in (("Tempo próprio (topo da pilha)", proprio),
+                              ("Tempo inclusivo (módulos do app)", inclusivo)):
+        print(f"\n{titulo}: {total} amostras")
+        for quadro, contagem in contagens.most_common(args.top):
+            print(f"  {100 * contagem / total:5.1f}%  {quadro}")
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            for pilha, contagem in juntas.most_common():
+                f.write(f"{pilha} {contagem}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
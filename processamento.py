@@ -0,0 +1,185 @@
+"""Pipeline de submissão compartilhado pelo formulário Streamlit e pela API.
+
+normalização -> validação -> registro no armazém -> PDF -> e-mail na fila
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+from curriculos import anexos
+from fila_email import EMAIL_MODO, FilaEmail, iniciar_trabalhador, montar_mensagem
+from metricas import DURACAO_ETAPA, DURACAO_SUBMISSAO, PDF_BYTES, SUBMISSOES
+from pdf import gerar_pdf_formulario
+from perfil import PERFIL_AMOSTRA_SUBMISSAO, perfilar
+from submissoes import ArmazemSubmissoes
+from validacao import so_digitos, validar
+
+log = logging.getLogger(__name__)
+
+ESPERA_EM_ANDAMENTO = 2.0  # quanto um reenvio espera o envio original, se ele corre neste processo (s)
+CAMPOS_SERVIDOR = ("enviado_em",)  # preenchidos na geração do PDF; o que o cliente mandar é descartado
+CAMPOS_FORA_DA_CHAVE = ("curriculo",)  # metadados do upload: não mudam a identidade do formulário
+
+# chave de idempotência -> Event do envio em curso neste processo (setado ao terminar)
+_em_curso = {}
+_trava_em_curso = threading.Lock()
+
+# ok: bool; protocolo: id no armazém (ou None); etapa: onde parou; erros: mensagens para o usuário;
+# campos: erros de validação estruturados (validacao.Erro: campo, mensagem)
+Resultado = namedtuple("Resultado", "ok protocolo etapa erros campos", defaults=((),))
+
+
+@lru_cache(maxsize=None)
+def fila_email():
+    """Fila de saída de e-mails do processo, com o trabalhador SMTP já iniciado."""
+    fila = FilaEmail()
+    iniciar_trabalhador(fila)
+    return fila
+
+
+@lru_cache(maxsize=None)
+def armazem_submissoes():
+    """Armazém local das submissões (um escritor por processo)."""
+    return ArmazemSubmissoes()
+
+
+def _digitos(valor):
+    # Valor de outro tipo fica como veio: a regra de formato da validação recusa
+    return so_digitos(valor) if isinstance(valor, str) or valor is None else valor
+
+
+def normalizar(dados):
+    """Cópia de `dados` com CPF/CEP/telefone (e CPF dos dependentes) só com dígitos e e-mail sem espaços.
+
+    Roda antes da validação: "529.982.247-25" vale como "52998224725".
+    """
+    dados = dict(dados)
+    dados['cpf'] = _digitos(dados.get('cpf'))
+    dados['cep'] = _digitos(dados.get('cep'))
+    dados['telefone'] = _digitos(dados.get('telefone'))
+    email = dados.get('email')
+    dados['email'] = email.strip() if isinstance(email, str) else (email or '')
+    # Sem a lista (clientes da API que só mandam o total), vale o dependentes_ir enviado
+    dependentes = dados.get('dependentes')
+    if isinstance(dependentes, list):
+        dados['dependentes'] = [{**d, 'cpf': _digitos(d.get('cpf'))} if isinstance(d, dict) else d
+                                for d in dependentes]
+        dados['dependentes_ir'] = len(dependentes)
+    return dados
+
+
+def chave_idempotencia(dados):
+    """Chave derivada do conteúdo de um `dados_formulario` normalizado: CPF + hash dos campos.
+
+    O mesmo formulário reenviado (duplo clique, recarga da página, novo envio
+    depois de um SMTP lento) gera a mesma chave. Só entram os campos do
+    candidato: os metadados do upload (CAMPOS_FORA_DA_CHAVE) ficam de fora,
+    então anexar de novo o currículo não faz do reenvio um formulário novo.
+    """
+    campos = {chave: valor for chave, valor in dados.items() if chave not in CAMPOS_FORA_DA_CHAVE}
+    canonico = json.dumps(campos, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{dados.get('cpf')}:{hashlib.sha256(canonico.encode('utf-8')).hexdigest()[:32]}"
+
+
+def processar_submissao(dados):
+    """Executa o pipeline completo para um `dados_formulario` e devolve um Resultado."""
+    inicio = time.perf_counter()
+    with perfilar("submissao", PERFIL_AMOSTRA_SUBMISSAO):
+        resultado = _processar(dados)
+    DURACAO_SUBMISSAO.observar(time.perf_counter() - inicio, resultado=resultado.etapa)
+    SUBMISSOES.inc(resultado=resultado.etapa)
+    return resultado
+
+
+def _processar(dados):
+    dados = normalizar({chave: valor for chave, valor in dados.items() if chave not in CAMPOS_SERVIDOR})
+    with DURACAO_ETAPA.medir(etapa="validacao"):
+        erros = validar(dados)
+    if erros:
+        return Resultado(False, None, "validacao", [e.mensagem for e in erros], tuple(erros))
+
+    chave = chave_idempotencia(dados)
+    armazem = armazem_submissoes()
+
+    # Registrar antes de qualquer etapa que possa falhar (PDF, e-mail). Um
+    # reenvio do mesmo formulário para aqui, antes de gerar PDF e e-mail.
+    try:
+        with DURACAO_ETAPA.medir(etapa="registro"):
+            protocolo, anterior = armazem.registrar(dados, chave)
+    except Exception:
+        log.exception("Falha ao registrar submissão")
+        return Resultado(False, None, "registro", ["Erro ao registrar formulário. Tente novamente ou entre em contato conosco."])
+    if anterior == "processando":
+        # Duplo clique: o envio original ainda está em curso. Se for neste
+        # processo, espera um pouco por ele (sem consultar o SQLite em laço)
+        # para mostrar a mesma confirmação; senão responde na hora.
+        with _trava_em_curso:
+            em_curso = _em_curso.get(chave)
+        if em_curso is not None and em_curso.wait(ESPERA_EM_ANDAMENTO):
+            anterior = armazem.status_chave(chave)
+        if anterior != "concluido":
+            return Resultado(False, protocolo, "em_andamento", ["Este formulário já está sendo enviado. Aguarde alguns instantes."])
+    if anterior == "concluido":
+        return Resultado(True, protocolo, "duplicada", [])
+
+    em_curso = threading.Event()
+    with _trava_em_curso:
+        _em_curso[chave] = em_curso
+    try:
+        resultado = _enviar(dados, protocolo)
+        try:
+            if resultado.ok:
+                armazem.concluir_chave(chave)
+            else:
+                armazem.liberar_chave(chave)
+        except Exception:
+            log.exception("Falha ao atualizar a chave de idempotência da submissão %s", protocolo)
+    finally:
+        with _trava_em_curso:
+            if _em_curso.get(chave) is em_curso:
+                del _em_curso[chave]
+        em_curso.set()
+    return resultado
+
+
+def _enviar(dados, protocolo):
+    """PDF e e-mail (ou resumo) de uma submissão já registrada."""
+    try:
+        with DURACAO_ETAPA.medir(etapa="pdf"):
+            pdf_content = gerar_pdf_formulario(dados)
+    except Exception:
+        log.exception("Falha ao gerar PDF da submissão %s", protocolo)
+        return Resultado(False, protocolo, "pdf", ["Erro ao gerar PDF. Tente novamente ou entre em contato conosco."])
+    PDF_BYTES.observar(len(pdf_content))
+
+    # Modo resumo: o PDF entra no próximo e-mail de lote (zip + CSV índice)
+    if EMAIL_MODO == "resumo":
+        try:
+            with DURACAO_ETAPA.medir(etapa="fila"):
+                fila_email().acumular_resumo(protocolo, dados, pdf_content)
+        except Exception:
+            log.exception("Falha ao acumular PDF da submissão %s no resumo", protocolo)
+            return Resultado(False, protocolo, "envio", ["Erro ao enviar formulário. Tente novamente ou entre em contato conosco."])
+        return Resultado(True, protocolo, "concluido", [])
+
+    # E-mail com o PDF anexo
+    try:
+        with DURACAO_ETAPA.medir(etapa="anexo"):
+            msg = montar_mensagem(dados, pdf_content)
+    except Exception:
+        log.exception("Falha ao montar e-mail da submissão %s", protocolo)
+        return Resultado(False, protocolo, "anexo", ["Erro ao anexar PDF. Tente novamente ou entre em contato conosco."])
+
+    # Envio assíncrono: grava na fila local; o trabalhador em background
+    # entrega pela conexão SMTP persistente, com novas tentativas.
+    try:
+        with DURACAO_ETAPA.medir(etapa="fila"):
+            fila_email().enfileirar(msg, anexos(dados))
+    except Exception:
+        log.exception("Falha ao enfileirar e-mail da submissão %s", protocolo)
+        return Resultado(False, protocolo, "envio", ["Erro ao enviar formulário. Tente novamente ou entre em contato conosco."])
+    return Resultado(True, protocolo, "concluido", [])
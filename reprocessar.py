@@ -0,0 +1,123 @@
+"""Re-renderiza (e opcionalmente reenvia) os PDFs das submissões armazenadas.
+
+Útil depois de mudar o layout de `gerar_pdf_formulario` ou de uma queda do
+SMTP. Os registros são lidos do armazém em streaming e renderizados em N
+processos, com no máximo alguns registros em memória por processo.
+
+Exemplos:
+
+    python reprocessar.py --desde 2026-09-01 --ate 2026-09-30 --saida pdfs/
+    python reprocessar.py --vaga "Analista" --enviar -j 8 --erros erros.csv
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from collections import deque
+from datetime import datetime
+
+from curriculos import anexos
+from fila_email import EMAIL_MODO, FilaEmail, montar_mensagem, nome_arquivo_pdf
+from pdf import RenderizadorPDF
+from submissoes import CAMINHO_SUBMISSOES, ArmazemSubmissoes
+
+
+class Progresso:
+    """Linha de progresso no stderr: processados, erros e throughput (total None = desconhecido)."""
+
+    def __init__(self, total, intervalo=0.5):
+        self.total = total
+        self.intervalo = intervalo
+        self.inicio = self._ultimo = time.perf_counter()
+        self.ok = self.erros = 0
+
+    def registrar(self, ok):
+        if ok:
+            self.ok += 1
+        else:
+            self.erros += 1
+        agora = time.perf_counter()
+        if agora - self._ultimo >= self.intervalo:
+            self._ultimo = agora
+            self._imprimir(agora, "\r")
+
+    def _imprimir(self, agora, fim):
+        feitos = self.ok + self.erros
+        taxa = feitos / max(agora - self.inicio, 1e-9)
+        restante = f", ~{(self.total - feitos) / taxa:.0f}s restantes" if taxa and self.total else ""
+        total = f"{feitos}/{self.total}" if self.total is not None else str(feitos)
+        print(f"{total} ({self.erros} erros) {taxa:.1f} registros/s{restante}",
+              end=fim, file=sys.stderr, flush=True)
+
+    def concluir(self):
+        self._imprimir(time.perf_counter(), "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-renderiza/reenvia PDFs das submissões armazenadas.")
+    parser.add_argument("--desde", help="data inicial (AAAA-MM-DD)")
+    parser.add_argument("--ate", help="data final, inclusiva (AAAA-MM-DD)")
+    parser.add_argument("--vaga", help="trecho do texto da vaga")
+    parser.add_argument("--saida", help="diretório onde gravar os PDFs")
+    parser.add_argument("--enviar", action="store_true", help="enfileira os PDFs para envio por e-mail")
+    parser.add_argument("-j", "--processos", type=int, default=os.cpu_count(), help="processos de renderização")
+    parser.add_argument("--erros", default="erros_reprocessamento.csv", help="relatório de erros por registro")
+    parser.add_argument("--db", default=CAMINHO_SUBMISSOES)
+    args = parser.parse_args(argv)
+    if not args.saida and not args.enviar:
+        parser.error("informe --saida e/ou --enviar")
+
+    armazem = ArmazemSubmissoes(args.db)
+    filtros = dict(desde=args.desde, ate=args.ate, vaga=args.vaga)
+    fila = FilaEmail() if args.enviar else None
+    if args.saida:
+        os.makedirs(args.saida, exist_ok=True)
+
+    # render_many devolve na ordem de entrada: guardamos só o cabeçalho de cada
+    # registro em voo para casar com o resultado.
+    em_voo = deque()
+
+    def registros():
+        for id_sub, recebida_em, dados in armazem.iterar(**filtros):
+            quando = datetime.fromisoformat(recebida_em)
+            em_voo.append((id_sub, quando, dados))
+            yield {**dados, "enviado_em": quando.strftime('%d/%m/%Y às %H:%M')}
+
+    progresso = Progresso(armazem.contar(**filtros))
+    with open(args.erros, "w", newline="", encoding="utf-8") as f_erros:
+        relatorio = csv.writer(f_erros)
+        relatorio.writerow(("id", "nome", "etapa", "erro"))
+        resultados = RenderizadorPDF().render_many(registros(), args.processos, return_exceptions=True)
+        for resultado in resultados:
+            id_sub, quando, dados = em_voo.popleft()
+            etapa = "pdf"
+            try:
+                if isinstance(resultado, BaseException):
+                    raise resultado
+                if args.saida:
+                    etapa = "gravacao"
+                    nome_arquivo = f"{id_sub:07d}_{nome_arquivo_pdf(dados.get('nome'), quando)}"
+                    with open(os.path.join(args.saida, nome_arquivo), "wb") as f:
+                        f.write(resultado)
+                if fila is not None:
+                    etapa = "fila"
+                    if EMAIL_MODO == "resumo":
+                        fila.acumular_resumo(id_sub, dados, resultado, quando)
+                    else:
+                        fila.enfileirar(montar_mensagem(dados, resultado, quando), anexos(dados))
+            except Exception as e:
+                relatorio.writerow((id_sub, dados.get("nome"), etapa, f"{type(e).__name__}: {e}"))
+                progresso.registrar(False)
+            else:
+                progresso.registrar(True)
+    progresso.concluir()
+    if fila is not None and EMAIL_MODO == "resumo":
+        fila.fechar_resumos(forcar=True)
+    if progresso.erros:
+        print(f"Relatório de erros: {args.erros}", file=sys.stderr)
+    return 1 if progresso.erros else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""Disjuntores (circuit breakers) e prazos para as chamadas a serviços externos.
+
+Cada dependência (ViaCEP, SMTP) tem um `Disjuntor` por processo:
+
+    fechado      as chamadas passam; FALHAS falhas seguidas abrem o circuito
+    aberto       as chamadas falham na hora (CircuitoAberto) durante ESPERA segundos
+    meio_aberto  passada a espera, uma chamada de teste passa; sucesso fecha,
+                 falha abre de novo
+
+Além disso o disjuntor limita as chamadas simultâneas: com o serviço lento, as
+threads a mais recebem CircuitoAberto em vez de ficarem presas no timeout, e
+uma dependência fora do ar não esgota as threads da réplica.
+
+`Prazo` é o orçamento de tempo de uma requisição: quem encadeia chamadas
+(cache, HTTP, ...) usa `prazo.timeout(maximo)` em vez de um timeout fixo.
+
+    with disjuntor("viacep").proteger():
+        r = sessao.get(url, timeout=prazo.timeout(5))
+
+O estado de todos os disjuntores sai nas métricas (formulario_disjuntor_estado)
+e em `estados()`.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from metricas import DISJUNTOR_ESTADO, DISJUNTOR_REJEICOES
+
+FECHADO, MEIO_ABERTO, ABERTO = "fechado", "meio_aberto", "aberto"
+_CODIGO_ESTADO = {FECHADO: 0, MEIO_ABERTO: 1, ABERTO: 2}
+
+
+class CircuitoAberto(Exception):
+    """A chamada nem foi feita: circuito aberto ou limite de chamadas simultâneas atingido."""
+
+    def __init__(self, nome, motivo, reabre_em=0.0):
+        super().__init__(f"{nome}: {motivo}")
+        self.nome = nome
+        self.motivo = motivo
+        self.reabre_em = reabre_em
+
+
+class PrazoEsgotado(TimeoutError):
+    """O orçamento de tempo da requisição acabou antes da chamada."""
+
+
+class Prazo:
+    """Orçamento de tempo (relógio monotônico) compartilhado pelas etapas de uma requisição."""
+
+    def __init__(self, segundos):
+        self.fim = time.monotonic() + segundos
+
+    def restante(self):
+        return max(0.0, self.fim - time.monotonic())
+
+    def timeout(self, maximo):
+        """Timeout para a próxima chamada: o menor entre `maximo` e o que resta do prazo."""
+        restante = self.restante()
+        if restante <= 0:
+            raise PrazoEsgotado("prazo da requisição esgotado")
+        return min(maximo, restante)
+
+
+class Disjuntor:
+    """Circuit breaker com limite de chamadas simultâneas (thread-safe)."""
+
+    def __init__(self, nome, falhas=5, espera=30.0, simultaneas=8, excecoes=(Exception,)):
+        self.nome = nome
+        self.limite_falhas = falhas
+        self.espera = espera
+        self.simultaneas = simultaneas
+        self.excecoes = excecoes
+        self._trava = threading.Lock()
+        self._estado = FECHADO
+        self.falhas = 0            # falhas seguidas
+        self._aberto_em = 0.0
+        self._em_voo = 0
+        self._teste_em_voo = False
+        DISJUNTOR_ESTADO.definir(0, dependencia=nome)
+
+    @property
+    def estado(self):
+        with self._trava:
+            return self._atualizar()
+
+    def _atualizar(self):
+        # Chamado com a trava: aberto vira meio_aberto quando a espera acaba
+        if self._estado == ABERTO and time.monotonic() - self._aberto_em >= self.espera:
+            self._mudar(MEIO_ABERTO)
+        return self._estado
+
+    def _mudar(self, estado):
+        self._estado = estado
+        DISJUNTOR_ESTADO.definir(_CODIGO_ESTADO[estado], dependencia=self.nome)
+
+    def reabre_em(self):
+        """Segundos até o circuito aceitar uma chamada de teste (0 se já aceita)."""
+        with self._trava:
+            if self._atualizar() != ABERTO:
+                return 0.0
+            return max(0.0, self._aberto_em + self.espera - time.monotonic())
+
+    def _entrar(self):
+        with self._trava:
+            estado = self._atualizar()
+            if estado == ABERTO:
+                motivo = "aberto"
+            elif estado == MEIO_ABERTO and self._teste_em_voo:
+                motivo = "aberto"   # só uma chamada de teste por vez
+            elif self._em_voo >= self.simultaneas:
+                motivo = "lotado"
+            else:
+                self._em_voo += 1
+                teste = estado == MEIO_ABERTO
+                self._teste_em_voo |= teste
+                return teste
+            reabre = max(0.0, self._aberto_em + self.espera - time.monotonic())
+        DISJUNTOR_REJEICOES.inc(dependencia=self.nome, motivo=motivo)
+        raise CircuitoAberto(self.nome, motivo, reabre)
+
+    def _sair(self, teste, ok):
+        with self._trava:
+            self._em_voo -= 1
+            if teste:
+                self._teste_em_voo = False
+            if ok is None:
+                return
+            if ok:
+                self.falhas = 0
+                if self._estado != FECHADO:
+                    self._mudar(FECHADO)
+                return
+            self.falhas += 1
+            if teste or (self._estado == FECHADO and self.falhas >= self.limite_falhas):
+                self._aberto_em = time.monotonic()
+                self._mudar(ABERTO)
+
+    @contextmanager
+    def proteger(self):
+        """Executa o bloco pelo disjuntor; exceções de `excecoes` contam como falha e propagam."""
+        teste = self._entrar()
+        try:
+            yield
+        except self.excecoes:
+            self._sair(teste, ok=False)
+            raise
+        except BaseException:
+            self._sair(teste, ok=None)   # ex.: KeyboardInterrupt: não diz nada sobre o serviço
+            raise
+        else:
+            self._sair(teste, ok=True)
+
+    def resumo(self):
+        with self._trava:
+            estado = self._atualizar()
+            return {
+                "estado": estado,
+                "falhas_seguidas": self.falhas,
+                "em_voo": self._em_voo,
+                "reabre_em": round(max(0.0, self._aberto_em + self.espera - time.monotonic()), 1)
+                if estado == ABERTO else 0.0,
+            }
+
+
+_disjuntores = {}
+_trava_registro = threading.Lock()
+
+
+def disjuntor(nome, **config):
+    """Disjuntor do processo para a dependência `nome` (a configuração vale na primeira chamada)."""
+    with _trava_registro:
+        if nome not in _disjuntores:
+            _disjuntores[nome] = Disjuntor(nome, **config)
+        return _disjuntores[nome]
+
+
+def estados():
+    """{dependência: resumo do disjuntor} de todos os disjuntores do processo."""
+    with _trava_registro:
+        todos = list(_disjuntores.values())
+    return {d.nome: d.resumo() for d in todos}
@@ -0,0 +1,446 @@
+"""Armazém local e append-only das submissões do formulário.
+
+Cada `dados_formulario` validado (com a lista de dependentes) é gravado aqui
+antes de gerar o PDF ou enfileirar o e-mail, e serve de fonte de verdade para
+reprocessamentos. Uma chave de idempotência derivada do conteúdo (ver
+`processamento.chave_idempotencia`) faz reenvios do mesmo formulário dentro de
+IDEMPOTENCIA_TTL devolverem o protocolo original em vez de gravar de novo.
+As gravações passam por uma única thread escritora que junta as submissões
+concorrentes em uma transação (group commit): um fsync por lote, e cada
+chamador só retorna depois que o seu registro está em disco.
+
+Um índice de busca (FTS5, sem acentos) sobre nome, vaga, cidade, UF e
+escolaridade é atualizado na mesma transação de cada gravação; a busca por
+CPF usa o índice da própria tabela. Exportação em streaming (memória
+constante) e busca pela linha de comando:
+
+    python submissoes.py exportar candidatos.csv --desde 2026-01-01
+    python submissoes.py buscar --nome "joao da" --uf SP --escolaridade superior
+"""
+import argparse
+import csv
+import json
+import os
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from configuracao import PASTA_DADOS, get_secret
+
+CAMINHO_SUBMISSOES = get_secret("SUBMISSOES_DB", os.path.join(PASTA_DADOS, "submissoes.db"))
+JANELA_GRUPO = 0.002  # espera extra para juntar gravações concorrentes no mesmo commit
+MAX_LOTE     = 256
+
+IDEMPOTENCIA_TTL         = float(get_secret("IDEMPOTENCIA_TTL", 24 * 3600))  # janela de duplicatas (s)
+PROCESSAMENTO_ABANDONADO = 300.0  # chave "processando" mais velha que isso é retomada (processo caiu)
+
+# Colunas do índice de busca -> chave de dados_formulario
+CAMPOS_BUSCA = {
+    "nome": "nome", "vaga": "vaga", "cidade": "cidade", "uf": "uf_endereco", "escolaridade": "escolaridade",
+}
+
+# Ordem das colunas na exportação CSV (chaves de dados_formulario)
+CAMPOS = (
+    "vaga", "pretensao", "nome", "data_nascimento", "cpf", "identidade", "orgao_expedidor",
+    "uf_rg", "data_expedicao", "cep", "logradouro", "numero", "complemento", "bairro", "cidade",
+    "uf_endereco", "telefone", "email", "estado_civil", "sexo", "pcd", "filhos", "dependentes_ir",
+    "dependentes", "ultimo_emprego", "ultimo_cargo", "data_admissao", "data_desligamento",
+    "atividades_ultimo_cargo", "motivo_saida", "telefone_ultimo_emprego", "contato_ultimo_emprego",
+    "penultimo_emprego", "penultimo_cargo", "data_admissao_penultimo", "data_desligamento_penultimo",
+    "atividades_penultimo_cargo", "motivo_saida_penultimo", "telefone_penultimo_emprego",
+    "contato_penultimo_emprego", "escolaridade", "curso", "instituicao", "ano_conclusao", "situacao",
+    "outra_formacao", "idiomas", "nivel_idioma", "consentiu", "curriculo",
+)
+
+
+class _Pedido:
+    __slots__ = ("linha", "chave", "busca", "id", "anterior", "erro", "feito")
+
+    def __init__(self, linha, chave=None, busca=()):
+        self.linha = linha
+        self.chave = chave
+        self.busca = busca  # valores das colunas de CAMPOS_BUSCA
+        self.id = None
+        self.anterior = None  # status da chave, se ela já existia
+        self.erro = None
+        self.feito = threading.Event()
+
+
+class ArmazemSubmissoes:
+    """Tabela SQLite (WAL, synchronous=FULL) só de inserção, com group commit."""
+
+    def __init__(self, caminho=CAMINHO_SUBMISSOES):
+        self.caminho = caminho
+        os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        con = self._conectar()
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS submissoes (
+                id          INTEGER PRIMARY KEY AUTOINCREMENT,
+                recebida_em TEXT NOT NULL,
+                cpf         TEXT,
+                nome        TEXT,
+                vaga        TEXT,
+                dados       TEXT NOT NULL
+            )
+            """
+        )
+        con.execute("CREATE INDEX IF NOT EXISTS ix_submissoes_recebida ON submissoes (recebida_em)")
+        con.execute("CREATE INDEX IF NOT EXISTS ix_submissoes_cpf ON submissoes (cpf)")
+        con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS idempotencia (
+                chave         TEXT PRIMARY KEY,
+                protocolo     INTEGER NOT NULL,
+                status        TEXT    NOT NULL,  -- processando | concluido
+                atualizada_em REAL    NOT NULL
+            )
+            """
+        )
+        colunas = ", ".join(CAMPOS_BUSCA)
+        # Sem conteúdo próprio (content=''): o texto fica em `submissoes`, o
+        # índice guarda só os termos. rowid = id da submissão.
+        con.execute(
+            f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS busca_candidatos USING fts5 (
+                {colunas}, content='', tokenize='unicode61 remove_diacritics 2', prefix='1 2 3'
+            )
+            """
+        )
+        self._indexar_pendentes(con)
+        con.close()
+        self._proxima_limpeza = 0.0
+        self._pedidos = queue.Queue()
+        self._escritor = threading.Thread(target=self._escrever, name="escritor-submissoes", daemon=True)
+        self._escritor.start()
+
+    def _conectar(self):
+        con = sqlite3.connect(self.caminho, timeout=30, isolation_level=None, check_same_thread=False)
+        con.execute("PRAGMA synchronous=FULL")
+        return con
+
+    @staticmethod
+    def _indexar_pendentes(con):
+        """Indexa as submissões gravadas antes do índice existir (uma vez, na primeira abertura)."""
+        extrair = ", ".join(
+            coluna if coluna in ("nome", "vaga") else f"json_extract(dados, '$.{chave}')"
+            for coluna, chave in CAMPOS_BUSCA.items()
+        )
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            con.execute(
+                f"INSERT INTO busca_candidatos (rowid, {', '.join(CAMPOS_BUSCA)}) "
+                f"SELECT id, {extrair} FROM submissoes WHERE id > coalesce("
+                "(SELECT rowid FROM busca_candidatos ORDER BY rowid DESC LIMIT 1), 0)"
+            )
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+
+    def adicionar(self, dados, recebida_em=None) -> int:
+        """Grava a submissão e retorna seu id (protocolo) depois do commit em disco."""
+        return self._gravar(dados, recebida_em).id
+
+    def registrar(self, dados, chave, recebida_em=None):
+        """Como `adicionar`, mas idempotente por `chave`: retorna (protocolo, status anterior).
+
+        Se a chave é nova (ou expirou), grava a submissão, marca a chave como
+        "processando" e retorna (id novo, None). Se já existe, não grava nada e
+        retorna o protocolo original com o status da chave ("processando" ou
+        "concluido"). Uma chave "processando" abandonada é retomada com o mesmo
+        protocolo (status anterior "abandonada").
+        """
+        pedido = self._gravar(dados, recebida_em, chave)
+        return pedido.id, pedido.anterior
+
+    def concluir_chave(self, chave):
+        """Marca o processamento da chave como concluído (reenvios passam a ser duplicatas)."""
+        self._executar("UPDATE idempotencia SET status = 'concluido', atualizada_em = ? WHERE chave = ?",
+                       (time.time(), chave))
+
+    def liberar_chave(self, chave):
+        """Esquece a chave (o processamento falhou e o reenvio deve ser refeito)."""
+        self._executar("DELETE FROM idempotencia WHERE chave = ?", (chave,))
+
+    def status_chave(self, chave):
+        """Status atual da chave ("processando", "concluido") ou None se não existe."""
+        con = self._conectar()
+        try:
+            linha = con.execute("SELECT status FROM idempotencia WHERE chave = ?", (chave,)).fetchone()
+        finally:
+            con.close()
+        return None if linha is None else linha[0]
+
+    def _executar(self, sql, params):
+        con = self._conectar()
+        try:
+            con.execute(sql, params)
+        finally:
+            con.close()
+
+    def _gravar(self, dados, recebida_em=None, chave=None):
+        recebida_em = recebida_em or datetime.now().isoformat(timespec="seconds")
+        pedido = _Pedido((
+            recebida_em, dados.get("cpf"), dados.get("nome"), dados.get("vaga"),
+            json.dumps(dados, ensure_ascii=False, default=str),
+        ), chave, tuple(dados.get(c) for c in CAMPOS_BUSCA.values()))
+        self._pedidos.put(pedido)
+        pedido.feito.wait()
+        if pedido.erro is not None:
+            raise pedido.erro
+        return pedido
+
+    def _escrever(self):
+        con = self._conectar()
+        while True:
+            lote = [self._pedidos.get()]
+            prazo = time.monotonic() + JANELA_GRUPO
+            while len(lote) < MAX_LOTE:
+                try:
+                    lote.append(self._pedidos.get(timeout=max(0.0, prazo - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                con.execute("BEGIN IMMEDIATE")
+                agora = time.time()
+                for pedido in lote:
+                    self._inserir(con, pedido, agora)
+                if agora >= self._proxima_limpeza:
+                    con.execute("DELETE FROM idempotencia WHERE atualizada_em < ?", (agora - IDEMPOTENCIA_TTL,))
+                    self._proxima_limpeza = agora + 600
+                con.execute("COMMIT")
+            except Exception as e:
+                if con.in_transaction:
+                    con.execute("ROLLBACK")
+                for pedido in lote:
+                    pedido.id, pedido.anterior, pedido.erro = None, None, e
+            for pedido in lote:
+                pedido.feito.set()
+
+    @staticmethod
+    def _inserir(con, pedido, agora):
+        # Na mesma transação do lote: duas submissões iguais no mesmo lote
+        # (duplo clique) também se enxergam.
+        if pedido.chave is not None:
+            linha = con.execute(
+                "SELECT protocolo, status, atualizada_em FROM idempotencia WHERE chave = ?", (pedido.chave,)
+            ).fetchone()
+            if linha is not None and linha[2] >= agora - IDEMPOTENCIA_TTL:
+                protocolo, status, atualizada_em = linha
+                if status == "processando" and atualizada_em < agora - PROCESSAMENTO_ABANDONADO:
+                    status = "abandonada"
+                    con.execute("UPDATE idempotencia SET atualizada_em = ? WHERE chave = ?", (agora, pedido.chave))
+                pedido.id, pedido.anterior = protocolo, status
+                return
+        pedido.id = con.execute(
+            "INSERT INTO submissoes (recebida_em, cpf, nome, vaga, dados) VALUES (?, ?, ?, ?, ?)",
+            pedido.linha,
+        ).lastrowid
+        con.execute(
+            f"INSERT INTO busca_candidatos (rowid, {', '.join(CAMPOS_BUSCA)}) VALUES (?, ?, ?, ?, ?, ?)",
+            (pedido.id, *pedido.busca),
+        )
+        if pedido.chave is not None:
+            con.execute(
+                "INSERT OR REPLACE INTO idempotencia (chave, protocolo, status, atualizada_em) "
+                "VALUES (?, ?, 'processando', ?)",
+                (pedido.chave, pedido.id, agora),
+            )
+
+    @staticmethod
+    def _filtros(desde=None, ate=None, vaga=None, a_partir_de_id=0):
+        filtros, params = ["id > ?"], [a_partir_de_id]
+        if desde:
+            filtros.append("recebida_em >= ?")
+            params.append(desde)
+        if ate:
+            filtros.append("recebida_em < ?")
+            params.append(_dia_seguinte(ate))
+        if vaga:
+            filtros.append("vaga LIKE ?")
+            params.append(f"%{vaga}%")
+        return " AND ".join(filtros), params
+
+    def iterar(self, desde=None, ate=None, vaga=None, a_partir_de_id=0, tamanho_lote=500):
+        """Gera (id, recebida_em, dados) em ordem de id, buscando do disco em lotes.
+
+        `desde`/`ate` são datas ISO (inclusivas); `vaga` filtra por trecho do
+        texto da vaga, sem diferenciar maiúsculas. Cada lote é uma leitura
+        curta a partir do último id: nenhum cursor fica aberto entre os lotes,
+        então uma exportação longa não segura o snapshot do WAL nem impede o
+        checkpoint da base em uso.
+        """
+        where, params = self._filtros(desde, ate, vaga, a_partir_de_id)
+        sql = f"SELECT id, recebida_em, dados FROM submissoes WHERE {where} ORDER BY id LIMIT ?"
+        con = self._conectar()
+        try:
+            while True:
+                linhas = con.execute(sql, (*params, tamanho_lote)).fetchall()
+                for id_sub, recebida_em, dados in linhas:
+                    yield id_sub, recebida_em, json.loads(dados)
+                if len(linhas) < tamanho_lote:
+                    break
+                params[0] = linhas[-1][0]  # "id > ?" é o primeiro filtro
+        finally:
+            con.close()
+
+    def contar(self, desde=None, ate=None, vaga=None, a_partir_de_id=0):
+        where, params = self._filtros(desde, ate, vaga, a_partir_de_id)
+        con = self._conectar()
+        try:
+            return con.execute(f"SELECT COUNT(*) FROM submissoes WHERE {where}", params).fetchone()[0]
+        finally:
+            con.close()
+
+    def obter(self, id_sub):
+        con = self._conectar()
+        try:
+            linha = con.execute("SELECT recebida_em, dados FROM submissoes WHERE id = ?", (id_sub,)).fetchone()
+        finally:
+            con.close()
+        return None if linha is None else (linha[0], json.loads(linha[1]))
+
+    def curriculos_referenciados(self):
+        """SHA-256 dos currículos citados por alguma submissão (ver curriculos.limpar_orfaos)."""
+        con = self._conectar()
+        try:
+            return {
+                sha for sha, in con.execute(
+                    "SELECT DISTINCT json_extract(dados, '$.curriculo.sha256') FROM submissoes"
+                    " WHERE json_extract(dados, '$.curriculo.sha256') IS NOT NULL"
+                )
+            }
+        finally:
+            con.close()
+
+    def buscar(self, cpf=None, limite=50, **termos):
+        """Candidatos mais recentes primeiro, como dicts (id, recebida_em, dados resumidos).
+
+        `cpf` é busca exata (com ou sem pontuação). `nome` casa por prefixo de
+        cada palavra ("ana bea" acha "Ana Beatriz"); `vaga`, `cidade`, `uf` e
+        `escolaridade` casam palavras inteiras. Tudo sem diferenciar acentos
+        nem maiúsculas, e todos os critérios informados precisam casar.
+        """
+        desconhecidos = set(termos) - set(CAMPOS_BUSCA)
+        if desconhecidos:
+            raise ValueError(f"Campos de busca desconhecidos: {sorted(desconhecidos)}")
+        consulta = _consulta_fts(termos)
+        filtros, params = [], []
+        if cpf:
+            filtros.append("s.cpf = ?")
+            params.append(re.sub(r"\D", "", str(cpf)))
+        if consulta:
+            # Ordem pelo rowid do próprio índice: o FTS5 para no `limite` sem
+            # materializar todos os que casaram.
+            sql = ("SELECT s.id, s.recebida_em, s.dados FROM busca_candidatos b JOIN submissoes s ON s.id = b.rowid "
+                   "WHERE busca_candidatos MATCH ?" + "".join(f" AND {f}" for f in filtros) +
+                   " ORDER BY b.rowid DESC LIMIT ?")
+            params.insert(0, consulta)
+        elif filtros:
+            sql = f"SELECT s.id, s.recebida_em, s.dados FROM submissoes s WHERE {filtros[0]} ORDER BY s.id DESC LIMIT ?"
+        else:
+            return []
+        con = self._conectar()
+        try:
+            linhas = con.execute(sql, (*params, limite)).fetchall()
+        finally:
+            con.close()
+        resultados = []
+        for id_sub, recebida_em, dados in linhas:
+            dados = json.loads(dados)
+            resultados.append({
+                "id": id_sub, "recebida_em": recebida_em, "cpf": dados.get("cpf"),
+                **{coluna: dados.get(chave) for coluna, chave in CAMPOS_BUSCA.items()},
+                "email": dados.get("email"), "telefone": dados.get("telefone"),
+            })
+        return resultados
+
+    def exportar(self, destino, formato="csv", **filtros):
+        """Exporta para CSV ou JSONL em streaming; retorna o nº de registros."""
+        n = 0
+        with open(destino, "w", newline="", encoding="utf-8") as f:
+            if formato == "jsonl":
+                for id_sub, recebida_em, dados in self.iterar(**filtros):
+                    f.write(json.dumps({"id": id_sub, "recebida_em": recebida_em, **dados}, ensure_ascii=False))
+                    f.write("\n")
+                    n += 1
+            elif formato == "csv":
+                escritor = csv.DictWriter(f, fieldnames=("id", "recebida_em") + CAMPOS, extrasaction="ignore")
+                escritor.writeheader()
+                for id_sub, recebida_em, dados in self.iterar(**filtros):
+                    linha = {k: json.dumps(v, ensure_ascii=False) if isinstance(v, (list, dict)) else v
+                             for k, v in dados.items()}
+                    escritor.writerow({"id": id_sub, "recebida_em": recebida_em, **linha})
+                    n += 1
+            else:
+                raise ValueError(f"Formato de exportação desconhecido: {formato!r}")
+        return n
+
+
+def _consulta_fts(termos):
+    """Expressão MATCH do FTS5 a partir dos termos livres de cada coluna.
+
+    As palavras vão entre aspas, então operadores e caracteres especiais
+    digitados pelo usuário são tratados como texto.
+    """
+    grupos = []
+    for coluna in CAMPOS_BUSCA:
+        palavras = re.findall(r"\w+", termos.get(coluna) or "")
+        if not palavras:
+            continue
+        sufixo = "*" if coluna == "nome" else ""
+        grupos.append(f"{coluna} : (" + " ".join(f'"{p}"{sufixo}' for p in palavras) + ")")
+    return " AND ".join(grupos)
+
+
+def _dia_seguinte(data_iso):
+    """Limite superior exclusivo para um filtro `ate` inclusivo (aceita data ou data/hora)."""
+    if len(data_iso) == 10:
+        return (date.fromisoformat(data_iso) + timedelta(days=1)).isoformat()
+    return data_iso
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Armazém de submissões do formulário.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_exp = sub.add_parser("exportar", help="exporta as submissões para CSV ou JSONL")
+    p_exp.add_argument("destino")
+    p_exp.add_argument("-f", "--formato", choices=("csv", "jsonl"), default=None,
+                       help="padrão: pela extensão do destino")
+    p_exp.add_argument("--desde", help="data inicial (AAAA-MM-DD)")
+    p_exp.add_argument("--ate", help="data final, inclusiva (AAAA-MM-DD)")
+    p_exp.add_argument("--vaga", help="trecho do texto da vaga")
+    p_exp.add_argument("--db", default=CAMINHO_SUBMISSOES)
+    p_bus = sub.add_parser("buscar", help="busca candidatos por CPF, nome, vaga, cidade, UF ou escolaridade")
+    p_bus.add_argument("--cpf")
+    for coluna in CAMPOS_BUSCA:
+        p_bus.add_argument(f"--{coluna}")
+    p_bus.add_argument("-n", "--limite", type=int, default=50)
+    p_bus.add_argument("--db", default=CAMINHO_SUBMISSOES)
+    args = parser.parse_args(argv)
+
+    if args.comando == "buscar":
+        termos = {c: getattr(args, c) for c in CAMPOS_BUSCA if getattr(args, c)}
+        inicio = time.perf_counter()
+        resultados = ArmazemSubmissoes(args.db).buscar(cpf=args.cpf, limite=args.limite, **termos)
+        decorrido = time.perf_counter() - inicio
+        for r in resultados:
+            print("\t".join(str(r[k] or "") for k in ("id", "recebida_em", "cpf", "nome", "vaga", "cidade", "uf",
+                                                       "escolaridade")))
+        print(f"{len(resultados)} candidato(s) em {decorrido * 1e3:.1f} ms", file=sys.stderr)
+        return
+
+    formato = args.formato or ("jsonl" if args.destino.endswith(".jsonl") else "csv")
+    inicio = time.perf_counter()
+    n = ArmazemSubmissoes(args.db).exportar(args.destino, formato, desde=args.desde, ate=args.ate, vaga=args.vaga)
+    print(f"{n} submissões exportadas para {args.destino} em {time.perf_counter() - inicio:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
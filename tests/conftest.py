@@ -0,0 +1,60 @@
+"""Configuração comum dos testes: bases numa pasta temporária e serviços externos desligados.
+
+A configuração é lida no import dos módulos (`configuracao.get_secret`), então
+as variáveis de ambiente são definidas aqui, antes de qualquer import do app.
+
+    python -m pytest -q
+"""
+import os
+import random
+import sys
+import tempfile
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+_tmp = tempfile.mkdtemp(prefix="testes_formulario_")
+os.environ.update({
+    "PASTA_DADOS": _tmp,
+    "CEP_INDICE": os.path.join(_tmp, "sem_indice.idx"),
+    "CEP_CACHE": "memoria",
+    "VIACEP_URL": "http://127.0.0.1:1",
+    "SMTP_HOST": "127.0.0.1",
+    "SMTP_PORT": "1",          # nada escuta: o trabalhador de e-mail só adia as mensagens
+    "SMTP_STARTTLS": "0",
+    "EMAIL_APP_PASSWORD": "teste",
+    "API_TOKEN": "",
+})
+
+from benchmarks.bench_cpf import gerar_cpf  # noqa: E402
+
+_rng = random.Random(7)
+
+
+def cpf_novo():
+    """CPF válido ainda não usado nesta execução (as submissões de todos os testes vão para o mesmo armazém)."""
+    return gerar_cpf(_rng)
+
+
+@pytest.fixture
+def registro():
+    """Fábrica de `dados_formulario` válidos, com CPF novo a cada chamada."""
+    def criar(**campos):
+        dados = {
+            "vaga": "Analista de Marketing - Rio de Janeiro/RJ", "pretensao": 6500.0,
+            "nome": "Ana Beatriz de Souza Lima", "data_nascimento": "12/03/1992", "cpf": cpf_novo(),
+            "identidade": "123456789", "orgao_expedidor": "SSP", "uf_rg": "SP", "data_expedicao": "05/06/2010",
+            "cep": "01001000", "logradouro": "Praça da Sé", "numero": "100", "complemento": "",
+            "bairro": "Sé", "cidade": "São Paulo", "uf_endereco": "SP", "telefone": "11999998888",
+            "email": "ana@exemplo.com", "estado_civil": "Casado(a)", "sexo": "Feminino", "pcd": "Não",
+            "filhos": 1, "dependentes": [{"nome": "Pedro Lima", "parentesco": "Filho(a)", "cpf": cpf_novo()}],
+            "ultimo_emprego": "Agência Exemplo", "ultimo_cargo": "Analista",
+            "data_admissao": "01/02/2019", "data_desligamento": "30/06/2024",
+            "escolaridade": "Ensino Superior Completo", "ano_conclusao": 2014,
+            "idiomas": ["Inglês"], "nivel_idioma": "Avançado", "consentiu": True,
+        }
+        dados.update(campos)
+        return dados
+    return criar
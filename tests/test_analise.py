@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from analise import ArmazemAnalitico, contagem
+from submissoes import ArmazemSubmissoes
+
+
+@pytest.fixture
+def armazens(tmp_path):
+    return ArmazemSubmissoes(str(tmp_path / "submissoes.db")), ArmazemAnalitico(str(tmp_path / "analise"))
+
+
+def test_sincronizar_acrescenta_so_as_novas(armazens, registro):
+    armazem, analitico = armazens
+    antigos = [armazem.adicionar(registro(vaga="Vendedor"), "2026-09-30T10:00:00") for _ in range(3)]
+    assert analitico.sincronizar(armazem) == 3
+    primeiras = analitico.partes()
+    assert analitico.sincronizar(armazem) == 0
+    assert analitico.partes() == primeiras
+
+    novos = [armazem.adicionar(registro(vaga="Analista de Dados"), f"2026-10-0{d}T09:00:00") for d in (1, 2)]
+    assert analitico.sincronizar(armazem) == 2
+    assert analitico.ultimo_id() == novos[-1]
+
+    # As partes de antes ficam como estavam; a nova só tem as submissões novas
+    partes = analitico.partes()
+    assert partes[:len(primeiras)] == primeiras
+    (nova,) = partes[len(primeiras):]
+    assert (nova.mes, nova.inicio, nova.fim) == ("2026-10", novos[0], novos[-1])
+
+    tabela = analitico.ler()
+    assert tabela["id"].to_pylist() == antigos + novos
+    assert dict(zip(*contagem(tabela, "vaga").to_pydict().values())) == {"Vendedor": 3, "Analista de Dados": 2}
+
+
+def test_lote_nao_confirmado_e_refeito(armazens, registro):
+    armazem, analitico = armazens
+    primeiro = armazem.adicionar(registro(), "2026-10-01T09:00:00")
+    assert analitico.sincronizar(armazem) == 1
+    # Parte gravada por uma sincronização que caiu antes de atualizar _sincronizado
+    ids = [armazem.adicionar(registro(), "2026-10-02T09:00:00") for _ in range(2)]
+    analitico._gravar(analitico.ler().slice(0, 1), "2026-10", ids[0], ids[-1])
+    assert len(os.listdir(os.path.join(analitico.pasta, "mes=2026-10"))) == 2
+    assert analitico.sincronizar(armazem) == 2
+    assert analitico.ler()["id"].to_pylist() == [primeiro, *ids]
@@ -0,0 +1,77 @@
+import pytest
+
+pytest.importorskip("httpx")  # requisito do TestClient do Starlette
+
+from starlette.testclient import TestClient  # noqa: E402
+
+import api  # noqa: E402
+from processamento import Resultado  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def cliente():
+    return TestClient(api.app)
+
+
+def test_novo_candidato_201_e_reenvio_200(cliente, registro):
+    dados = registro()
+    resposta = cliente.post("/candidatos", json=dados)
+    assert resposta.status_code == 201
+    protocolo = resposta.json()["protocolo"]
+    resposta = cliente.post("/candidatos", json=dados)
+    assert resposta.status_code == 200
+    assert resposta.json()["etapa"] == "duplicada"
+    assert resposta.json()["protocolo"] == protocolo
+
+
+def test_validacao_422_com_campos(cliente, registro):
+    resposta = cliente.post("/candidatos", json=registro(cpf="11111111111", dependentes=[{"cpf": 1}]))
+    assert resposta.status_code == 422
+    corpo = resposta.json()
+    assert corpo["etapa"] == "validacao"
+    assert {"campo": "dependentes.0.cpf", "mensagem": "Dependente 1: O campo cpf deve ser um texto."} \
+        in corpo["campos"]
+
+
+def test_tipo_errado_422_e_nao_503(cliente, registro):
+    assert cliente.post("/candidatos", json=registro(cpf=52998224725)).status_code == 422
+    assert cliente.post("/candidatos", json=registro(dependentes=["x"])).status_code == 422
+    assert cliente.post("/candidatos", json=[1, "x"]).json()["aceitos"] == 0
+
+
+def test_json_invalido_400(cliente):
+    resposta = cliente.post("/candidatos", content=b"{", headers={"content-type": "application/json"})
+    assert resposta.status_code == 400
+
+
+def test_em_andamento_409(cliente, registro, monkeypatch):
+    monkeypatch.setattr(api, "processar_submissao",
+                        lambda dados: Resultado(False, 7, "em_andamento", ["Aguarde."]))
+    assert cliente.post("/candidatos", json=registro()).status_code == 409
+
+
+def test_erro_inesperado_503_sem_detalhes(cliente, registro, monkeypatch):
+    def quebrar(dados):
+        raise RuntimeError("/caminho/interno segredo")
+    monkeypatch.setattr(api, "processar_submissao", quebrar)
+    resposta = cliente.post("/candidatos", json=registro())
+    assert resposta.status_code == 503
+    assert "segredo" not in resposta.text
+
+
+def test_lote_acima_do_limite_413(cliente, monkeypatch):
+    monkeypatch.setattr(api, "API_LOTE_MAX", 2)
+    assert cliente.post("/candidatos", json=[{}, {}, {}]).status_code == 413
+
+
+def test_token(cliente, registro, monkeypatch):
+    monkeypatch.setattr(api, "API_TOKEN", "abc")
+    assert cliente.post("/candidatos", json=registro()).status_code == 401
+    resposta = cliente.post("/candidatos", json=registro(), headers={"Authorization": "Bearer abc"})
+    assert resposta.status_code == 201
+
+
+def test_saude(cliente):
+    resposta = cliente.get("/saude")
+    assert resposta.status_code == 200
+    assert resposta.json()["ok"]
@@ -0,0 +1,103 @@
+import threading
+import time
+
+import pytest
+
+import cache_cep
+import cep
+from cache_cep import CacheMemoria, CacheSQLite, criar_cache
+
+PAULISTA = {"logradouro": "Avenida Paulista", "bairro": "Bela Vista", "cidade": "São Paulo", "uf": "SP"}
+
+
+@pytest.fixture
+def sqlite(tmp_path):
+    return CacheSQLite(str(tmp_path / "cep_cache.db"), max_entradas=100)
+
+
+def acessado_em(cache, chave):
+    return cache._con().execute("SELECT acessado_em FROM cep_cache WHERE cep = ?", (chave,)).fetchone()[0]
+
+
+def test_sqlite_guarda_negativo_e_sobrevive_a_reabrir(sqlite):
+    sqlite.gravar("01310100", PAULISTA, 60)
+    sqlite.gravar("99999999", None, 60)
+    outro = CacheSQLite(sqlite.caminho)  # outro processo / reinício
+    assert outro.obter("01310100").valor == PAULISTA
+    negativo = outro.obter("99999999")
+    assert negativo is not None and negativo.valor is None
+    assert outro.obter("01001000") is None
+    assert len(outro) == 2
+
+
+def test_leitura_so_renova_o_acesso_depois_do_intervalo(sqlite, monkeypatch):
+    sqlite.gravar("01310100", PAULISTA, 60)
+    antes = acessado_em(sqlite, "01310100")
+    sqlite.obter("01310100")
+    assert acessado_em(sqlite, "01310100") == antes
+    monkeypatch.setattr(cache_cep, "TOQUE_INTERVALO", -1.0)
+    sqlite.obter("01310100")
+    assert acessado_em(sqlite, "01310100") > antes
+
+
+def test_despejo_lru_em_lote(sqlite):
+    assert sqlite._contar_a_cada == 1  # max_entradas // 100
+    for i in range(111):
+        sqlite.gravar(f"{i:08d}", PAULISTA, 60)
+    # 111 > 100 * 1.1: volta ao limite, sem as mais antigas
+    assert len(sqlite) == 100
+    assert sqlite.obter(f"{0:08d}") is None and sqlite.obter(f"{110:08d}") is not None
+
+
+def test_memoria_lru():
+    cache = CacheMemoria(max_entradas=2)
+    cache.gravar("a", 1, 60)
+    cache.gravar("b", 2, 60)
+    cache.obter("a")
+    cache.gravar("c", 3, 60)
+    assert (cache.obter("a").valor, cache.obter("b"), len(cache)) == (1, None, 2)
+
+
+def test_backend_desconhecido():
+    with pytest.raises(ValueError):
+        criar_cache("redis", "", 10)
+
+
+@pytest.fixture
+def viacep(monkeypatch):
+    """Cache em memória só deste teste e um ViaCEP falso que conta as chamadas."""
+    cache, chamadas = CacheMemoria(), []
+    respostas = {"01310100": PAULISTA}
+    revalidou = threading.Event()
+
+    def consultar_viacep(cep8, prazo=None):
+        chamadas.append(cep8)
+        revalidou.set()
+        return respostas.get(cep8)
+    monkeypatch.setattr(cep, "cache_cep", lambda: cache)
+    monkeypatch.setattr(cep, "consultar_viacep", consultar_viacep)
+    return cache, chamadas, revalidou
+
+
+def test_cep_inexistente_vai_para_o_cache_negativo(viacep):
+    cache, chamadas, _ = viacep
+    assert cep.consultar_cep("99999-999") == (None, cep.NAO_ENCONTRADO)
+    assert cep.consultar_cep("99999-999") == (None, cep.NAO_ENCONTRADO)
+    assert chamadas == ["99999999"]
+    assert cache.obter("99999999").expira_em == pytest.approx(time.time() + cep.CEP_TTL_NEGATIVO, abs=5)
+    assert cache.estatisticas()["acertos_negativos"] == 1
+
+
+def test_vencido_serve_e_revalida(viacep):
+    cache, chamadas, revalidou = viacep
+    velho = dict(PAULISTA, logradouro="Av. Paulista")
+    cache.gravar("01310100", velho, -1)  # vencido, dentro da janela de obsolescência
+    assert cep.consultar_cep("01310100") == (velho, None)
+    assert revalidou.wait(5)
+    for _ in range(100):
+        if cache.obter("01310100").valor == PAULISTA:
+            break
+        time.sleep(0.01)
+    assert cep.consultar_cep("01310100") == (PAULISTA, None)
+    assert chamadas == ["01310100"]
+    assert cache.estatisticas()["obsoletos"] == 1
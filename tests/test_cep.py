@@ -0,0 +1,100 @@
+import os
+
+import pytest
+
+import cep
+from cache_cep import CacheMemoria
+from cep import IndiceCEP, construir_indice
+from resiliencia import Disjuntor, Prazo
+
+SE = ("01001000", "Praça da Sé", "Sé", "São Paulo", "SP")
+PAULISTA = ("01310100", "Avenida Paulista", "Bela Vista", "São Paulo", "SP")
+
+
+@pytest.fixture
+def indice(tmp_path, monkeypatch):
+    """Caminho de um índice novo, usado por cep.indice_local() a cada chamada (sem intervalo entre stat)."""
+    caminho = str(tmp_path / "ceps.idx")
+    monkeypatch.setattr(cep, "CEP_INDICE", caminho)
+    monkeypatch.setattr(cep, "CEP_INDICE_RELER", 0.0)
+    monkeypatch.setattr(cep, "_indice", (0.0, None))
+    return caminho
+
+
+def test_construir_e_buscar(indice):
+    repetido = ("20040002", *SE[1:])  # mesmo texto de outro CEP: gravado uma vez
+    assert construir_indice([SE, ("01.310-100", *PAULISTA[1:]), repetido, ("123", "x", "", "", "")], indice) == 3
+    lido = IndiceCEP(indice)
+    assert len(lido) == 3
+    assert lido.buscar("01310100") == dict(zip(cep.CAMPOS, PAULISTA[1:]))
+    assert lido.buscar("20040002") == lido.buscar("01001000")
+    assert lido.buscar("99999999") is None
+
+
+def test_arquivo_que_nao_e_indice(tmp_path):
+    caminho = tmp_path / "lixo.idx"
+    caminho.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        IndiceCEP(str(caminho))
+
+
+def test_indice_reconstruido_vale_sem_reiniciar(indice):
+    assert cep.indice_local() is None
+    construir_indice([SE], indice)
+    primeiro = cep.indice_local()
+    assert primeiro.buscar("01310100") is None
+    assert cep.indice_local() is primeiro  # arquivo igual: mesmo mapeamento
+
+    construir_indice([SE, PAULISTA], indice)
+    assert cep.indice_local().buscar("01310100")["logradouro"] == "Avenida Paulista"
+    assert primeiro.buscar("01001000")["cidade"] == "São Paulo"  # o mapeamento antigo continua legível
+
+    os.unlink(indice)
+    assert cep.indice_local() is None
+
+
+def test_stat_no_maximo_a_cada_intervalo(indice, monkeypatch):
+    monkeypatch.setattr(cep, "CEP_INDICE_RELER", 3600.0)
+    construir_indice([SE], indice)
+    assert cep.indice_local().buscar("01310100") is None
+    construir_indice([SE, PAULISTA], indice)
+    assert cep.indice_local().buscar("01310100") is None  # ainda dentro do intervalo
+
+
+def test_consultar_cep_usa_o_indice(indice):
+    construir_indice([PAULISTA], indice)
+    assert cep.consultar_cep("01310-100") == (dict(zip(cep.CAMPOS, PAULISTA[1:])), None)
+    assert cep.consultar_cep("123") == (None, cep.NAO_ENCONTRADO)
+
+
+@pytest.fixture
+def viacep_fora(monkeypatch):
+    """Sem índice, cache vazio e um disjuntor novo; VIACEP_URL aponta para uma porta fechada (conftest)."""
+    monkeypatch.setattr(cep, "indice_local", lambda: None)
+    cache = CacheMemoria()
+    monkeypatch.setattr(cep, "cache_cep", lambda: cache)
+
+    def usar(**config):
+        disjuntor = Disjuntor("viacep-teste", **config)
+        monkeypatch.setattr(cep, "DISJUNTOR_VIACEP", disjuntor)
+        return disjuntor
+    return cache, usar
+
+
+def test_motivo_quando_a_consulta_nao_acontece(viacep_fora):
+    _, usar = viacep_fora
+    usar(falhas=1)
+    assert cep.consultar_cep("01310-100") == (None, cep.ERRO)
+    assert cep.consultar_cep("01310-100") == (None, "aberto")
+    usar(simultaneas=0)
+    assert cep.consultar_cep("01310-100") == (None, "lotado")
+    usar()
+    assert cep.consultar_cep("01310-100", Prazo(0)) == (None, cep.PRAZO)
+
+
+def test_viacep_fora_serve_o_endereco_vencido(viacep_fora):
+    cache, usar = viacep_fora
+    usar()
+    endereco = dict(zip(cep.CAMPOS, PAULISTA[1:]))
+    cache.gravar("01310100", endereco, -cep.CEP_JANELA_OBSOLETO - 1)  # vencido até para a revalidação
+    assert cep.consultar_cep("01310-100") == (endereco, None)
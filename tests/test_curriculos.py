@@ -0,0 +1,101 @@
+import io
+import os
+import threading
+import time
+
+import pytest
+
+import curriculos
+from curriculos import agendar_limpeza, anexos, caminho, guardar, limpar_orfaos
+
+PDF = b"%PDF-1.4\n" + os.urandom(3 * curriculos.BLOCO)
+
+
+def test_guardar_por_conteudo_sem_duplicar(tmp_path):
+    pasta = str(tmp_path)
+    primeiro = guardar(io.BytesIO(PDF), "/tmp/Meu CV.PDF", pasta)
+    assert (primeiro.nome, primeiro.tipo, primeiro.tamanho) == ("Meu CV.PDF", "application/pdf", len(PDF))
+    with open(caminho(primeiro.sha256, pasta), "rb") as f:
+        assert f.read() == PDF
+    os.utime(caminho(primeiro.sha256, pasta), (0, 0))
+    assert guardar(io.BytesIO(PDF), "outro.pdf", pasta).sha256 == primeiro.sha256
+    assert os.path.getmtime(caminho(primeiro.sha256, pasta)) > 0  # reenvio renova o prazo de órfão
+    arquivos = [nome for _, _, nomes in os.walk(pasta) for nome in nomes]
+    assert arquivos == [primeiro.sha256]
+
+
+@pytest.mark.parametrize("conteudo, nome, mensagem", [
+    (PDF, "cv.exe", "Envie o currículo"),
+    (b"PK\x03\x04 zip", "cv.pdf", "não parece ser um PDF"),
+    (b"", "cv.pdf", "vazio"),
+    (PDF, "cv.pdf", "no máximo"),
+], ids=["extensao", "assinatura", "vazio", "tamanho"])
+def test_guardar_recusa_sem_deixar_temporario(tmp_path, conteudo, nome, mensagem):
+    with pytest.raises(ValueError, match=mensagem):
+        guardar(io.BytesIO(conteudo), nome, str(tmp_path), max_bytes=2 * curriculos.BLOCO)
+    assert not [nome for _, _, nomes in os.walk(tmp_path) for nome in nomes]
+
+
+@pytest.mark.parametrize("sha256", ["../../etc/passwd", "AB" * 32, "ab" * 31, None, 123])
+def test_caminho_so_com_sha256(tmp_path, sha256):
+    with pytest.raises(ValueError):
+        caminho(sha256, str(tmp_path))
+
+
+def test_caminho_nao_segue_link_para_fora(tmp_path):
+    pasta, fora = tmp_path / "curriculos", tmp_path / "fora"
+    pasta.mkdir()
+    fora.mkdir()
+    os.symlink(fora, pasta / "ab")
+    with pytest.raises(ValueError):
+        caminho("ab" * 32, str(pasta))
+
+
+def test_anexos_so_do_que_esta_no_armazem(tmp_path):
+    pasta = str(tmp_path)
+    cv = guardar(io.BytesIO(PDF), "cv.pdf", pasta)._asdict()
+    assert anexos({"curriculo": cv}, pasta) == [(caminho(cv["sha256"], pasta), "cv.pdf", "application/pdf")]
+    assert anexos({"curriculo": dict(cv, nome="../../x.pdf")}, pasta)[0][1] == "x.pdf"
+    assert anexos({}, pasta) == []
+    assert anexos({"curriculo": dict(cv, sha256="cd" * 32)}, pasta) == []
+    assert anexos({"curriculo": dict(cv, tipo="text/html")}, pasta) == []
+    assert anexos({"curriculo": "cv.pdf"}, pasta) == []
+
+
+def test_limpar_orfaos(tmp_path):
+    pasta = str(tmp_path)
+    citado = guardar(io.BytesIO(PDF), "a.pdf", pasta).sha256
+    orfao = guardar(io.BytesIO(PDF + b"x"), "b.pdf", pasta).sha256
+    recente = guardar(io.BytesIO(PDF + b"y"), "c.pdf", pasta).sha256
+    temporario = tmp_path / ".envio-abandonado"
+    temporario.write_bytes(b"%PDF-")
+    velho = time.time() - 2 * 3600
+    for arquivo in (caminho(citado, pasta), caminho(orfao, pasta), str(temporario)):
+        os.utime(arquivo, (velho, velho))
+
+    assert limpar_orfaos({citado}, pasta, idade=3600) == 2
+    assert [os.path.exists(caminho(s, pasta)) for s in (citado, orfao, recente)] == [True, False, True]
+    assert not temporario.exists()
+    assert all(pastas or nomes for raiz, pastas, nomes in os.walk(pasta))  # sem subpastas vazias
+
+
+def test_agendar_limpeza_le_as_referencias_na_thread_e_uma_vez_por_intervalo(tmp_path, monkeypatch):
+    monkeypatch.setattr(curriculos, "_proxima_limpeza", 0.0)
+    feito = threading.Event()
+    chamadas = []
+
+    def limpar_orfaos(referenciados, pasta):
+        chamadas.append((referenciados, pasta))
+        feito.set()
+    monkeypatch.setattr(curriculos, "limpar_orfaos", limpar_orfaos)
+
+    threads = []
+    def referenciados():
+        threads.append(threading.current_thread().name)
+        return {"ab" * 32}
+
+    assert agendar_limpeza(referenciados, str(tmp_path))
+    assert not agendar_limpeza(referenciados, str(tmp_path))
+    assert feito.wait(5)
+    assert chamadas == [({"ab" * 32}, str(tmp_path))]
+    assert threads == ["limpeza-curriculos"]
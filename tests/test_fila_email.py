@@ -0,0 +1,218 @@
+import os
+import smtplib
+import sqlite3
+from email.message import EmailMessage
+
+import pytest
+
+import fila_email
+from curriculos import PASTA_CURRICULOS
+from fila_email import ConexaoSMTP, FilaEmail, TrabalhadorEnvio
+from resiliencia import FECHADO, CircuitoAberto, Disjuntor
+
+
+def mensagem(assunto="Teste"):
+    msg = EmailMessage()
+    msg["From"], msg["To"], msg["Subject"] = "rh@exemplo.com", "a@exemplo.com, b@exemplo.com", assunto
+    msg.set_content("corpo")
+    return msg
+
+
+@pytest.fixture
+def fila(tmp_path):
+    return FilaEmail(str(tmp_path / "fila.db"))
+
+
+def vencer_reservas(fila):
+    """Simula o fim do prazo da reserva (processo que travou no meio do envio)."""
+    with sqlite3.connect(fila.caminho) as con:
+        con.execute("UPDATE mensagens SET proxima_tentativa = 0")
+
+
+class ConexaoFalsa:
+    """ConexaoSMTP de mentira: levanta `falhas` em ordem e depois aceita."""
+
+    _server = None
+
+    def __init__(self, *falhas):
+        self.falhas = list(falhas)
+        self.enviadas = []
+
+    def enviar(self, remetente, destinatarios, conteudo, anexos=()):
+        if self.falhas:
+            raise self.falhas.pop(0)
+        self.enviadas.append((remetente, destinatarios))
+
+    def fechar(self):
+        pass
+
+
+def test_reserva_uma_mensagem_por_vez(fila):
+    ids = [fila.enfileirar(mensagem(str(i))) for i in range(3)]
+    primeira = fila.reservar()
+    segunda = fila.reservar()
+    assert (primeira[0], segunda[0]) == (ids[0], ids[1])
+    assert primeira[-1] != segunda[-1]
+
+
+def test_reservada_nao_volta_antes_do_prazo(fila):
+    fila.enfileirar(mensagem())
+    assert fila.reservar() is not None
+    assert fila.reservar() is None
+
+
+def test_reserva_vencida_nao_conclui_a_do_outro(fila):
+    id_msg = fila.enfileirar(mensagem())
+    antiga = fila.reservar()
+    vencer_reservas(fila)
+    nova = fila.reservar()
+    assert nova[0] == id_msg
+
+    # O trabalhador atrasado termina depois: não apaga nem adia a mensagem do outro
+    assert not fila.concluir(id_msg, antiga[-1])
+    assert not fila.adiar(id_msg, antiga[-1], antiga[4], OSError("atrasado"))
+    assert fila.contagem() == {"pendente": 1}
+    assert fila.concluir(id_msg, nova[-1])
+    assert fila.contagem() == {}
+
+
+def test_adiar_com_backoff_ate_falhar(fila, monkeypatch):
+    monkeypatch.setattr(fila_email, "MAX_TENTATIVAS", 3)
+    id_msg = fila.enfileirar(mensagem())
+    for tentativa in range(1, 4):
+        vencer_reservas(fila)
+        reservada = fila.reservar()
+        assert reservada[4] == tentativa - 1
+        assert fila.adiar(id_msg, reservada[-1], reservada[4], OSError("fora do ar"))
+        if tentativa < 3:
+            assert fila.proxima_em() >= fila_email.BACKOFF_BASE * 2 ** (tentativa - 1) * 0.8 - 1
+    assert fila.contagem() == {"falhou": 1}
+
+
+def test_drenar_envia_e_remove(fila):
+    for i in range(3):
+        fila.enfileirar(mensagem(str(i)))
+    conexao = ConexaoFalsa()
+    assert TrabalhadorEnvio(fila, conexao).drenar() == 3
+    assert conexao.enviadas[0] == ("rh@exemplo.com", ["a@exemplo.com", "b@exemplo.com"])
+    assert fila.contagem() == {}
+
+
+def test_drenar_falha_conta_tentativa(fila):
+    fila.enfileirar(mensagem())
+    assert TrabalhadorEnvio(fila, ConexaoFalsa(OSError("recusado"))).drenar() == 0
+    with sqlite3.connect(fila.caminho) as con:
+        tentativas, erro, reserva = con.execute("SELECT tentativas, ultimo_erro, reserva FROM mensagens").fetchone()
+    assert (tentativas, reserva) == (1, None)
+    assert "recusado" in erro
+
+
+def test_drenar_com_disjuntor_aberto_nao_gasta_tentativa(fila):
+    fila.enfileirar(mensagem())
+    TrabalhadorEnvio(fila, ConexaoFalsa(CircuitoAberto("smtp", "aberto", 30.0))).drenar()
+    with sqlite3.connect(fila.caminho) as con:
+        (tentativas,) = con.execute("SELECT tentativas FROM mensagens").fetchone()
+    assert tentativas == 0
+    assert fila.proxima_em() > 20
+
+
+def test_anexo_fora_do_armazem_nao_sai(fila):
+    fila.enfileirar(mensagem(), anexos=[("/etc/passwd", "cv.pdf", "application/pdf")])
+    conexao = ConexaoFalsa()
+    assert TrabalhadorEnvio(fila, conexao).drenar() == 0
+    assert conexao.enviadas == []
+    assert fila.contagem() == {"falhou": 1}
+
+
+class ServidorFalso:
+    """smtplib.SMTP já conectado que levanta `erro` em todo sendmail."""
+
+    def __init__(self, erro):
+        self.erro = erro
+        self.fechado = False
+
+    def sendmail(self, remetente, destinatarios, conteudo):
+        raise self.erro
+
+    def quit(self):
+        self.fechado = True
+
+
+@pytest.fixture
+def smtp(monkeypatch):
+    """Disjuntor do SMTP novo (2 falhas abrem) e uma ConexaoSMTP que usa o servidor falso dado."""
+    disjuntor = Disjuntor("smtp-teste", falhas=2, espera=60, excecoes=fila_email.DISJUNTOR_SMTP.excecoes)
+    monkeypatch.setattr(fila_email, "DISJUNTOR_SMTP", disjuntor)
+
+    def conectar(erro):
+        conexao = ConexaoSMTP()
+        conexao._server = ServidorFalso(erro)
+        return conexao
+    conectar.disjuntor = disjuntor
+    return conectar
+
+
+@pytest.mark.parametrize("erro", [
+    smtplib.SMTPRecipientsRefused({"a@exemplo.com": (550, b"no such user"), "b@exemplo.com": (553, b"bad")}),
+    smtplib.SMTPSenderRefused(550, b"not allowed", "rh@exemplo.com"),
+    smtplib.SMTPDataError(554, b"message rejected"),
+], ids=type)
+def test_recusa_definitiva_falha_na_hora_sem_abrir_o_disjuntor(fila, smtp, erro):
+    for i in range(3):
+        fila.enfileirar(mensagem(str(i)))
+    conexao = smtp(erro)
+    assert TrabalhadorEnvio(fila, conexao).drenar() == 0
+    assert fila.contagem() == {"falhou": 3}
+    assert (smtp.disjuntor.estado, smtp.disjuntor.falhas) == (FECHADO, 0)
+    assert not conexao._server.fechado  # a conexão continua boa para as próximas
+
+
+def test_recusa_temporaria_conta_no_disjuntor_e_adia(fila, smtp):
+    fila.enfileirar(mensagem())
+    conexao = smtp(smtplib.SMTPRecipientsRefused({"a@exemplo.com": (450, b"try later")}))
+    assert TrabalhadorEnvio(fila, conexao).drenar() == 0
+    assert fila.contagem() == {"pendente": 1}
+    assert smtp.disjuntor.falhas == 1
+
+
+def test_anexo_sumido_falha_na_hora(fila, smtp):
+    sumido = os.path.join(PASTA_CURRICULOS, "ab", "cd", "ab" * 32)
+    fila.enfileirar(mensagem(), anexos=[(sumido, "cv.pdf", "application/pdf")])
+    assert TrabalhadorEnvio(fila, smtp(AssertionError("não devia transmitir"))).drenar() == 0
+    with sqlite3.connect(fila.caminho) as con:
+        status, tentativas, erro = con.execute("SELECT status, tentativas, ultimo_erro FROM mensagens").fetchone()
+    assert (status, tentativas) == ("falhou", 0)
+    assert "Anexo não encontrado" in erro
+    assert smtp.disjuntor.falhas == 0
+
+
+def test_anexo_do_disco_em_blocos(tmp_path):
+    from email import message_from_bytes
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
+    anexo = tmp_path / "cv.pdf"
+    anexo.write_bytes(b"%PDF-1.4\n" + os.urandom(3 * fila_email.BLOCO_BASE64 + 5))
+    msg = MIMEMultipart()
+    msg["Subject"] = "Candidato"
+    msg.attach(MIMEText("linha\n.comeca com ponto\n", "plain", "us-ascii"))  # 7bit: o ponto vai literal
+
+    blocos = list(fila_email.blocos_mensagem(msg.as_bytes(), [(str(anexo), "Meu CV.pdf", "application/pdf")]))
+    assert len(blocos) > 4  # o anexo sai aos pedaços, não numa string só
+    dados = b"".join(blocos)
+    linhas = dados.split(b"\r\n")
+    assert linhas[-1] == b"" and b"\n" not in dados.replace(b"\r\n", b"")
+    assert max(map(len, linhas)) <= 998
+
+    # Como o servidor recebe: sem o escape dos pontos do DATA
+    recebida = message_from_bytes(b"\r\n".join(l[1:] if l.startswith(b".") else l for l in linhas))
+    texto, arquivo = recebida.get_payload()
+    assert b"\r\n..comeca com ponto\r\n" in dados
+    assert texto.get_payload().splitlines() == ["linha", ".comeca com ponto"]
+    assert (arquivo.get_filename(), arquivo.get_content_type()) == ("Meu CV.pdf", "application/pdf")
+    assert arquivo.get_payload(decode=True) == anexo.read_bytes()
+
+
+def test_anexo_do_disco_exige_multipart():
+    with pytest.raises(ValueError):
+        list(fila_email.blocos_mensagem(mensagem().as_bytes(), []))
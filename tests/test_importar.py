@@ -0,0 +1,120 @@
+import csv
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+import importar
+from importar import Importador, montar_mapa
+from submissoes import ArmazemSubmissoes
+
+
+def planilha(registros):
+    """Cabeçalho e linhas como o leitor de CSV devolve (tudo texto), a partir de registros do formulário."""
+    cabecalho = list(registros[0])
+    linhas = []
+    for numero, dados in enumerate(registros, start=2):
+        valores = [json.dumps(v, ensure_ascii=False) if isinstance(v, (list, dict)) else str(v)
+                   for v in (dados[c] for c in cabecalho)]
+        linhas.append((numero, valores))
+    return cabecalho, linhas
+
+
+@pytest.fixture
+def armazem(tmp_path):
+    return ArmazemSubmissoes(str(tmp_path / "submissoes.db"))
+
+
+def test_cpf_com_pontuacao_e_importado(armazem, registro):
+    dados = registro(cpf="529.982.247-25", telefone="(11) 99999-8888", email=" ana@exemplo.com ")
+    dados["dependentes"][0]["cpf"] = "111.444.777-35"
+    cabecalho, linhas = planilha([dados])
+    linha = Importador(armazem, montar_mapa(cabecalho)).preparar(linhas[0])
+    assert linha.tipo == "valida", linha.erros
+    assert (linha.dados["cpf"], linha.dados["telefone"], linha.dados["email"]) \
+        == ("52998224725", "11999998888", "ana@exemplo.com")
+    assert linha.dados["dependentes"][0]["cpf"] == "11144477735"
+
+
+def test_linha_reimportada_e_duplicada(armazem, registro):
+    cabecalho, linhas = planilha([registro()])
+    importador = Importador(armazem, montar_mapa(cabecalho))
+    primeira = importador.preparar(linhas[0])
+    armazem.concluir_chave(primeira.chave)
+    segunda = importador.preparar(linhas[0])
+    assert (segunda.tipo, segunda.protocolo) == ("duplicada", primeira.protocolo)
+
+
+def test_linha_invalida_e_rejeitada_na_validacao(armazem, registro):
+    cabecalho, linhas = planilha([registro(cpf="123.456.789-00")])
+    linha = Importador(armazem, montar_mapa(cabecalho)).preparar(linhas[0])
+    assert linha.tipo == "rejeitada"
+    assert [etapa for etapa, _ in linha.erros] == ["validacao"]
+    assert armazem.contar() == 0
+
+
+def gravar_csv(caminho, cabecalho, linhas):
+    with open(caminho, "w", newline="", encoding="utf-8") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(cabecalho)
+        escritor.writerows(valores for _, valores in linhas)
+
+
+def rodar(arquivo, pasta, *extra):
+    return importar.main([str(arquivo), "--saida", str(pasta / "pdfs"), "--db", str(pasta / "submissoes.db"),
+                          "-j", "1", *extra])
+
+
+def test_retomada_nao_conta_de_novo(tmp_path, registro, monkeypatch):
+    validas = [registro() for _ in range(5)]
+    invalidas = [registro(cpf="12345678900") for _ in range(3)]
+    ordem = [validas[0], invalidas[0], validas[1], invalidas[1], validas[2], validas[3], invalidas[2], validas[4]]
+
+    # A última válida já foi importada antes: nesta planilha ela é duplicada
+    cabecalho, linhas = planilha([validas[4]])
+    gravar_csv(tmp_path / "antes.csv", cabecalho, linhas)
+    assert rodar(tmp_path / "antes.csv", tmp_path) == 0
+
+    cabecalho, linhas = planilha(ordem)
+    arquivo = tmp_path / "agencia.csv"
+    gravar_csv(arquivo, cabecalho, linhas)
+
+    # Interrompe (Ctrl+C) na entrega da 2ª válida
+    original, entregas = importar.nome_arquivo_pdf, []
+    def interromper(*args):
+        entregas.append(args)
+        if len(entregas) == 2:
+            raise KeyboardInterrupt
+        return original(*args)
+    monkeypatch.setattr(importar, "nome_arquivo_pdf", interromper)
+    with pytest.raises(KeyboardInterrupt):
+        rodar(arquivo, tmp_path)
+    monkeypatch.setattr(importar, "nome_arquivo_pdf", original)
+
+    assert rodar(arquivo, tmp_path) == 1  # há rejeitadas
+    with open(f"{arquivo}.importacao.json", encoding="utf-8") as f:
+        estado = json.load(f)
+    assert estado["concluida"]
+    assert estado["contagens"] == {"importadas": 4, "duplicadas": 1, "rejeitadas": 3}
+    with open(f"{arquivo}.rejeitados.csv", newline="", encoding="utf-8") as f:
+        rejeitados = list(csv.reader(f))[1:]
+    assert [int(r[0]) for r in rejeitados] == [3, 5, 8]
+    assert len(os.listdir(tmp_path / "pdfs")) == 1 + 4
+
+
+def test_xlsx_com_cpf_numerico(tmp_path, registro):
+    openpyxl = pytest.importorskip("openpyxl")
+    dados = registro()
+    livro = openpyxl.Workbook()
+    folha = livro.active
+    folha.append(["Nome Completo", "CPF", "Nascimento", "Pretensão Salarial"])
+    folha.append([dados["nome"], int(dados["cpf"]), datetime(1992, 3, 12), "6.500,00"])
+    livro.save(tmp_path / "agencia.xlsx")
+
+    cabecalho, linhas = importar.ler_planilha(str(tmp_path / "agencia.xlsx"))
+    mapa = montar_mapa(cabecalho)
+    (numero, valores), = list(linhas)
+    convertido = importar.mapear(valores, mapa)
+    assert (numero, convertido["cpf"], convertido["data_nascimento"], convertido["pretensao"]) \
+        == (2, dados["cpf"], "12/03/1992", 6500.0)
@@ -0,0 +1,59 @@
+import os
+import threading
+import time
+from collections import Counter
+
+import perfil
+from perfil import gravar, ler, perfilar, rotacionar
+
+
+def test_rotulo_por_codigo_com_limite():
+    def alvo():
+        pass
+    rotulo = perfil._rotulo(alvo.__code__)
+    assert rotulo.startswith("alvo (tests/test_perfil.py:")
+    assert perfil._rotulo(alvo.__code__) is rotulo
+    assert perfil._rotulo.cache_info().maxsize == perfil.PERFIL_MAX_ROTULOS
+
+
+def test_execucao_sorteada_amostra_a_pilha(tmp_path, monkeypatch):
+    monkeypatch.setattr(perfil, "PERFIL_MIN_MS", 0)
+    def devagar():
+        time.sleep(0.2)
+    with perfilar("teste", taxa=1, pasta=str(tmp_path)) as execucao:
+        devagar()
+    perfil.gravador().join()
+    assert any("devagar (tests/test_perfil.py:" in pilha for pilha in execucao.amostras)
+    (arquivo,) = os.listdir(tmp_path)
+    etapa, ms, amostras = ler(str(tmp_path / arquivo))
+    assert (etapa, amostras) == ("teste", Counter({f"teste;{p}": c for p, c in execucao.amostras.items()}))
+    assert ms >= 200
+
+
+def test_sem_sorteio_nao_perfila():
+    with perfilar("teste", taxa=0) as execucao:
+        assert execucao is None
+
+
+def test_amostrador_ignora_threads_nao_sorteadas(tmp_path):
+    parar = threading.Event()
+    outra = threading.Thread(target=parar.wait, daemon=True)
+    outra.start()
+    try:
+        with perfilar("teste", taxa=1, pasta=str(tmp_path)) as execucao:
+            time.sleep(0.1)
+    finally:
+        parar.set()
+    perfil.gravador().join()
+    assert execucao.amostras
+    assert all("test_amostrador_ignora_threads_nao_sorteadas (" in pilha for pilha in execucao.amostras)
+
+
+def test_rotacionar_mantem_os_mais_recentes(tmp_path):
+    bases = []
+    for i in range(4):
+        base = gravar("etapa", 10 * i, perfil.datetime.now(), Counter({"a;b": 1}), pasta=str(tmp_path))
+        os.utime(base + ".folded", (i, i))
+        bases.append(base)
+    rotacionar(str(tmp_path), maximo=2)
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(b) + ".folded" for b in bases[2:])
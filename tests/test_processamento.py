@@ -0,0 +1,97 @@
+import threading
+import time
+
+import processamento
+from processamento import armazem_submissoes, chave_idempotencia, normalizar, processar_submissao
+
+
+def test_envio_registra_e_conclui(registro):
+    resultado = processar_submissao(registro())
+    assert resultado.ok and resultado.etapa == "concluido"
+    assert armazem_submissoes().obter(resultado.protocolo) is not None
+
+
+def test_reenvio_devolve_o_mesmo_protocolo(registro):
+    dados = registro()
+    primeiro = processar_submissao(dados)
+    segundo = processar_submissao(dict(dados))
+    assert segundo.ok and segundo.etapa == "duplicada"
+    assert segundo.protocolo == primeiro.protocolo
+
+
+def test_cpf_com_pontuacao_e_normalizado(registro):
+    dados = registro()
+    cpf = dados["cpf"]
+    resultado = processar_submissao({**dados, "cpf": f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"})
+    assert resultado.ok, resultado.erros
+    _, gravado = armazem_submissoes().obter(resultado.protocolo)
+    assert gravado["cpf"] == cpf
+
+
+def test_campo_do_servidor_e_descartado(registro):
+    resultado = processar_submissao(registro(enviado_em="01/01/2000 às 00:00"))
+    assert resultado.ok
+    _, gravado = armazem_submissoes().obter(resultado.protocolo)
+    assert "enviado_em" not in gravado
+
+
+def test_tipo_errado_nao_chega_ao_registro(registro):
+    antes = armazem_submissoes().contar()
+    resultado = processar_submissao(registro(pretensao="abc"))
+    assert (resultado.ok, resultado.etapa, resultado.protocolo) == (False, "validacao", None)
+    assert armazem_submissoes().contar() == antes
+
+
+def test_texto_com_markup_gera_pdf(registro):
+    assert processar_submissao(registro(nome="A & <b>Lima</b>", outra_formacao="<para>")).ok
+
+
+def test_envio_nao_depende_da_senha_smtp(registro, monkeypatch):
+    # Credenciais são problema do trabalhador de e-mail (login/disjuntor), não do submit
+    monkeypatch.setattr(processamento, "SMTP_PASS", "", raising=False)
+    resultado = processar_submissao(registro())
+    assert (resultado.ok, resultado.etapa) == (True, "concluido")
+
+
+def envio_lento(monkeypatch, segundos):
+    """Faz o PDF/e-mail da submissão demorar `segundos` (o reenvio chega no meio)."""
+    original = processamento._enviar
+
+    def lento(dados, protocolo):
+        time.sleep(segundos)
+        return original(dados, protocolo)
+    monkeypatch.setattr(processamento, "_enviar", lento)
+
+
+def enviar_em_paralelo(dados):
+    resultados = {}
+    primeiro = threading.Thread(target=lambda: resultados.setdefault("primeiro", processar_submissao(dados)))
+    primeiro.start()
+    time.sleep(0.1)
+    inicio = time.monotonic()
+    resultados["segundo"] = processar_submissao(dict(dados))
+    espera = time.monotonic() - inicio
+    primeiro.join()
+    return resultados["primeiro"], resultados["segundo"], espera
+
+
+def test_duplo_clique_espera_o_envio_original(registro, monkeypatch):
+    envio_lento(monkeypatch, 0.3)
+    primeiro, segundo, _ = enviar_em_paralelo(registro())
+    assert (segundo.ok, segundo.etapa, segundo.protocolo) == (True, "duplicada", primeiro.protocolo)
+
+
+def test_duplo_clique_nao_prende_a_thread(registro, monkeypatch):
+    envio_lento(monkeypatch, 1.0)
+    monkeypatch.setattr(processamento, "ESPERA_EM_ANDAMENTO", 0.1)
+    primeiro, segundo, espera = enviar_em_paralelo(registro())
+    assert (segundo.etapa, segundo.protocolo) == ("em_andamento", primeiro.protocolo)
+    assert espera < 0.5
+    assert primeiro.ok
+
+
+def test_chave_ignora_os_metadados_do_curriculo(registro):
+    dados = normalizar(registro())
+    curriculo = {"sha256": "ab" * 32, "nome": "cv.pdf", "tipo": "application/pdf", "tamanho": 1}
+    assert chave_idempotencia({**dados, "curriculo": curriculo}) == chave_idempotencia(dados)
+    assert chave_idempotencia({**dados, "nome": "Outra Pessoa"}) != chave_idempotencia(dados)
@@ -0,0 +1,102 @@
+import threading
+
+import pytest
+
+import resiliencia
+from resiliencia import ABERTO, FECHADO, MEIO_ABERTO, CircuitoAberto, Disjuntor, Prazo, PrazoEsgotado
+
+
+class Falha(Exception):
+    pass
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    """Relógio monotônico controlado pelo teste."""
+    agora = [1000.0]
+    monkeypatch.setattr(resiliencia.time, "monotonic", lambda: agora[0])
+    return agora
+
+
+def falhar(disjuntor, excecao=Falha):
+    with pytest.raises(excecao):
+        with disjuntor.proteger():
+            raise excecao("fora do ar")
+
+
+def test_abre_depois_das_falhas_seguidas_e_fecha_no_teste(relogio):
+    d = Disjuntor("teste", falhas=2, espera=30)
+    falhar(d)
+    with d.proteger():
+        pass                       # sucesso zera as falhas seguidas
+    falhar(d)
+    assert d.estado == FECHADO
+    falhar(d)
+    assert d.estado == ABERTO
+    with pytest.raises(CircuitoAberto) as erro:
+        with d.proteger():
+            pytest.fail("a chamada não deveria acontecer com o circuito aberto")
+    assert (erro.value.motivo, erro.value.reabre_em) == ("aberto", 30)
+
+    relogio[0] += 30
+    assert d.estado == MEIO_ABERTO
+    with d.proteger():
+        pass
+    assert (d.estado, d.falhas) == (FECHADO, 0)
+
+
+def test_meio_aberto_deixa_um_teste_por_vez_e_reabre_na_falha(relogio):
+    d = Disjuntor("teste", falhas=1, espera=10)
+    falhar(d)
+    relogio[0] += 10
+    with pytest.raises(Falha):
+        with d.proteger():         # a chamada de teste
+            with pytest.raises(CircuitoAberto) as erro:
+                with d.proteger():
+                    pass
+            assert erro.value.motivo == "aberto"
+            raise Falha("ainda fora do ar")
+    assert d.estado == ABERTO      # o teste falhou: aberto de novo, espera inteira
+    assert d.reabre_em() == 10
+
+
+def test_lotado_limita_as_chamadas_simultaneas():
+    d = Disjuntor("teste", simultaneas=2)
+    dentro, liberar = threading.Barrier(3), threading.Event()
+
+    def chamada():
+        with d.proteger():
+            dentro.wait()
+            liberar.wait(5)
+    threads = [threading.Thread(target=chamada) for _ in range(2)]
+    for t in threads:
+        t.start()
+    dentro.wait(5)
+    with pytest.raises(CircuitoAberto) as erro:
+        with d.proteger():
+            pass
+    assert erro.value.motivo == "lotado"
+    liberar.set()
+    for t in threads:
+        t.join()
+    assert d.resumo() == {"estado": FECHADO, "falhas_seguidas": 0, "em_voo": 0, "reabre_em": 0.0}
+
+
+def test_excecoes_fora_da_lista_nao_contam():
+    d = Disjuntor("teste", falhas=1, excecoes=(OSError,))
+    falhar(d, ValueError)
+    falhar(d, KeyboardInterrupt)
+    assert (d.estado, d.falhas, d.resumo()["em_voo"]) == (FECHADO, 0, 0)
+    falhar(d, ConnectionError)
+    assert d.estado == ABERTO
+
+
+def test_prazo(relogio):
+    prazo = Prazo(2.5)
+    assert prazo.timeout(5) == 2.5
+    relogio[0] += 2
+    assert prazo.timeout(5) == pytest.approx(0.5) and prazo.timeout(0.1) == 0.1
+    relogio[0] += 1
+    assert prazo.restante() == 0
+    with pytest.raises(PrazoEsgotado):
+        prazo.timeout(5)
@@ -0,0 +1,92 @@
+import csv
+import json
+import sqlite3
+
+import pytest
+
+from submissoes import ArmazemSubmissoes
+
+CURRICULO = {"sha256": "ab" * 32, "nome": "cv.pdf", "tipo": "application/pdf", "tamanho": 1234}
+
+
+@pytest.fixture
+def armazem(tmp_path):
+    return ArmazemSubmissoes(str(tmp_path / "submissoes.db"))
+
+
+def test_exportar_csv_leva_o_curriculo(armazem, registro, tmp_path):
+    com_cv = registro(curriculo=CURRICULO)
+    armazem.adicionar(com_cv)
+    armazem.adicionar(registro())
+    destino = tmp_path / "candidatos.csv"
+    assert armazem.exportar(str(destino)) == 2
+    with open(destino, newline="", encoding="utf-8") as f:
+        linhas = list(csv.DictReader(f))
+    assert json.loads(linhas[0]["curriculo"]) == CURRICULO
+    assert linhas[1]["curriculo"] == ""
+    assert json.loads(linhas[0]["dependentes"]) == com_cv["dependentes"]
+
+
+def test_exportar_jsonl_com_filtro_de_vaga(armazem, registro, tmp_path):
+    armazem.adicionar(registro(vaga="Analista de Dados"))
+    armazem.adicionar(registro(vaga="Vendedor"))
+    destino = tmp_path / "candidatos.jsonl"
+    assert armazem.exportar(str(destino), "jsonl", vaga="dados") == 1
+    (registro_exportado,) = [json.loads(linha) for linha in open(destino, encoding="utf-8")]
+    assert registro_exportado["vaga"] == "Analista de Dados"
+
+
+def test_iterar_em_lotes_nao_segura_o_checkpoint(armazem, registro):
+    ids = [armazem.adicionar(registro()) for _ in range(5)]
+    gerador = armazem.iterar(tamanho_lote=2)
+    vistos = [next(gerador)[0]]
+
+    # Com o gerador parado no meio de um lote, o WAL ainda pode ser truncado
+    armazem.adicionar(registro())
+    with sqlite3.connect(armazem.caminho, timeout=0) as con:
+        ocupado, _, _ = con.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+    assert ocupado == 0
+
+    vistos += [id_sub for id_sub, _, _ in gerador]
+    assert vistos == ids + [ids[-1] + 1]
+    assert [id_sub for id_sub, _, _ in armazem.iterar(a_partir_de_id=ids[2], tamanho_lote=2)] == vistos[3:]
+
+
+def test_buscar_nome_por_prefixo_sem_acento(armazem, registro):
+    ana = armazem.adicionar(registro(nome="Ana Beatriz Conceição", cidade="São Paulo"))
+    armazem.adicionar(registro(nome="Bianca Ana", cidade="Niterói", uf_endereco="RJ"))
+    joao = armazem.adicionar(registro(nome="João Anastácio", cidade="Sao Paulo"))
+    assert [r["id"] for r in armazem.buscar(nome="ana bea")] == [ana]
+    assert [r["id"] for r in armazem.buscar(nome="conceicao")] == [ana]
+    assert [r["id"] for r in armazem.buscar(nome="joao ANAST")] == [joao]
+    # Mais recentes primeiro; as demais colunas casam palavras inteiras
+    assert [r["id"] for r in armazem.buscar(cidade="sao paulo")] == [joao, ana]
+    assert armazem.buscar(cidade="sao pau") == []
+    assert [r["id"] for r in armazem.buscar(nome="ana", uf="sp")] == [joao, ana]
+    assert len(armazem.buscar(nome="ana", limite=1)) == 1
+
+
+def test_buscar_cpf_exato_com_ou_sem_pontuacao(armazem, registro):
+    dados = registro()
+    id_sub = armazem.adicionar(dados)
+    cpf = dados["cpf"]
+    pontuado = f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}"
+    assert [r["id"] for r in armazem.buscar(cpf=pontuado)] == [id_sub]
+    assert armazem.buscar(cpf=cpf[:9]) == []
+    assert armazem.buscar(cpf=cpf, nome="zzz") == []
+    assert armazem.buscar() == []
+
+
+def test_buscar_trata_operadores_como_texto(armazem, registro):
+    id_sub = armazem.adicionar(registro(nome="Ana OR Lima"))
+    assert [r["id"] for r in armazem.buscar(nome='ana" OR lima*')] == [id_sub]
+    with pytest.raises(ValueError):
+        armazem.buscar(email="ana@exemplo.com")
+
+
+def test_indice_de_busca_preenchido_ao_abrir(armazem, registro):
+    id_sub = armazem.adicionar(registro(nome="Valéria Antiga"))
+    with sqlite3.connect(armazem.caminho) as con:
+        con.execute("DROP TABLE busca_candidatos")  # base de antes do índice
+    reaberto = ArmazemSubmissoes(armazem.caminho)
+    assert [r["id"] for r in reaberto.buscar(nome="valeria")] == [id_sub]
@@ -0,0 +1,91 @@
+import random
+
+from benchmarks.bench_cpf import amostra, gerar_cpf
+from validacao import ESQUEMA_CANDIDATO, validar, validar_cpf, validar_cpfs
+
+
+def cpf_referencia(cpf):
+    """Algoritmo original do formulário (laço por dígito), base da equivalência."""
+    import re
+
+    n = re.sub(r"\D", "", cpf or "")
+    if len(n) != 11 or n == n[0] * 11:
+        return False
+    for i in range(9, 11):
+        soma = sum(int(n[num]) * ((i + 1) - num) for num in range(i))
+        if (soma * 10) % 11 % 10 != int(n[i]):
+            return False
+    return True
+
+
+BORDAS = ["", None, "123", "0" * 11, "1" * 11, "529.982.247-25", "52998224725", " 529982247-25 ",
+          "52998224726", "5299822472", "529982247250", "abc52998224725", "٥٢٩٩٨٢٢٤٧٢٥"]
+
+
+def test_validar_cpf_igual_ao_algoritmo_original():
+    cpfs = amostra(20_000) + BORDAS
+    assert [validar_cpf(c) for c in cpfs] == [cpf_referencia(c) for c in cpfs]
+
+
+def test_validar_cpfs_igual_ao_escalar():
+    cpfs = amostra(20_000) + BORDAS
+    assert validar_cpfs(cpfs).tolist() == [validar_cpf(c) for c in cpfs]
+
+
+def test_cpfs_numericos_como_nas_planilhas():
+    import numpy as np
+
+    numeros = [52998224725, 52998224725.0, np.int64(52998224725), np.float64(52998224725.0), 11144477735,
+               1234567891, 52998224724, 52998224725.5, -52998224725, float("nan"), float("inf"), True,
+               529982247250, b"52998224725", ["52998224725"]]
+    esperado = [True, True, True, True, True, False, False, False, False, False, False, False, False, False, False]
+    assert validar_cpfs(numeros).tolist() == [validar_cpf(c) for c in numeros] == esperado
+    # Inteiro sem os zeros à esquerda: igual ao texto completo
+    assert validar_cpfs([191, "00000000191"]).tolist() == [validar_cpf(191), validar_cpf("00000000191")] == [True, True]
+
+
+def test_validar_cpfs_iteravel_vazio_e_sem_validos():
+    assert validar_cpfs([]).tolist() == []
+    assert validar_cpfs(iter(["", None, "123"])).tolist() == [False, False, False]
+
+
+def test_cpfs_conhecidos():
+    rng = random.Random(1)
+    assert all(validar_cpf(gerar_cpf(rng)) for _ in range(1000))
+    assert [validar_cpf(c) for c in ("52998224725", "529.982.247-25", "52998224724", "00000000000", "")] \
+        == [True, True, False, False, False]
+
+
+def test_registro_valido(registro):
+    assert validar(registro()) == []
+
+
+def test_tipos_errados_recusados_sem_excecao(registro):
+    casos = {
+        "cpf": 52998224725,
+        "pretensao": "abc",
+        "idiomas": "Inglês",
+        "dependentes": ["Pedro"],
+        "consentiu": "sim",
+    }
+    for campo, valor in casos.items():
+        erros = validar(registro(**{campo: valor}))
+        assert [e.campo for e in erros] == [campo], campo
+
+
+def test_campo_desconhecido(registro):
+    assert [e.campo for e in validar(registro(admin=True))] == ["admin"]
+
+
+def test_dependente_com_cpf_invalido(registro):
+    erros = validar(registro(dependentes=[{"nome": "Pedro", "parentesco": "Filho(a)", "cpf": "12345678900"}]))
+    assert [e.campo for e in erros] == ["dependentes.0.cpf"]
+
+
+def test_curriculo_fora_do_armazem(registro):
+    erros = validar(registro(curriculo={"sha256": "../../etc/passwd", "nome": "cv.pdf", "tipo": "application/pdf"}))
+    assert [e.campo for e in erros] == ["curriculo"]
+
+
+def test_esquema_comeca_pela_regra_de_formato():
+    assert ESQUEMA_CANDIDATO[0].campo is None
@@ -0,0 +1,353 @@
+"""Validações do formulário de candidato.
+
+O registro do candidato é descrito por um esquema declarativo
+(`ESQUEMA_CANDIDATO`): uma tupla de regras montadas uma vez no import, com
+expressões regulares já compiladas e opções em conjuntos. A mesma tabela
+serve para o envio (`validar`, uma passada, erros por campo), para o aviso ao
+vivo de um widget (`validar_campo`) e para lotes (`validar_lote`).
+
+O registro pode vir da API com qualquer JSON: a primeira regra do esquema
+(`formato`) confere as chaves e o tipo de cada valor, e as demais só rodam
+num registro com o formato certo.
+"""
+import math
+import numbers
+import re
+from collections import namedtuple
+from datetime import date, datetime
+from functools import lru_cache
+from operator import mul
+
+# Opções de UF dos selects do formulário (prontas uma vez por processo)
+UFS = (
+    "AC", "AL", "AM", "AP", "BA", "CE", "DF", "ES", "GO", "MA", "MG", "MS", "MT",
+    "PA", "PB", "PE", "PI", "PR", "RJ", "RN", "RO", "RR", "RS", "SC", "SE", "SP", "TO",
+)
+OPCOES_UF = ("Selecione a UF",) + UFS
+
+_NAO_DIGITO = re.compile(r"\D")
+
+PARENTESCOS = ("Filho(a)", "Cônjuge", "Pai", "Mãe", "Outro")
+DEPENDENTES_MAX = 10
+
+
+@lru_cache(maxsize=None)
+def _pesos_dv():
+    # NumPy só é carregado na validação em lote: o formulário e a API usam
+    # `validar_cpf` e não pagam o import (~70 ms) na partida.
+    import numpy as np
+
+    # Pesos dos dígitos verificadores do CPF (1º: 10..2 sobre 9 dígitos; 2º: 11..2 sobre 10)
+    return np.arange(10, 1, -1, dtype=np.int64), np.arange(11, 1, -1, dtype=np.int64)
+
+
+_PESOS_DV1 = tuple(range(10, 1, -1))
+_PESOS_DV2 = tuple(range(11, 1, -1))
+
+
+def _cpf_texto(cpf) -> str:
+    """CPF que não veio como texto (célula numérica de planilha): inteiro vira 11 dígitos com zeros à esquerda.
+
+    Float só vale se for inteiro (o XLSX guarda 52998224725 como 52998224725.0);
+    negativo, fracionário, NaN, bool e outros tipos viram "" (inválido).
+    """
+    if isinstance(cpf, bool) or cpf is None:
+        return ""
+    if isinstance(cpf, numbers.Real) and not isinstance(cpf, numbers.Integral):
+        if not (math.isfinite(cpf) and float(cpf).is_integer()):
+            return ""
+        cpf = int(cpf)
+    if isinstance(cpf, numbers.Integral) and cpf >= 0:
+        return str(int(cpf)).zfill(11)
+    return ""
+
+
+def validar_cpf(cpf: str) -> bool:
+    """Valida CPF pelos dígitos verificadores."""
+    n = _NAO_DIGITO.sub("", cpf if isinstance(cpf, str) else _cpf_texto(cpf))
+    if len(n) != 11 or n == n[0] * 11:
+        return False
+    # bytes ASCII viram dígitos sem int() por caractere; dígitos Unicode (raros) caem no int()
+    d = [c - 48 for c in n.encode()] if n.isascii() else list(map(int, n))
+    if sum(map(mul, d, _PESOS_DV1)) * 10 % 11 % 10 != d[9]:
+        return False
+    return sum(map(mul, d, _PESOS_DV2)) * 10 % 11 % 10 == d[10]
+
+
+def so_digitos(valor: str) -> str:
+    return _NAO_DIGITO.sub("", (valor or ""))
+
+
+def validar_cpfs(cpfs) -> "numpy.ndarray":
+    """Valida um iterável de CPFs de uma vez e retorna a máscara booleana correspondente.
+
+    Mesmo resultado de `validar_cpf` item a item, mas os dígitos viram uma
+    matriz (n, 11) e os dois verificadores saem de produtos matriciais com os
+    vetores de pesos. Entradas vazias, `None` ou sem 11 dígitos dão False.
+    Números inteiros (colunas numéricas de pandas/openpyxl) valem como os 11
+    dígitos com zeros à esquerda; qualquer outro tipo dá False.
+    """
+    import numpy as np
+
+    pesos_dv1, pesos_dv2 = _pesos_dv()
+    n, indices, normalizados, escalares = 0, [], [], []
+    for i, cpf in enumerate(cpfs):
+        n = i + 1
+        if not isinstance(cpf, str):
+            cpf = _cpf_texto(cpf)
+        if not (len(cpf) == 11 and cpf.isascii() and cpf.isdigit()):
+            cpf = so_digitos(cpf)
+            if len(cpf) != 11:
+                continue
+            if not cpf.isascii():
+                # Dígitos Unicode não-ASCII (raros) ficam com a validação escalar
+                escalares.append((i, validar_cpf(cpf)))
+                continue
+        indices.append(i)
+        normalizados.append(cpf)
+
+    mascara = np.zeros(n, dtype=bool)
+    for i, valido in escalares:
+        mascara[i] = valido
+    if not indices:
+        return mascara
+
+    bloco = "".join(normalizados).encode("ascii")
+    digitos = (np.frombuffer(bloco, dtype=np.uint8).reshape(-1, 11) - ord("0")).astype(np.int64)
+    dv1 = (digitos[:, :9] @ pesos_dv1 * 10 % 11) % 10
+    dv2 = (digitos[:, :10] @ pesos_dv2 * 10 % 11) % 10
+    repetidos = (digitos == digitos[:, :1]).all(axis=1)
+    mascara[indices] = (dv1 == digitos[:, 9]) & (dv2 == digitos[:, 10]) & ~repetidos
+    return mascara
+
+
+# =====================
+# Esquema do candidato
+# =====================
+# campo: onde o erro é mostrado (None = registro inteiro); teste(dados) -> bool (True = válido)
+Regra = namedtuple("Regra", "campo teste mensagem")
+Erro = namedtuple("Erro", "campo mensagem")
+
+RE_EMAIL = re.compile(r'^[\w\.-]+@[\w\.-]+\.\w{2,}$')
+
+
+def _data(valor):
+    """date a partir de date/datetime ou "DD/MM/AAAA"; None se vazio ou ilegível."""
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    try:
+        # split + date() em vez de strptime, que é ~10x mais lento
+        dia, mes, ano = valor.split("/")
+        return date(int(ano), int(mes), int(dia))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _inteiro(valor):
+    try:
+        return int(valor or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _texto(valor):
+    return isinstance(valor, str)
+
+
+def _inteiro_json(valor):
+    return isinstance(valor, int) and not isinstance(valor, bool)
+
+
+def _valor_monetario(valor):
+    return isinstance(valor, (int, float)) and not isinstance(valor, bool) and math.isfinite(valor) and valor >= 0
+
+
+def _lista_de(item):
+    return lambda valor: isinstance(valor, list) and all(map(item, valor))
+
+
+# Tipo aceito para cada chave do registro: (teste, descrição para a mensagem).
+# Chaves fora da tabela são recusadas; None e "" valem como campo vazio.
+TEXTO = (_texto, "um texto")
+TIPOS_DEPENDENTE = {"nome": TEXTO, "parentesco": TEXTO, "cpf": TEXTO}
+TIPOS_CANDIDATO = {
+    **dict.fromkeys((
+        "vaga", "nome", "data_nascimento", "cpf", "identidade", "orgao_expedidor", "uf_rg", "data_expedicao",
+        "cep", "logradouro", "numero", "complemento", "bairro", "cidade", "uf_endereco", "telefone", "email",
+        "estado_civil", "sexo", "pcd", "ultimo_emprego", "ultimo_cargo", "data_admissao", "data_desligamento",
+        "atividades_ultimo_cargo", "motivo_saida", "telefone_ultimo_emprego", "contato_ultimo_emprego",
+        "penultimo_emprego", "penultimo_cargo", "data_admissao_penultimo", "data_desligamento_penultimo",
+        "atividades_penultimo_cargo", "motivo_saida_penultimo", "telefone_penultimo_emprego",
+        "contato_penultimo_emprego", "escolaridade", "curso", "instituicao", "situacao", "outra_formacao",
+        "nivel_idioma",
+    ), TEXTO),
+    "pretensao": (_valor_monetario, "um valor numérico não negativo"),
+    **dict.fromkeys(("filhos", "dependentes_ir", "ano_conclusao"), (_inteiro_json, "um número inteiro")),
+    "idiomas": (_lista_de(_texto), "uma lista de textos"),
+    "dependentes": (_lista_de(lambda d: isinstance(d, dict)), "uma lista de objetos"),
+    "consentiu": (lambda v: isinstance(v, bool), "verdadeiro ou falso"),
+    "curriculo": (lambda v: isinstance(v, dict), "um objeto"),
+}
+
+
+def formato(tipos):
+    """Chaves conhecidas e valores do tipo certo (`tipos`: chave -> (teste, descrição)).
+
+    Regra do registro inteiro: se falha, `validar` não roda as regras
+    seguintes, que supõem os tipos certos.
+    """
+    def teste(d):
+        if not isinstance(d, dict):
+            return [Erro("", "Registro deve ser um objeto JSON.")]
+        erros = []
+        for chave, valor in d.items():
+            if chave not in tipos:
+                erros.append(Erro(str(chave), f"Campo desconhecido: {chave}."))
+            elif valor is not None and valor != "" and not tipos[chave][0](valor):
+                erros.append(Erro(chave, f"O campo {chave} deve ser {tipos[chave][1]}."))
+        return erros or True
+    return Regra(None, teste, None)
+
+
+def obrigatorio(campo, mensagem):
+    return Regra(campo, lambda d: bool(str(d.get(campo) or "").strip()), mensagem)
+
+
+def cpf_valido(campo, mensagem, opcional=False):
+    """11 dígitos (sem pontuação) com verificadores válidos."""
+    def teste(d):
+        valor = d.get(campo) or ""
+        if not valor:
+            return opcional
+        return len(valor) == 11 and valor.isdigit() and validar_cpf(valor)
+    return Regra(campo, teste, mensagem)
+
+
+def escolha(campo, opcoes, mensagem):
+    opcoes = frozenset(opcoes)
+    return Regra(campo, lambda d: d.get(campo) in opcoes, mensagem)
+
+
+def padrao(campo, regex, mensagem):
+    casar = regex.match
+    return Regra(campo, lambda d: casar((d.get(campo) or "").strip()) is not None, mensagem)
+
+
+def marcado(campo, mensagem):
+    return Regra(campo, lambda d: bool(d.get(campo)), mensagem)
+
+
+def no_maximo(campo, campo_limite, mensagem, valor=_inteiro):
+    """`campo` não pode passar do valor de `campo_limite` (ex.: dependentes no IR x filhos)."""
+    return Regra(campo, lambda d: valor(d) <= _inteiro(d.get(campo_limite)), mensagem)
+
+
+def no_maximo_itens(campo, maximo, mensagem):
+    """A lista em `campo` tem no máximo `maximo` itens."""
+    return Regra(campo, lambda d: len(d.get(campo) or ()) <= maximo, mensagem)
+
+
+def curriculo_valido(campo, mensagem):
+    """Currículo opcional: metadados de `curriculos.guardar` de um arquivo que está no armazém.
+
+    O registro só cita o arquivo (SHA-256); sem esta regra um cliente da API
+    poderia apontar para qualquer caminho e recebê-lo anexado no e-mail do RH.
+    """
+    def teste(d):
+        curriculo = d.get(campo)
+        if not curriculo:
+            return True
+        if not (isinstance(curriculo, dict) and isinstance(curriculo.get("nome"), str)
+                and 0 < len(curriculo["nome"]) <= 255):
+            return False
+        # Configuração do armazém (e secrets) só quando há currículo
+        from curriculos import TIPOS_MIME, existe
+
+        return curriculo.get("tipo") in TIPOS_MIME and existe(curriculo.get("sha256"))
+    return Regra(campo, teste, mensagem)
+
+
+def data_nao_anterior(campo, campo_inicio, mensagem):
+    """Data de `campo` não pode ser anterior à de `campo_inicio` (vale se ambas estão preenchidas)."""
+    def teste(d):
+        inicio, fim = _data(d.get(campo_inicio)), _data(d.get(campo))
+        return inicio is None or fim is None or fim >= inicio
+    return Regra(campo, teste, mensagem)
+
+
+def _qtd_dependentes(d):
+    # Vale a lista; sem ela (clientes da API que só mandam o total), a quantidade
+    dependentes = d.get("dependentes")
+    return len(dependentes) if isinstance(dependentes, list) else _inteiro(d.get("dependentes_ir"))
+
+
+ESQUEMA_DEPENDENTE = (
+    formato(TIPOS_DEPENDENTE),
+    cpf_valido("cpf", "CPF do dependente inválido (11 dígitos e verificador).", opcional=True),
+)
+
+
+def cada(campo, esquema):
+    """Aplica `esquema` a cada item da lista em `campo`; os erros saem como "campo.i.subcampo"."""
+    return Regra(campo, lambda d: [
+        Erro(f"{campo}.{i}.{erro.campo}", f"Dependente {i + 1}: {erro.mensagem}")
+        for i, item in enumerate(d.get(campo) or ())
+        for erro in validar(item, esquema)
+    ], None)
+
+
+ESQUEMA_CANDIDATO = (
+    formato(TIPOS_CANDIDATO),
+    obrigatorio("nome", "Preencha o Nome Completo."),
+    cpf_valido("cpf", "CPF inválido (11 dígitos e verificador)."),
+    escolha("uf_rg", UFS, "Selecione a UF de Expedição (RG)."),
+    escolha("uf_endereco", UFS, "Selecione a UF do Endereço."),
+    padrao("email", RE_EMAIL, "E-mail inválido."),
+    no_maximo("dependentes_ir", "filhos",
+              "O número de dependentes no IR não pode ser maior que o número de filhos.", valor=_qtd_dependentes),
+    no_maximo_itens("dependentes", DEPENDENTES_MAX, f"Informe no máximo {DEPENDENTES_MAX} dependentes."),
+    cada("dependentes", ESQUEMA_DEPENDENTE),
+    data_nao_anterior("data_desligamento", "data_admissao",
+                      "A data de desligamento do último emprego é anterior à de admissão."),
+    data_nao_anterior("data_desligamento_penultimo", "data_admissao_penultimo",
+                      "A data de desligamento do penúltimo emprego é anterior à de admissão."),
+    curriculo_valido("curriculo", "Currículo não encontrado. Anexe o arquivo novamente."),
+    marcado("consentiu", "É necessário concordar com os termos de LGPD."),
+)
+
+
+@lru_cache(maxsize=None)
+def _por_campo(esquema):
+    indice = {}
+    for regra in esquema:
+        indice.setdefault(regra.campo, []).append(regra)
+    return {campo: tuple(regras) for campo, regras in indice.items()}
+
+
+def validar(dados, esquema=ESQUEMA_CANDIDATO):
+    """Todos os erros do registro numa passada, como lista de Erro(campo, mensagem)."""
+    erros = []
+    for regra in esquema:
+        resultado = regra.teste(dados)
+        if resultado is True:
+            continue
+        if isinstance(resultado, list):  # regra composta (`formato`, `cada`): já devolve os erros
+            erros.extend(resultado)
+        elif not resultado:
+            erros.append(Erro(regra.campo, regra.mensagem))
+        if erros and regra.campo is None:
+            break  # formato errado: as outras regras não têm o que conferir
+    return erros
+
+
+def validar_campo(campo, dados, esquema=ESQUEMA_CANDIDATO):
+    """Só as regras de `campo` (aviso ao vivo de um widget). `dados` pode ser o st.session_state."""
+    return validar(dados, _por_campo(esquema).get(campo, ()))
+
+
+def validar_lote(registros, esquema=ESQUEMA_CANDIDATO):
+    """Gera a lista de erros de cada registro do iterável, na ordem (vazia = válido)."""
+    for dados in registros:
+        yield validar(dados, esquema)